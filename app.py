@@ -1,22 +1,45 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, flash, stream_with_context
 from flask_socketio import SocketIO
 import json
 import os
 from datetime import datetime
 import logging
-import threading
 import time
 from functools import wraps
 
 # Import custom modules
+# (database, notifier and event bus backends are imported by the warm-up)
 import config
-from mt5_connector import get_connector
-from notifier import SignalNotifier
-from db_manager import db_manager
+from mt5_connector import get_connector, next_signal_cursor
+from event_bus import INVALIDATE_TOPIC
+from sync_scheduler import SyncScheduler
+from change_feed import ChangeFeed
+from presets import PresetRegistry
+from signal_index import SignalIndex
+import signal_record
+from startup import WarmUp
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = config.SECRET_KEY
-socketio = SocketIO(app, cors_allowed_origins="*")
+# Signal records in Socket.IO payloads are sent as their cached JSON
+socketio = SocketIO(app, cors_allowed_origins="*", json=signal_record)
+
+# Numbered deltas of the cached dashboard state for Socket.IO clients
+change_feed = ChangeFeed()
+# Database, MT5 and background services are started here after the server
+# is listening (see create_app); until then requests get a 503
+warm_up = WarmUp()
+
+# Created by the warm-up steps
+db_manager = None
+signal_bot = None
+preset_registry = None
+# Shares cache invalidations with other workers
+event_bus = None
+# Email/Telegram delivery runs on background workers, off the request path
+notifications = None
+# All MT5 syncs run on the scheduler thread; handlers only read caches
+sync_scheduler = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,8 +48,10 @@ logger = logging.getLogger(__name__)
 # Global flag to track if we're in simulation mode (no real MT5 connection)
 SIMULATION_MODE = True
 
-# Import presets from files on startup
-db_manager.import_presets_from_files(config.PRESETS_PATH)
+# Settings key holding the GET_SIGNALS cursor of the last successful sync
+SIGNAL_CURSOR_KEY = 'mt5_signal_cursor'
+# Seconds between checks of the settings version for changes made elsewhere
+SETTINGS_VERSION_CHECK_INTERVAL = 1.0
 
 # MT5 Signal Bot data interface
 # Uses database for persistence and connects to MT5 in non-simulation mode
@@ -50,78 +75,34 @@ class SignalBotData:
         self._init_settings()
         
         # Cache for settings and signals to avoid frequent database access
+        self._settings_version = 0
+        self._settings_checked_at = 0.0
         self._settings_cache = self._load_settings_from_db()
-        self._signals_cache = db_manager.get_signals(10)
+        # Signals by id, beyond the latest ones, for execution lookups
+        self.index = SignalIndex(loader=db_manager.get_signal)
+        self._signals_cache = self._reload_signals()
         self._status_cache = db_manager.get_status()
+        self._signal_cursor = self._load_signal_cursor()
         
-        # Load presets
-        self.presets = db_manager.get_all_presets()
-        if not self.presets:
-            # Initialize presets from files if not in database
-            self._init_presets()
-            self.presets = db_manager.get_all_presets()
+        # Presets come from the files; add those only stored in the database
+        self.presets = preset_registry
+        for name, parameters in db_manager.get_all_presets().items():
+            if name not in self.presets:
+                self.presets.add(name, parameters)
     
     def _init_settings(self):
         """Initialize settings in database if they don't exist"""
-        for key, value in self._default_settings.items():
-            if db_manager.get_settings(key) is None:
-                db_manager.save_settings(key, str(value))
-    
-    def _init_presets(self):
-        """Initialize presets from files"""
-        # Define preset names both in standard format and with STRATEGY_ prefix
-        preset_mapping = {
-            'TrendFollowing': 'STRATEGY_TREND_FOLLOWING',
-            'SwingTrading': 'STRATEGY_SWING_TRADING',
-            'Scalping': 'STRATEGY_SCALPING',
-            'Reversal': 'STRATEGY_REVERSAL'
-        }
-        
-        for file_name, strategy_name in preset_mapping.items():
-            preset_data = self._parse_preset_file(file_name)
-            if preset_data:
-                # Save with both naming conventions for maximum compatibility
-                db_manager.save_preset(file_name, preset_data)
-                db_manager.save_preset(strategy_name, preset_data)
-                
-        # Also load any additional .set files in the presets directory
-        if os.path.exists(config.PRESETS_PATH):
-            for file_name in os.listdir(config.PRESETS_PATH):
-                if file_name.endswith('.set'):
-                    preset_name = os.path.splitext(file_name)[0]
-                    # Skip already processed presets
-                    if preset_name in preset_mapping:
-                        continue
-                    preset_data = self._parse_preset_file(preset_name)
-                    if preset_data:
-                        db_manager.save_preset(preset_name, preset_data)
-    
-    def _parse_preset_file(self, preset_name):
-        """Parse a preset file into a dictionary"""
-        try:
-            preset_path = os.path.join(config.PRESETS_PATH, f'{preset_name}.set')
-            preset_data = {}
-            
-            if os.path.exists(preset_path):
-                with open(preset_path, 'r') as file:
-                    for line in file:
-                        line = line.strip()
-                        # Skip comments and empty lines
-                        if line.startswith('#') or not line:
-                            continue
-                        if '=' in line:
-                            key, value = line.split('=', 1)
-                            preset_data[key.strip()] = value.strip()
-            return preset_data
-        except Exception as e:
-            logger.error(f"Error loading preset {preset_name}: {e}")
-            return {}
+        stored, _ = db_manager.get_all_settings()
+        missing = {key: str(value) for key, value in self._default_settings.items() if key not in stored}
+        db_manager.save_all_settings(missing)
     
     def _load_settings_from_db(self):
         """Load all settings from database"""
+        stored, self._settings_version = db_manager.get_all_settings()
+        self._settings_checked_at = time.monotonic()
         settings = {}
         for key in self._default_settings.keys():
-            value = db_manager.get_settings(key)
+            value = stored.get(key)
             if value is not None:
                 # Clean up value - remove comments
                 if isinstance(value, str) and '#' in value:
@@ -153,6 +134,19 @@ class SignalBotData:
         logger.info(f"Loaded settings from database: {settings}")
         return settings
     
+    def _reload_signals(self):
+        """Load the latest signals and add them to the index"""
+        signals = db_manager.get_signals(10)
+        self.index.update(signals)
+        return signals
+    
+    def _load_signal_cursor(self):
+        """Load the persisted GET_SIGNALS cursor (sequence number or time)"""
+        cursor = db_manager.get_settings(SIGNAL_CURSOR_KEY)
+        if cursor is not None and cursor.isdigit():
+            return int(cursor)
+        return cursor
+    
     def add_signal(self, signal):
         """Add a new trading signal"""
         # Set the current time if not provided
@@ -163,12 +157,13 @@ class SignalBotData:
         signal_id = db_manager.save_signal(signal)
         
         # Update cache
-        self._signals_cache = db_manager.get_signals(10)
+        self._signals_cache = self._reload_signals()
         self._status_cache = db_manager.get_status()
+        event_bus.publish(INVALIDATE_TOPIC, ['signals'], local=False)
         
-        # Send notifications for this signal
+        # Queue notifications for this signal
         if not SIMULATION_MODE:
-            SignalNotifier.notify(signal)
+            notifications.enqueue(signal)
             
         return signal
     
@@ -224,11 +219,11 @@ class SignalBotData:
                 processed_settings[key] = value
         
         # Update database with processed settings
-        for key, value in processed_settings.items():
-            db_manager.save_settings(key, str(value))
+        db_manager.save_all_settings({key: str(value) for key, value in processed_settings.items()})
         
         # Update cache
         self._settings_cache = self._load_settings_from_db()
+        event_bus.publish(INVALIDATE_TOPIC, ['settings'], local=False)
         
         # Log the updated settings for debugging
         logger.info(f"Settings updated: {self._settings_cache}")
@@ -255,103 +250,28 @@ class SignalBotData:
     
     def load_preset(self, preset_name):
         """Load a specific preset configuration"""
-        if preset_name in self.presets:
-            # Get preset data
-            preset_data = self.presets[preset_name]
-            
-            # Map preset settings to our settings format
-            mappings = {
-                'TimeFrame': 'time_frame',
-                'TradingSymbols': 'trading_symbols',
-                'MaxDailyTrades': 'max_daily_trades',
-                'RiskPercent': 'risk_percent',
-                'StopLossPips': 'stop_loss_pips',
-                'TakeProfitPips': 'take_profit_pips',
-                'MinimumSignalStrength': 'minimum_signal_strength',
-                'EnableNewsFilter': 'enable_news_filter',
-                'EnableAIAnalysis': 'enable_ai_analysis',
-                'EnableSentimentAnalysis': 'enable_sentiment_analysis'
-            }
-            
-            # Timeframe mapping from MT5 numeric codes to human-readable values
-            timeframe_mapping = {
-                '1': 'M1',
-                '2': 'M2',
-                '3': 'M3',
-                '4': 'M4',
-                '5': 'M5',
-                '6': 'M6',
-                '10': 'M10',
-                '12': 'M12',
-                '15': 'M15',
-                '20': 'M20',
-                '30': 'M30',
-                '16385': 'H1',
-                '16386': 'H2',
-                '16387': 'H3',
-                '16388': 'H4',
-                '16390': 'H6',
-                '16392': 'H8',
-                '16396': 'H12',
-                '16408': 'D1',
-                '32769': 'W1',
-                '49153': 'MN1'
-            }
-            
-            # Boolean value mapping
-            boolean_keys = ['EnableNewsFilter', 'EnableAIAnalysis', 'EnableSentimentAnalysis']
-            
-            new_settings = {}
-            for preset_key, our_key in mappings.items():
-                if preset_key in preset_data:
-                    value = preset_data[preset_key]
-                    
-                    # Clean up value - remove comments
-                    if isinstance(value, str) and '#' in value:
-                        value = value.split('#')[0].strip()
-                    
-                    # Convert timeframe from numeric code to readable value
-                    if preset_key == 'TimeFrame' and value in timeframe_mapping:
-                        value = timeframe_mapping[value]
-                    
-                    # Convert boolean values
-                    if preset_key in boolean_keys:
-                        value = value.lower() in ['true', '1', 'yes', 'on']
-                    
-                    # Convert numeric values
-                    if preset_key in ['MaxDailyTrades', 'StopLossPips', 'TakeProfitPips', 'MinimumSignalStrength']:
-                        try:
-                            value = int(value)
-                        except (ValueError, TypeError):
-                            pass  # Keep as is if not convertible
-                    
-                    if preset_key == 'RiskPercent':
-                        try:
-                            value = float(value)
-                        except (ValueError, TypeError):
-                            pass  # Keep as is if not convertible
-                    
-                    new_settings[our_key] = value
-            
-            # Add strategy preset
-            new_settings['strategy_preset'] = preset_name
-            
-            # Update settings
-            self.update_settings(new_settings)
-            
-            # Log the applied settings for debugging
-            logger.info(f"Applied preset {preset_name} with settings: {new_settings}")
-            
-            # In a real environment, sync with MT5
-            if not SIMULATION_MODE:
-                mt5 = get_connector()
-                if mt5.connected or mt5.connect():
-                    result = mt5.load_preset(preset_name)
-                    if "error" in result:
-                        logger.error(f"Failed to load preset in MT5: {result['error']}")
-            
-            return True
-        return False
+        preset = self.presets.get(preset_name)
+        if preset is None:
+            return False
+        
+        # Settings were converted when the file was read
+        new_settings = dict(preset.settings, strategy_preset=preset.strategy_name)
+        
+        # Update settings
+        self.update_settings(new_settings)
+        
+        # Log the applied settings for debugging
+        logger.info(f"Applied preset {preset.name} with settings: {new_settings}")
+        
+        # In a real environment, sync with MT5
+        if not SIMULATION_MODE:
+            mt5 = get_connector()
+            if mt5.connected or mt5.connect():
+                result = mt5.load_preset(preset.strategy_name)
+                if "error" in result:
+                    logger.error(f"Failed to load preset in MT5: {result['error']}")
+        
+        return True
     
     def sync_with_mt5(self):
         """Synchronize data with MT5 (in non-simulation mode)"""
@@ -367,21 +287,69 @@ class SignalBotData:
         # Get current status
         status_result = mt5.get_status()
         if "error" not in status_result:
-            self.update_status(status_result)
+            try:
+                self.update_status(status_result)
+            except ValueError as e:
+                logger.error(f"Ignoring invalid status from MT5: {e}")
             self.update_status({'connected': True})
             
-        # Get current signals
-        signals_result = mt5.get_signals()
+        # Get only the signals added since the last sync
+        signals_result = mt5.get_signals(since=self._signal_cursor)
         if "error" not in signals_result and "signals" in signals_result:
-            # Save signals to database
-            for signal in signals_result["signals"]:
-                db_manager.save_signal(signal)
+            new_signals = signals_result["signals"]
+            if isinstance(self._signal_cursor, int):
+                # Guard against an EA that ignores the cursor
+                new_signals = [signal for signal in new_signals
+                               if signal.get('seq') is None or signal['seq'] > self._signal_cursor]
+            
+            # Save signals to database in one transaction; a retried sync
+            # sends the same cursor, so timeless signals keep their keys
+            db_manager.save_signals(new_signals, batch_id=f"since={self._signal_cursor}")
+            
+            cursor = next_signal_cursor(signals_result, self._signal_cursor)
+            if cursor != self._signal_cursor:
+                db_manager.save_settings(SIGNAL_CURSOR_KEY, str(cursor), bump_version=False)
+                self._signal_cursor = cursor
             
             # Update cache
-            self._signals_cache = db_manager.get_signals(10)
+            if new_signals:
+                self._signals_cache = self._reload_signals()
+                event_bus.publish(INVALIDATE_TOPIC, ['signals'], local=False)
             
         return True
     
+    def invalidate(self, caches=None):
+        """
+        Reload cached data changed by another worker
+        
+        Args:
+            caches (list): Any of 'signals', 'status' and 'settings'; None
+                reloads everything
+        """
+        caches = caches or ['signals', 'status', 'settings']
+        if 'signals' in caches:
+            # Another worker may have executed indexed signals
+            self.index.clear()
+            self._signals_cache = self._reload_signals()
+        if 'status' in caches:
+            db_manager.status.reload()
+            self._status_cache = db_manager.get_status()
+        if 'settings' in caches:
+            self._settings_cache = self._load_settings_from_db()
+    
+    def get_signal(self, signal_id):
+        """Look up a signal by id, in memory or else in the database"""
+        return self.index.get(signal_id)
+    
+    def mark_executed(self, signal_id):
+        """Record a signal as executed in the database, the index and the cache"""
+        if db_manager.update_signal_execution(signal_id, True):
+            self.index.mark_executed(signal_id)
+            self._signals_cache = [signal.replace(executed=True) if signal.get('id') == signal_id else signal
+                                   for signal in self._signals_cache]
+            return True
+        return False
+    
     @property
     def signals(self):
         """Get signals from cache"""
@@ -389,7 +357,12 @@ class SignalBotData:
     
     @property
     def settings(self):
-        """Get settings from cache"""
+        """Get settings from cache, reloading if another process changed them"""
+        now = time.monotonic()
+        if now - self._settings_checked_at >= SETTINGS_VERSION_CHECK_INTERVAL:
+            self._settings_checked_at = now
+            if db_manager.get_settings_version() != self._settings_version:
+                self._settings_cache = self._load_settings_from_db()
         return self._settings_cache
     
     @property
@@ -398,14 +371,73 @@ class SignalBotData:
         return self._status_cache
         
     def debug_presets(self):
-        """Debug presets - get a list of preset names in the database"""
-        return list(self.presets.keys())
+        """Debug presets - get a list of the names presets can be loaded by"""
+        return self.presets.keys()
+
+def publish_changes():
+    """Send connected clients whatever changed in the cached signals and status"""
+    with change_feed.lock:
+        for event_name, event in change_feed.update(signal_bot.signals, signal_bot.status):
+            socketio.emit(event_name, event)
+
+def handle_invalidation(caches):
+    """Reload caches changed by another worker and pass the changes on"""
+    signal_bot.invalidate(caches)
+    publish_changes()
+
+# Warm-up steps, run in this order by create_app()
+def open_database():
+    """Connect, create missing tables and apply migrations"""
+    global db_manager
+    from db_manager import get_db_manager
+    db_manager = get_db_manager()
+
+def import_presets():
+    """Compile the preset files and store new or changed ones"""
+    global preset_registry
+    registry = PresetRegistry(config.PRESETS_PATH)
+    db_manager.import_presets(registry.scan())
+    preset_registry = registry
 
-# Initialize data storage
-signal_bot = SignalBotData()
+def load_caches():
+    """Initialize data storage"""
+    global signal_bot
+    signal_bot = SignalBotData()
+    # Recompile and store preset files as they are edited
+    preset_registry.start_watcher(config.PRESET_RELOAD_INTERVAL, db_manager.import_presets)
 
-# Sample signals for demonstration (only in simulation mode)
-if SIMULATION_MODE:
+def start_services():
+    """Start the event bus, notification workers and MT5 sync scheduler"""
+    global event_bus, notifications, sync_scheduler
+    from db_models import engine
+    from event_bus import create_event_bus
+    from notifier import create_dispatcher
+    
+    event_bus = create_event_bus(config.EVENT_BUS, engine, config.EVENT_BUS_PATH or None)
+    # Every worker turns invalidations into deltas for its own clients
+    event_bus.subscribe(INVALIDATE_TOPIC, handle_invalidation)
+    # Other workers learn about status changes once they are written
+    db_manager.status.add_flush_listener(lambda: event_bus.publish(INVALIDATE_TOPIC, ['status'], local=False))
+    event_bus.start()
+    
+    notifications = create_dispatcher(db_manager.save_dead_letter)
+    notifications.start()
+    
+    sync_scheduler = SyncScheduler(
+        signal_bot.sync_with_mt5,
+        interval=config.MT5_SYNC_INTERVAL,
+        max_staleness=config.MT5_SYNC_MAX_STALENESS,
+        wait_timeout=config.MT5_TIMEOUT,
+        on_sync=publish_changes
+    )
+    # Background MT5 sync (only in non-simulation mode)
+    if not SIMULATION_MODE:
+        sync_scheduler.start()
+
+def add_sample_signals():
+    """Sample signals for demonstration (only in simulation mode)"""
+    if not SIMULATION_MODE:
+        return
     sample_signals = [
         {
             'symbol': 'EURUSD',
@@ -449,6 +481,47 @@ if SIMULATION_MODE:
     for signal in sample_signals:
         signal_bot.add_signal(signal)
 
+warm_up.add_step('database', open_database)
+warm_up.add_step('presets', import_presets)
+warm_up.add_step('caches', load_caches)
+warm_up.add_step('services', start_services)
+warm_up.add_step('sample_signals', add_sample_signals)
+
+def create_app():
+    """
+    Application factory
+    
+    Returns the app at once and runs the warm-up in the background; use
+    `app:create_app()` as the WSGI entry point.
+    """
+    warm_up.start()
+    return app
+
+# Paths served while the warm-up is still running
+STARTUP_EXEMPT_ENDPOINTS = ('healthz', 'readyz', 'static')
+
+@app.before_request
+def require_ready():
+    """Answer 503 until the warm-up has finished"""
+    if warm_up.ready.is_set() or request.endpoint in STARTUP_EXEMPT_ENDPOINTS:
+        return None
+    warm_up.start()
+    response = jsonify({"error": "Starting up", "startup": warm_up.status()})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+@app.route('/healthz')
+def healthz():
+    """Liveness: the process is up and serving requests"""
+    return jsonify({"status": "alive"})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness: the warm-up has finished, with its progress otherwise"""
+    status = warm_up.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
 # Authentication decorator for protected routes
 def login_required(f):
     @wraps(f)
@@ -466,9 +539,9 @@ def login_required(f):
 # Routes
 @app.route('/')
 def index():
-    # In real mode, sync with MT5 first
+    # In real mode, make sure the cache is recent enough
     if not SIMULATION_MODE:
-        signal_bot.sync_with_mt5()
+        sync_scheduler.ensure_fresh()
         
     return render_template('index.html', 
                           signals=signal_bot.signals, 
@@ -504,49 +577,77 @@ def settings():
     
     return render_template('settings.html', 
                           settings=signal_bot.settings,
-                          presets=list(signal_bot.presets.keys()),
+                          presets=signal_bot.presets.keys(),
                           simulation=SIMULATION_MODE)
 
 @app.route('/load_preset/<preset_name>')
 def load_preset(preset_name):
-    # Handle both formats - with and without STRATEGY_ prefix
-    # First try as provided
-    success = signal_bot.load_preset(preset_name)
-    
-    if not success:
-        # Try alternative formats
-        if preset_name.startswith('STRATEGY_'):
-            # Remove the STRATEGY_ prefix and try with just the name
-            alt_name = preset_name[9:]  # Remove "STRATEGY_"
-            success = signal_bot.load_preset(alt_name)
-        else:
-            # Add the STRATEGY_ prefix and try again
-            alt_name = f"STRATEGY_{preset_name}"
-            success = signal_bot.load_preset(alt_name)
-    
-    if success:
+    # Accepts the file name or the STRATEGY_ name, in any letter case
+    if signal_bot.load_preset(preset_name):
         return redirect(url_for('settings'))
     
-    # If still not found, try with corrected casing
-    possible_matches = []
-    for preset in signal_bot.presets.keys():
-        if preset.lower() == preset_name.lower() or preset.lower() == f"strategy_{preset_name.lower()}":
-            possible_matches.append(preset)
-    
-    if possible_matches:
-        success = signal_bot.load_preset(possible_matches[0])
-        if success:
-            return redirect(url_for('settings'))
-    
     return "Preset not found", 404
 
 @app.route('/api/signals', methods=['GET'])
 @login_required
 def get_signals():
-    # In real mode, sync with MT5 first
+    # In real mode, make sure the cache is recent enough
     if not SIMULATION_MODE:
-        signal_bot.sync_with_mt5()
-    return jsonify(signal_bot.signals)
+        sync_scheduler.ensure_fresh()
+    return Response(signal_record.dumps(signal_bot.signals), mimetype='application/json')
+
+@app.route('/api/signals/history', methods=['GET'])
+@login_required
+def get_signal_history():
+    """
+    Page through stored signals, newest first
+
+    Query parameters: cursor (from the previous page's next_cursor), limit,
+    symbol, direction, executed (true/false) and min_strength.
+    """
+    args = request.args
+    try:
+        executed = args.get('executed')
+        if executed is not None:
+            if executed.lower() not in ('true', 'false', '1', '0'):
+                raise ValueError(f"Invalid executed filter: {executed}")
+            executed = executed.lower() in ('true', '1')
+        min_strength = args.get('min_strength')
+        if min_strength is not None:
+            if not min_strength.lstrip('-').isdigit():
+                raise ValueError(f"Invalid min_strength filter: {min_strength}")
+            min_strength = int(min_strength)
+        limit = args.get('limit', '100')
+        if not limit.isdigit():
+            raise ValueError(f"Invalid limit: {limit}")
+        rows = db_manager.iter_signal_history(
+            cursor=args.get('cursor'),
+            limit=int(limit),
+            symbol=args.get('symbol'),
+            direction=args.get('direction', '').upper() or None,
+            executed=executed,
+            min_strength=min_strength
+        )
+        # Start the query so a bad cursor is reported before streaming
+        first = next(rows, None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def generate():
+        yield '{"signals": ['
+        next_cursor = None
+        if first is not None:
+            yield json.dumps(first)
+            while True:
+                try:
+                    signal = next(rows)
+                except StopIteration as stop:
+                    next_cursor = stop.value
+                    break
+                yield ',' + json.dumps(signal)
+        yield '], "next_cursor": ' + json.dumps(next_cursor) + '}'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 @app.route('/api/settings', methods=['GET', 'PUT'])
 @login_required
@@ -561,15 +662,21 @@ def api_settings():
 @app.route('/api/status', methods=['GET', 'PUT'])
 @login_required
 def api_status():
-    # In real mode, sync with MT5 first for GET requests
+    # In real mode, make sure the cache is recent enough for GET requests
     if request.method == 'GET' and not SIMULATION_MODE:
-        signal_bot.sync_with_mt5()
+        sync_scheduler.ensure_fresh()
         
     if request.method == 'GET':
         return jsonify(signal_bot.status)
     elif request.method == 'PUT':
         data = request.json
-        updated_status = signal_bot.update_status(data)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Expected a JSON object"}), 400
+        try:
+            updated_status = signal_bot.update_status(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        publish_changes()
         return jsonify(updated_status)
 
 @app.route('/api/add_signal', methods=['POST'])
@@ -578,8 +685,8 @@ def api_add_signal():
     signal = request.json
     signal = signal_bot.add_signal(signal)
     
-    # Emit a socket.io event to update connected clients
-    socketio.emit('new_signal', signal)
+    # Send the change to connected clients
+    publish_changes()
     
     return jsonify({"status": "success", "message": "Signal added"})
 
@@ -591,59 +698,75 @@ def api_connection():
         
     mt5 = get_connector()
     connected = mt5.test_connection()
-    return jsonify({"status": "connected" if connected else "disconnected"})
+    return jsonify({"status": "connected" if connected else "disconnected",
+                    "pool": mt5.pool_stats(),
+                    "sync": sync_scheduler.stats()})
     
+@app.route('/api/notifications', methods=['GET'])
+@login_required
+def api_notifications():
+    """Notification queue statistics and undelivered notifications"""
+    return jsonify({"channels": notifications.stats(),
+                    "dead_letters": db_manager.get_dead_letters(request.args.get('limit', 100, type=int))})
+
+@app.route('/api/notifications/replay', methods=['POST'])
+@login_required
+def api_replay_notifications():
+    """Queue dead-lettered notifications for another round of delivery"""
+    replayed = []
+    for dead_letter in db_manager.get_dead_letters(request.args.get('limit', 100, type=int)):
+        channel = dead_letter['channel']
+        if channel in notifications.channels and notifications.enqueue(dead_letter['payload'], [channel])[channel]:
+            replayed.append(dead_letter['id'])
+    db_manager.delete_dead_letters(replayed)
+    return jsonify({"status": "success", "replayed": len(replayed)})
+
 @app.route('/api/debug/presets', methods=['GET'])
 def debug_presets():
     """Debug endpoint to list all available presets"""
     presets = signal_bot.debug_presets()
     return jsonify({"presets": presets})
 
-# Background MT5 Sync Thread (only in non-simulation mode)
-def mt5_sync_thread():
-    """Thread to periodically sync data with MT5"""
-    if SIMULATION_MODE:
-        return
-        
-    logger.info("Starting MT5 sync thread")
-    while True:
-        try:
-            # Sync data with MT5
-            success = signal_bot.sync_with_mt5()
-            
-            if success:
-                # Broadcast updates to all connected clients
-                socketio.emit('signals_update', signal_bot.signals)
-                socketio.emit('status_update', signal_bot.status)
-                
-        except Exception as e:
-            logger.error(f"Error in MT5 sync thread: {str(e)}")
-            
-        # Sleep for 5 seconds before next sync
-        time.sleep(5)
-
 # Socket.IO events
 @socketio.on('connect')
 def handle_connect():
+    if not warm_up.ready.is_set():
+        # Refuse until started; the client retries the connection
+        return False
     logger.info("Client connected")
-    # Send current data to the newly connected client
-    socketio.emit('signals_update', signal_bot.signals)
-    socketio.emit('status_update', signal_bot.status)
-    socketio.emit('simulation_mode', SIMULATION_MODE)
+    # Current data follows when the client resumes its change feed
+    socketio.emit('simulation_mode', SIMULATION_MODE, to=request.sid)
+
+@socketio.on('resume')
+def handle_resume(data=None):
+    """Replay the deltas a client missed, or send a snapshot if it can't catch up"""
+    data = data or {}
+    # In real mode, make sure the cache is recent enough
+    if not SIMULATION_MODE:
+        sync_scheduler.ensure_fresh()
+    with change_feed.lock:
+        publish_changes()
+        events = change_feed.since(data.get('epoch'), data.get('seq'))
+        if events is None:
+            socketio.emit('feed_snapshot', change_feed.snapshot(signal_bot.signals, signal_bot.status),
+                          to=request.sid)
+            return
+        for event_name, event in events:
+            socketio.emit(event_name, event, to=request.sid)
 
 @socketio.on('request_signals')
 def handle_request_signals():
-    # In real mode, sync with MT5 first
+    # In real mode, make sure the cache is recent enough
     if not SIMULATION_MODE:
-        signal_bot.sync_with_mt5()
-    socketio.emit('signals_update', signal_bot.signals)
+        sync_scheduler.ensure_fresh()
+    socketio.emit('signals_update', signal_bot.signals, to=request.sid)
 
 @socketio.on('request_status')
 def handle_request_status():
-    # In real mode, sync with MT5 first
+    # In real mode, make sure the cache is recent enough
     if not SIMULATION_MODE:
-        signal_bot.sync_with_mt5()
-    socketio.emit('status_update', signal_bot.status)
+        sync_scheduler.ensure_fresh()
+    socketio.emit('status_update', signal_bot.status, to=request.sid)
 
 # Feature: Simulate signals in development mode
 @app.route('/dev/simulate_signal', methods=['POST'])
@@ -757,9 +880,9 @@ def simulate_signal():
         signal['sentiment']['retail_bearish'] = round(100 - signal['sentiment']['retail_bullish'], 1)
         signal['sentiment']['institutional_bearish'] = round(100 - signal['sentiment']['institutional_bullish'], 1)
     
-    # Add the signal and broadcast to clients
+    # Add the signal and send the change to clients
     signal = signal_bot.add_signal(signal)
-    socketio.emit('new_signal', signal)
+    publish_changes()
     
     return jsonify({"status": "success", "signal": signal})
 
@@ -772,13 +895,12 @@ def api_execute_signal():
         signal_id = data.get('signal_id', None)
         
         if signal_id:
-            # Find the signal in database
-            signal = None
-            for s in signal_bot.signals:
-                if 'id' in s and s['id'] == signal_id:
-                    signal = s
-                    break
-                    
+            # Find the signal in memory or the database
+            try:
+                signal = signal_bot.get_signal(int(signal_id))
+            except (TypeError, ValueError):
+                signal = None
+                
             if not signal:
                 return jsonify({"status": "error", "error": f"Signal with ID {signal_id} not found"}), 404
                 
@@ -834,11 +956,13 @@ def api_execute_signal():
             
             # Update signal execution status if we have a signal_id
             if signal_id:
-                db_manager.update_signal_execution(signal_id, True)
+                signal_bot.mark_executed(signal['id'])
             
             # Update caches
             signal_bot._status_cache = db_manager.get_status()
-            signal_bot._signals_cache = db_manager.get_signals(10)
+            signal_bot._signals_cache = signal_bot._reload_signals()
+            event_bus.publish(INVALIDATE_TOPIC, ['signals'], local=False)
+            publish_changes()
             
             # Create a simulated trade response
             return jsonify({
@@ -889,10 +1013,11 @@ def api_execute_signal():
             
             # Update signal execution status if we have a signal_id
             if signal_id:
-                db_manager.update_signal_execution(signal_id, True)
+                signal_bot.mark_executed(signal['id'])
+                event_bus.publish(INVALIDATE_TOPIC, ['signals'], local=False)
                 
             # Update the account balance
-            signal_bot.sync_with_mt5()
+            sync_scheduler.refresh()
             
             # Return the trade execution result
             return jsonify({
@@ -917,10 +1042,5 @@ if __name__ == '__main__':
     if not os.path.exists('templates'):
         os.makedirs('templates')
         
-    # Start MT5 sync thread if not in simulation mode
-    if not SIMULATION_MODE:
-        sync_thread = threading.Thread(target=mt5_sync_thread, daemon=True)
-        sync_thread.start()
-        
-    # Start web server
-    socketio.run(app, host=config.WEB_HOST, port=config.WEB_PORT, debug=config.DEBUG_MODE)
\ No newline at end of file
+    # Start web server; start-up work continues in the background
+    socketio.run(create_app(), host=config.WEB_HOST, port=config.WEB_PORT, debug=config.DEBUG_MODE)
\ No newline at end of file
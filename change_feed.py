@@ -0,0 +1,103 @@
+"""
+Change Feed for the MT5 Signal Bot dashboard
+Turns the cached signals and status into a stream of numbered deltas:
+only inserted or updated signals and changed status fields are sent, and
+a reconnecting client can replay what it missed from a ring buffer.
+"""
+
+import threading
+import uuid
+from collections import deque
+
+# Events kept for clients resuming after a disconnect
+CHANGE_FEED_BUFFER = 500
+# Status fields that change on every sync and are only sent along with a
+# real change
+VOLATILE_STATUS_FIELDS = ('last_update',)
+
+
+class ChangeFeed:
+    """
+    Sequence-numbered deltas of the dashboard state
+
+    Every event carries the feed's epoch (random per process) and a
+    sequence number that increases by one per event. A client that saw
+    (epoch, seq) can resume with since(); when the epoch differs (server
+    restart or another worker) or the events have left the buffer, it
+    needs a snapshot instead.
+    """
+
+    def __init__(self, buffer_size=CHANGE_FEED_BUFFER):
+        """Initialize an empty feed"""
+        self.epoch = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self._events = deque(maxlen=buffer_size)
+        self._signals = {}  # id -> last published signal
+        self._status = {}
+        self.lock = threading.RLock()
+
+    def _append(self, name, body):
+        self.seq += 1
+        event = dict(body, epoch=self.epoch, seq=self.seq)
+        self._events.append((name, event))
+        return name, event
+
+    def update(self, signals, status):
+        """
+        Diff the current state against what was last published
+
+        Args:
+            signals (list): Current signal dictionaries (with ids)
+            status (dict): Current status
+
+        Returns:
+            list: (event name, event) pairs, empty if nothing changed
+        """
+        with self.lock:
+            events = []
+            changed = []
+            for signal in signals:
+                key = signal.get('id')
+                if key is None or self._signals.get(key) == signal:
+                    continue
+                self._signals[key] = signal
+                changed.append(signal)
+            # Forget signals that dropped out of the cached window
+            current = {signal.get('id') for signal in signals}
+            for key in [key for key in self._signals if key not in current]:
+                del self._signals[key]
+            if changed:
+                events.append(self._append('signals_delta', {'signals': changed}))
+
+            changes = {key: value for key, value in (status or {}).items()
+                       if self._status.get(key) != value}
+            if any(key not in VOLATILE_STATUS_FIELDS for key in changes):
+                self._status.update(changes)
+                events.append(self._append('status_delta', {'changes': changes}))
+            return events
+
+    def since(self, epoch, seq):
+        """
+        Events after a client's last seen position
+
+        Args:
+            epoch (str): Feed epoch the client saw
+            seq (int): Last sequence number the client applied
+
+        Returns:
+            list: (event name, event) pairs to replay, or None if the
+                client needs a snapshot
+        """
+        with self.lock:
+            if epoch != self.epoch or seq is None or seq > self.seq:
+                return None
+            if seq == self.seq:
+                return []
+            if not self._events or self._events[0][1]['seq'] > seq + 1:
+                return None
+            return [(name, event) for name, event in self._events if event['seq'] > seq]
+
+    def snapshot(self, signals, status):
+        """Full state at the current sequence number, for (re)syncing clients"""
+        with self.lock:
+            return {'epoch': self.epoch, 'seq': self.seq, 'signals': signals, 'status': status}
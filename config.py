@@ -12,6 +12,19 @@ load_dotenv()
 MT5_HOST = os.getenv('MT5_HOST', '127.0.0.1')
 MT5_PORT = int(os.getenv('MT5_PORT', '5555'))
 MT5_TIMEOUT = int(os.getenv('MT5_TIMEOUT', '10'))
+MT5_POOL_SIZE = int(os.getenv('MT5_POOL_SIZE', '2'))
+MT5_PING_INTERVAL = float(os.getenv('MT5_PING_INTERVAL', '5'))
+MT5_RECONNECT_BACKOFF_MAX = float(os.getenv('MT5_RECONNECT_BACKOFF_MAX', '30'))
+# Seconds between background syncs, and the oldest cached data served
+# before a request waits for a fresh sync
+MT5_SYNC_INTERVAL = float(os.getenv('MT5_SYNC_INTERVAL', '5'))
+MT5_SYNC_MAX_STALENESS = float(os.getenv('MT5_SYNC_MAX_STALENESS', '15'))
+# Wire encodings to offer the EA, most preferred first; JSON is the fallback.
+# Plain JSON (the default) skips the HELLO handshake, e.g. "struct,msgpack,json"
+# opts in for an EA that supports it
+MT5_WIRE_ENCODINGS = [name.strip() for name in os.getenv('MT5_WIRE_ENCODINGS', 'json').split(',') if name.strip()]
+# Seconds to wait for the EA to answer HELLO before falling back to JSON
+MT5_HELLO_TIMEOUT = float(os.getenv('MT5_HELLO_TIMEOUT', '2'))
 
 # Web Server Settings
 WEB_HOST = os.getenv('WEB_HOST', '0.0.0.0')
@@ -32,11 +45,46 @@ EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True').lower() == 'true'
 EMAIL_USERNAME = os.getenv('EMAIL_USERNAME', '')
 EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD', '')
 EMAIL_RECIPIENT = os.getenv('EMAIL_RECIPIENT', '')
+# Seconds of signals combined into one digest email (0 = one email per signal)
+EMAIL_DIGEST_WINDOW = float(os.getenv('EMAIL_DIGEST_WINDOW', '0'))
 
 # Telegram Notification Settings
 ENABLE_TELEGRAM = os.getenv('ENABLE_TELEGRAM', 'False').lower() == 'true'
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN', '')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID', '')
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org')
+# Messages per second and back-to-back burst allowed per chat
+TELEGRAM_RATE_PER_CHAT = float(os.getenv('TELEGRAM_RATE_PER_CHAT', '1'))
+TELEGRAM_BURST = int(os.getenv('TELEGRAM_BURST', '3'))
+# Seconds of signals combined into one message (0 = one message per signal)
+TELEGRAM_BATCH_WINDOW = float(os.getenv('TELEGRAM_BATCH_WINDOW', '2'))
+
+# Notification Pipeline Settings
+NOTIFY_QUEUE_SIZE = int(os.getenv('NOTIFY_QUEUE_SIZE', '1000'))
+NOTIFY_MAX_ATTEMPTS = int(os.getenv('NOTIFY_MAX_ATTEMPTS', '5'))
+NOTIFY_BACKOFF_MAX = float(os.getenv('NOTIFY_BACKOFF_MAX', '60'))
+NOTIFY_EMAIL_WORKERS = int(os.getenv('NOTIFY_EMAIL_WORKERS', '1'))
+NOTIFY_TELEGRAM_WORKERS = int(os.getenv('NOTIFY_TELEGRAM_WORKERS', '2'))
+
+# Database Settings
+# Seconds between write-behind flushes of the bot status row
+STATUS_FLUSH_INTERVAL = float(os.getenv('STATUS_FLUSH_INTERVAL', '2'))
+# Days of signals kept in the signals table (0 = never archive)
+SIGNAL_RETENTION_DAYS = int(os.getenv('SIGNAL_RETENTION_DAYS', '90'))
+# Directory of archived signal days (gzip'd JSON Lines)
+SIGNAL_ARCHIVE_PATH = os.getenv('SIGNAL_ARCHIVE_PATH', 'archive/signals')
+# Seconds between archival runs
+SIGNAL_ARCHIVE_INTERVAL = float(os.getenv('SIGNAL_ARCHIVE_INTERVAL', '3600'))
+
+# Multi-worker Settings
+# Event bus between web workers: auto (postgres on PostgreSQL, else socket),
+# local (single process), postgres (LISTEN/NOTIFY) or socket (Unix
+# datagrams between workers on one host)
+EVENT_BUS = os.getenv('EVENT_BUS', 'auto')
+# Directory for the socket event bus (empty = derived from DATABASE_URL)
+EVENT_BUS_PATH = os.getenv('EVENT_BUS_PATH', '')
 
 # Paths
-PRESETS_PATH = os.getenv('PRESETS_PATH', 'Presets')
\ No newline at end of file
+PRESETS_PATH = os.getenv('PRESETS_PATH', 'Presets')
+# Seconds between checks of the presets directory for changed files (0 disables)
+PRESET_RELOAD_INTERVAL = float(os.getenv('PRESET_RELOAD_INTERVAL', '2'))
\ No newline at end of file
@@ -2,10 +2,22 @@ import json
 import os
 import time
 import logging
-from datetime import datetime
+import threading
+import atexit
+import base64
+import math
+import socket
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sqlalchemy import func, tuple_
 from sqlalchemy.orm import scoped_session
-from sqlalchemy.exc import OperationalError, SQLAlchemyError
-from db_models import get_session, Settings, Preset, Signal, BotStatus, init_db
+from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError, SQLAlchemyError
+from db_models import (get_session, Settings, Preset, Signal, BotStatus, DeadLetterNotification,
+                       init_db, signal_dedup_key)
+from db_migrations import run_migrations
+from signal_archive import SignalArchive, retention_cutoff, row_to_record
+from presets import PresetRegistry
+import config
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -14,6 +26,307 @@ logger = logging.getLogger(__name__)
 MAX_RETRIES = 3
 # Delay between retries (in seconds)
 RETRY_DELAY = 1.0
+# Number of recently ingested signal keys remembered in process
+RECENT_SIGNAL_KEYS = 10000
+# Rows per INSERT statement in bulk signal writes
+SIGNAL_INSERT_CHUNK = 500
+# Settings row holding the version counter bumped on every settings change
+SETTINGS_VERSION_KEY = 'settings_version'
+# Settings row naming the worker that is archiving signals, "expiry|owner"
+ARCHIVE_CLAIM_KEY = 'signal_archive_claim'
+# Seconds an archive claim outlives its last renewal, e.g. if the worker died
+ARCHIVE_CLAIM_TTL = 600
+# Largest page the signal history can be read in
+HISTORY_PAGE_MAX = 1000
+# Rows fetched from the database cursor at a time while streaming history
+HISTORY_FETCH_SIZE = 200
+
+def encode_history_cursor(created_at, signal_id):
+    """Opaque token for the position after a signal in the history"""
+    raw = f"{created_at.isoformat()}|{signal_id}".encode('ascii')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_history_cursor(cursor):
+    """
+    Parse a history cursor token
+
+    Returns:
+        tuple: (created_at, signal_id)
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        created_at, signal_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('ascii').split('|')
+        return datetime.fromisoformat(created_at), int(signal_id)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid history cursor: {cursor}") from e
+
+class RecentKeyCache:
+    """Thread-safe bounded LRU set of recently seen keys"""
+    
+    def __init__(self, capacity=RECENT_SIGNAL_KEYS):
+        self.capacity = capacity
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._keys:
+                self._keys.move_to_end(key)
+                return True
+            return False
+    
+    def add(self, key):
+        """Remember a key, evicting the least recently seen one if full"""
+        with self._lock:
+            self._keys[key] = None
+            self._keys.move_to_end(key)
+            while len(self._keys) > self.capacity:
+                self._keys.popitem(last=False)
+
+class StatusAggregator:
+    """
+    Write-behind view of the single bot_status row
+    
+    Counter increments and field updates are applied to an in-process
+    snapshot immediately and coalesced until flush(), which writes them
+    in one UPDATE: counters as relative increments (so concurrent
+    processes don't lose each other's counts) and other fields as plain
+    assignments. A background thread flushes every `flush_interval`
+    seconds, and the pending changes are flushed at interpreter exit.
+    """
+    
+    FIELDS = ('running', 'connected', 'last_update', 'bot_version', 'account_balance',
+              'total_trades_today', 'total_signals_today')
+    COUNTERS = ('total_trades_today', 'total_signals_today')
+    
+    def __init__(self, session_factory, flush_interval=2.0):
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval
+        self._snapshot = None
+        self._row_id = None
+        self._deltas = {}
+        self._assignments = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._flush_listeners = []
+    
+    def add_flush_listener(self, callback):
+        """Call `callback()` after each flush that wrote changes"""
+        self._flush_listeners.append(callback)
+    
+    def start(self):
+        """Start the periodic flush thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+    
+    def stop(self):
+        """Stop the flush thread and write out anything pending"""
+        self._stopped.set()
+        self.flush()
+    
+    def reload(self):
+        """Replace the snapshot with the stored row plus pending changes"""
+        session = self._session_factory()
+        try:
+            status = session.query(BotStatus).first()
+            if status is None:
+                return
+            values = {field: getattr(status, field) for field in self.FIELDS}
+        finally:
+            session.close()
+        with self._lock:
+            self._row_id = status.id
+            values.update(self._assignments)
+            for field, amount in self._deltas.items():
+                values[field] += amount
+            self._snapshot = values
+    
+    def snapshot(self):
+        """Current status values, including unflushed changes"""
+        if self._snapshot is None:
+            self.reload()
+        with self._lock:
+            return dict(self._snapshot) if self._snapshot is not None else None
+    
+    def increment(self, field, amount=1):
+        """Add to a counter"""
+        if self._snapshot is None:
+            self.reload()
+        with self._lock:
+            self._snapshot[field] += amount
+            if field in self._assignments:
+                self._assignments[field] += amount
+            else:
+                self._deltas[field] = self._deltas.get(field, 0) + amount
+    
+    @classmethod
+    def coerce(cls, field, value):
+        """
+        Check a status value against its column type
+        
+        Returns:
+            The value to store (ints are accepted for floats, ISO strings
+            for timestamps)
+        
+        Raises:
+            ValueError: If the value doesn't fit the column
+        """
+        column = BotStatus.__table__.c[field]
+        python_type = column.type.python_type
+        if value is None:
+            if column.nullable and field not in cls.COUNTERS:
+                return None
+        elif python_type is bool:
+            if isinstance(value, bool):
+                return value
+        elif python_type is int:
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+        elif python_type is float:
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+                return float(value)
+        elif python_type is str:
+            if isinstance(value, str) and len(value) <= (column.type.length or len(value)):
+                return value
+        elif python_type is datetime:
+            if isinstance(value, datetime):
+                return value
+            if isinstance(value, str):
+                try:
+                    return datetime.fromisoformat(value)
+                except ValueError:
+                    pass
+        raise ValueError(f"Invalid value for status field {field}: {value!r}")
+    
+    def update(self, values):
+        """
+        Set fields; a counter set here overrides increments not yet flushed
+        
+        Raises:
+            ValueError: If any value doesn't fit its column; nothing is set
+        """
+        values = {field: self.coerce(field, value) for field, value in values.items() if field in self.FIELDS}
+        if self._snapshot is None:
+            self.reload()
+        with self._lock:
+            for field, value in values.items():
+                self._snapshot[field] = value
+                self._assignments[field] = value
+                self._deltas.pop(field, None)
+    
+    def has_pending(self):
+        """True if there are changes not yet written to the database"""
+        with self._lock:
+            return bool(self._deltas or self._assignments)
+    
+    def flush(self):
+        """
+        Durably write pending changes to bot_status
+        
+        Returns:
+            bool: True if everything pending has been written (or dropped
+                because the database rejected it)
+        """
+        with self._flush_lock:
+            with self._lock:
+                deltas, self._deltas = self._deltas, {}
+                assignments, self._assignments = self._assignments, {}
+                row_id = self._row_id
+            if not deltas and not assignments:
+                return True
+            
+            try:
+                self._write(row_id, assignments, deltas)
+            except Exception as e:
+                if self._is_transient(e):
+                    logger.error(f"Failed to flush bot status: {e}")
+                    self._requeue(assignments, deltas)
+                    return False
+                # Something in this batch can't be stored; write the fields
+                # one at a time so only the bad ones are dropped
+                logger.error(f"Failed to flush bot status, writing fields separately: {e}")
+                assignments, deltas = self._write_each(row_id, assignments, deltas)
+                if assignments or deltas:
+                    self._requeue(assignments, deltas)
+                    return False
+        
+        for callback in self._flush_listeners:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Bot status flush listener failed: {e}")
+        return True
+    
+    def _write(self, row_id, assignments, deltas):
+        """Apply assignments and counter increments in one UPDATE"""
+        session = self._session_factory()
+        try:
+            changes = {getattr(BotStatus, field): value for field, value in assignments.items()}
+            for field, amount in deltas.items():
+                column = getattr(BotStatus, field)
+                changes[column] = column + amount
+            session.query(BotStatus).filter(BotStatus.id == row_id).update(changes, synchronize_session=False)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def _write_each(self, row_id, assignments, deltas):
+        """
+        Write changes field by field, dropping any the database rejects
+        
+        Returns:
+            tuple: (assignments, deltas) that failed transiently and should
+                be retried
+        """
+        retry_assignments, retry_deltas = {}, {}
+        for field, value in assignments.items():
+            try:
+                self._write(row_id, {field: value}, {})
+            except Exception as e:
+                if self._is_transient(e):
+                    retry_assignments[field] = value
+                else:
+                    logger.error(f"Dropping bot status {field}={value!r}: {e}")
+        for field, amount in deltas.items():
+            try:
+                self._write(row_id, {}, {field: amount})
+            except Exception as e:
+                if self._is_transient(e):
+                    retry_deltas[field] = amount
+                else:
+                    logger.error(f"Dropping bot status {field} increment of {amount}: {e}")
+        return retry_assignments, retry_deltas
+    
+    def _requeue(self, assignments, deltas):
+        """Put unwritten changes back underneath anything newer"""
+        with self._lock:
+            for field, value in assignments.items():
+                self._assignments.setdefault(field, value)
+            for field, amount in deltas.items():
+                if field in self._assignments:
+                    continue
+                self._deltas[field] = self._deltas.get(field, 0) + amount
+    
+    @staticmethod
+    def _is_transient(error):
+        """True for failures worth retrying, e.g. a lost connection or a locked database"""
+        return isinstance(error, OperationalError) or (
+            isinstance(error, DBAPIError) and error.connection_invalidated)
+    
+    def _flush_loop(self):
+        """Flush on an interval until stopped"""
+        while not self._stopped.wait(self.flush_interval):
+            if self.has_pending():
+                self.flush()
 
 class DBManager:
     """Database manager for the MT5 Signal Bot"""
@@ -21,10 +334,24 @@ class DBManager:
     def __init__(self):
         """Initialize the database manager"""
         self.Session = scoped_session(get_session)
+        # Signals already stored, so repeats can skip the database
+        self._recent_signal_keys = RecentKeyCache()
         # Initialize database if needed
         self._initialize_with_retry(init_db)
+        self._initialize_with_retry(run_migrations)
         # Initialize bot status if not exists
         self._init_bot_status()
+        # Status counters are aggregated in process and written behind
+        self.status = StatusAggregator(self.Session, config.STATUS_FLUSH_INTERVAL)
+        self.status.start()
+        # Signals past the retention window move to day archives
+        self.archive = SignalArchive(config.SIGNAL_ARCHIVE_PATH)
+        self._archive_owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._archive_claim = None
+        self._retention_stopped = threading.Event()
+        if config.SIGNAL_RETENTION_DAYS > 0:
+            threading.Thread(target=self._retention_loop, daemon=True).start()
+            atexit.register(self._retention_stopped.set)
     
     def _execute_with_retry(self, func, *args, **kwargs):
         """Execute a database operation with retry logic for transient errors"""
@@ -95,26 +422,83 @@ class DBManager:
         
         return self._execute_with_retry(_get_setting)
     
-    def save_settings(self, key, value):
-        """Save a setting value"""
-        def _save_setting():
+    def get_all_settings(self):
+        """
+        Load every setting in one query
+
+        Returns:
+            tuple: (dict of key -> value, settings version)
+        """
+        def _get_all_settings():
             session = self.Session()
             try:
-                setting = session.query(Settings).filter_by(key=key).first()
-                if setting:
-                    setting.value = value
-                else:
-                    setting = Settings(key=key, value=value)
-                    session.add(setting)
+                values = dict(session.query(Settings.key, Settings.value).all())
+                version = values.pop(SETTINGS_VERSION_KEY, None)
+                return values, int(version or 0)
+            finally:
+                session.close()
+        
+        return self._execute_with_retry(_get_all_settings)
+    
+    def get_settings_version(self):
+        """Current settings version, a cheap staleness check for cached settings"""
+        return int(self.get_settings(SETTINGS_VERSION_KEY) or 0)
+    
+    def _bump_settings_version(self, session):
+        """Increment the settings version inside the caller's transaction"""
+        row = session.query(Settings).filter_by(key=SETTINGS_VERSION_KEY).with_for_update().first()
+        if row is None:
+            row = Settings(key=SETTINGS_VERSION_KEY, value='0')
+            session.add(row)
+        row.value = str(int(row.value or 0) + 1)
+        return int(row.value)
+    
+    def save_all_settings(self, values, bump_version=True):
+        """
+        Save several settings in one transaction, writing only changed keys
+        
+        Args:
+            values (dict): Setting key -> string value
+            bump_version (bool): Increment the settings version if anything
+                changed; off for bookkeeping keys no cache depends on
+        
+        Returns:
+            bool: True if any value changed
+        """
+        values = {key: value for key, value in values.items() if key != SETTINGS_VERSION_KEY}
+        
+        def _save_all_settings():
+            session = self.Session()
+            try:
+                existing = {setting.key: setting for setting in
+                            session.query(Settings).filter(Settings.key.in_(list(values)))}
+                changed = False
+                for key, value in values.items():
+                    setting = existing.get(key)
+                    if setting is None:
+                        session.add(Settings(key=key, value=value))
+                        changed = True
+                    elif setting.value != value:
+                        setting.value = value
+                        changed = True
+                if changed and bump_version:
+                    self._bump_settings_version(session)
                 session.commit()
-                return True
+                return changed
             except Exception as e:
                 session.rollback()
                 raise e
             finally:
                 session.close()
         
-        return self._execute_with_retry(_save_setting)
+        if not values:
+            return False
+        return self._execute_with_retry(_save_all_settings)
+    
+    def save_settings(self, key, value, bump_version=True):
+        """Save a setting value"""
+        self.save_all_settings({key: value}, bump_version)
+        return True
     
     def delete_settings(self, key):
         """Delete a setting by key"""
@@ -124,6 +508,7 @@ class DBManager:
                 setting = session.query(Settings).filter_by(key=key).first()
                 if setting:
                     session.delete(setting)
+                    self._bump_settings_version(session)
                     session.commit()
                     return True
                 return False
@@ -164,7 +549,7 @@ class DBManager:
         
         return self._execute_with_retry(_get_all_presets)
     
-    def save_preset(self, name, parameters, description=None):
+    def save_preset(self, name, parameters, description=None, content_hash=None):
         """Save a preset"""
         def _save_preset():
             session = self.Session()
@@ -174,10 +559,12 @@ class DBManager:
                 
                 if preset:
                     preset.parameters = params_json
+                    preset.content_hash = content_hash
                     if description:
                         preset.description = description
                 else:
-                    preset = Preset(name=name, parameters=params_json, description=description)
+                    preset = Preset(name=name, parameters=params_json, description=description,
+                                    content_hash=content_hash)
                     session.add(preset)
                     
                 session.commit()
@@ -190,6 +577,49 @@ class DBManager:
                 
         return self._execute_with_retry(_save_preset)
     
+    def import_presets(self, presets):
+        """
+        Save presets read from files, skipping those stored unchanged
+        
+        Args:
+            presets (list): CompiledPreset objects
+            
+        Returns:
+            int: Number of presets inserted or updated
+        """
+        presets = {preset.name: preset for preset in presets}
+        if not presets:
+            return 0
+        
+        def _import_presets():
+            session = self.Session()
+            try:
+                stored = {row.name: row for row in
+                          session.query(Preset).filter(Preset.name.in_(list(presets)))}
+                written = 0
+                for name, preset in presets.items():
+                    row = stored.get(name)
+                    if row is not None and row.content_hash == preset.digest:
+                        continue
+                    if row is None:
+                        session.add(Preset(name=name, parameters=json.dumps(preset.parameters),
+                                           content_hash=preset.digest))
+                    else:
+                        row.parameters = json.dumps(preset.parameters)
+                        row.content_hash = preset.digest
+                    written += 1
+                session.commit()
+                return written
+            except Exception as e:
+                session.rollback()
+                raise e
+            finally:
+                session.close()
+        
+        written = self._execute_with_retry(_import_presets)
+        logger.info(f"Imported {written} new or changed presets of {len(presets)}")
+        return written
+    
     def delete_preset(self, name):
         """Delete a preset by name"""
         def _delete_preset():
@@ -210,57 +640,365 @@ class DBManager:
         return self._execute_with_retry(_delete_preset)
     
     # Signal methods
+    @staticmethod
+    def _signal_row(signal_data, dedup_key):
+        """Map incoming signal fields to a signals table row"""
+        # Extract sentiment data if present
+        sentiment_data = None
+        if 'sentiment' in signal_data:
+            sentiment_data = json.dumps(signal_data['sentiment'])
+        
+        return {
+            'symbol': signal_data['symbol'],
+            'direction': signal_data['direction'],
+            'strength': signal_data['strength'],
+            'entry_price': signal_data['entry_price'],
+            'stop_loss': signal_data.get('stop_loss'),
+            'take_profit': signal_data.get('take_profit'),
+            'reason': signal_data.get('reason'),
+            'sentiment_data': sentiment_data,
+            'created_at': datetime.now(),
+            'executed': False,
+            'dedup_key': dedup_key
+        }
+    
+    def _insert_signal_rows(self, session, rows):
+        """
+        Insert signal rows, skipping any whose dedup_key already exists
+        
+        Returns:
+            list: Ids of the rows actually inserted
+        """
+        table = Signal.__table__
+        dialect = session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            insert = None
+        
+        if insert is not None:
+            statement = (insert(table)
+                         .values(rows)
+                         .on_conflict_do_nothing(index_elements=[table.c.dedup_key])
+                         .returning(table.c.id))
+            return list(session.execute(statement).scalars())
+        
+        # Generic fallback: look the keys up first
+        keys = [row['dedup_key'] for row in rows if row['dedup_key']]
+        existing = set()
+        if keys:
+            existing = {key for (key,) in session.query(Signal.dedup_key).filter(Signal.dedup_key.in_(keys))}
+        ids = []
+        for row in rows:
+            if row['dedup_key'] in existing:
+                continue
+            signal = Signal(**row)
+            session.add(signal)
+            session.flush()
+            ids.append(signal.id)
+        return ids
+    
     def save_signal(self, signal_data):
-        """Save a signal"""
+        """
+        Save a signal unless it has been stored before
+        
+        Returns:
+            int: Id of the new row, or None if the signal was a duplicate
+        """
+        dedup_key = signal_dedup_key(signal_data)
+        if dedup_key and dedup_key in self._recent_signal_keys:
+            return None
+        
         def _save_signal():
             session = self.Session()
             try:
-                # Extract sentiment data if present
-                sentiment_data = None
-                if 'sentiment' in signal_data:
-                    sentiment_data = json.dumps(signal_data['sentiment'])
-                
-                signal = Signal(
-                    symbol=signal_data['symbol'],
-                    direction=signal_data['direction'],
-                    strength=signal_data['strength'],
-                    entry_price=signal_data['entry_price'],
-                    stop_loss=signal_data.get('stop_loss'),
-                    take_profit=signal_data.get('take_profit'),
-                    reason=signal_data.get('reason'),
-                    sentiment_data=sentiment_data
-                )
-                
-                session.add(signal)
-                
-                # Update status
-                status = session.query(BotStatus).first()
-                if status:
-                    status.total_signals_today += 1
-                    status.last_update = datetime.now()
-                
+                ids = self._insert_signal_rows(session, [self._signal_row(signal_data, dedup_key)])
+                session.commit()
+                return ids[0] if ids else None
+            except Exception as e:
+                session.rollback()
+                raise e
+            finally:
+                session.close()
+        
+        signal_id = self._execute_with_retry(_save_signal)
+        if signal_id is not None:
+            self.status.increment('total_signals_today')
+            self.status.update({'last_update': datetime.now()})
+        if dedup_key:
+            self._recent_signal_keys.add(dedup_key)
+        return signal_id
+    
+    def save_signals(self, batch, batch_id=None):
+        """
+        Save a batch of signals in a single transaction
+        
+        Duplicates (already stored, or repeated within the batch) are
+        skipped, and the status counter is bumped once for the whole batch.
+        
+        Args:
+            batch (list): Signal dicts
+            batch_id (str): Identifies the upstream reply the batch came
+                from (e.g. its GET_SIGNALS cursor), so signals with neither
+                time nor sequence number can be deduplicated by position
+            
+        Returns:
+            list: Ids of the newly inserted signals
+        """
+        rows = []
+        batch_keys = set()
+        for index, signal_data in enumerate(batch):
+            position = f"{batch_id}:{index}" if batch_id is not None else None
+            dedup_key = signal_dedup_key(signal_data, position)
+            if dedup_key:
+                if dedup_key in batch_keys or dedup_key in self._recent_signal_keys:
+                    continue
+                batch_keys.add(dedup_key)
+            rows.append(self._signal_row(signal_data, dedup_key))
+        
+        if not rows:
+            return []
+        
+        def _save_signals():
+            session = self.Session()
+            try:
+                ids = []
+                for start in range(0, len(rows), SIGNAL_INSERT_CHUNK):
+                    ids.extend(self._insert_signal_rows(session, rows[start:start + SIGNAL_INSERT_CHUNK]))
                 session.commit()
-                return signal.id
+                return ids
             except Exception as e:
                 session.rollback()
                 raise e
             finally:
                 session.close()
         
-        return self._execute_with_retry(_save_signal)
+        ids = self._execute_with_retry(_save_signals)
+        if ids:
+            # Update status once for the whole batch
+            self.status.increment('total_signals_today', len(ids))
+            self.status.update({'last_update': datetime.now()})
+        for dedup_key in batch_keys:
+            self._recent_signal_keys.add(dedup_key)
+        return ids
     
     def get_signals(self, limit=10):
-        """Get the latest signals"""
+        """Get the latest signals as SignalRecords"""
         def _get_signals():
             session = self.Session()
             try:
                 signals = session.query(Signal).order_by(Signal.created_at.desc()).limit(limit).all()
-                return [signal.to_dict() for signal in signals]
+                return [signal.to_record() for signal in signals]
             finally:
                 session.close()
         
         return self._execute_with_retry(_get_signals)
     
+    def get_signal(self, signal_id):
+        """Get a signal by id as a SignalRecord, None if it doesn't exist"""
+        def _get_signal():
+            session = self.Session()
+            try:
+                signal = session.get(Signal, signal_id)
+                return signal.to_record() if signal else None
+            finally:
+                session.close()
+        
+        return self._execute_with_retry(_get_signal)
+    
+    def iter_signal_history(self, cursor=None, limit=100, symbol=None, direction=None,
+                            executed=None, min_strength=None):
+        """
+        Stream one page of signal history, newest first
+
+        Pages are addressed by a (created_at, id) keyset cursor rather than
+        an OFFSET, so reading deep into the history costs the same as the
+        first page. Rows are fetched from the database cursor in batches
+        and converted one at a time. Once the signals table is exhausted
+        the page continues into the archived days.
+
+        Args:
+            cursor (str): Token returned with the previous page, None for the first
+            limit (int): Page size, capped at HISTORY_PAGE_MAX
+            symbol (str): Only this symbol
+            direction (str): Only BUY or SELL
+            executed (bool): Only executed / only pending signals
+            min_strength (int): Only signals at least this strong
+
+        Yields:
+            dict: Signal dictionaries
+
+        Returns:
+            str: Cursor for the next page, or None after the last page
+                (the generator's return value)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        limit = max(1, min(int(limit), HISTORY_PAGE_MAX))
+        position = decode_history_cursor(cursor) if cursor else None
+
+        last = None
+        count = 0
+        session = self.Session()
+        try:
+            query = session.query(Signal)
+            if position:
+                query = query.filter(tuple_(Signal.created_at, Signal.id) < tuple_(*position))
+            if symbol:
+                query = query.filter(Signal.symbol == symbol)
+            if direction:
+                query = query.filter(Signal.direction == direction)
+            if executed is not None:
+                query = query.filter(Signal.executed == executed)
+            if min_strength is not None:
+                query = query.filter(Signal.strength >= min_strength)
+            # One extra row tells whether another page follows
+            query = query.order_by(Signal.created_at.desc(), Signal.id.desc()).limit(limit + 1)
+
+            for signal in query.yield_per(HISTORY_FETCH_SIZE):
+                if count == limit:
+                    return encode_history_cursor(last.created_at, last.id)
+                last = signal
+                count += 1
+                yield signal.to_dict()
+        finally:
+            session.close()
+
+        # Everything archived is older than what is left in the table
+        before = (last.created_at, last.id) if last else position
+        for signal in self.archive.iter_signals(before, symbol, direction, executed, min_strength):
+            if count == limit:
+                return encode_history_cursor(last.created_at, last.id)
+            last = signal
+            count += 1
+            yield signal.to_dict()
+        return None
+    
+    def archive_old_signals(self, retention_days=None):
+        """
+        Move signals older than the retention window to the day archives
+
+        One day is handled per transaction: its rows are written to the
+        archive file first and only deleted from the table once the file is
+        on disk. If the delete fails the rows are archived again next time,
+        which merges by id. Only one worker archives at a time, through a
+        claim row in the settings table; the others return 0 meanwhile.
+        Archived signals no longer hold their dedup_key in the unique
+        index, so the window should comfortably exceed how far back the EA
+        can replay signals.
+
+        Args:
+            retention_days (int): Days kept in the table, defaults to
+                config.SIGNAL_RETENTION_DAYS; 0 keeps everything
+
+        Returns:
+            int: Number of signals archived
+        """
+        if retention_days is None:
+            retention_days = config.SIGNAL_RETENTION_DAYS
+        if retention_days <= 0:
+            return 0
+        cutoff = retention_cutoff(retention_days)
+
+        def _archive_oldest_day():
+            session = self.Session()
+            try:
+                oldest = session.query(func.min(Signal.created_at)).filter(Signal.created_at < cutoff).scalar()
+                if oldest is None:
+                    return 0
+                day_start = oldest.replace(hour=0, minute=0, second=0, microsecond=0)
+                window = (Signal.created_at >= day_start, Signal.created_at < day_start + timedelta(days=1))
+                records = [row_to_record(signal) for signal in session.query(Signal).filter(*window)]
+                self.archive.write_partition(day_start.date(), records)
+                session.query(Signal).filter(*window).delete(synchronize_session=False)
+                session.commit()
+                logger.info(f"Archived {len(records)} signals from {day_start.date()}")
+                return len(records)
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+        archived = 0
+        try:
+            # The claim is renewed before each day
+            while self._claim_archive():
+                count = self._execute_with_retry(_archive_oldest_day)
+                if not count:
+                    break
+                archived += count
+        finally:
+            self._release_archive()
+        return archived
+
+    def _claim_archive(self):
+        """
+        Claim or renew the right to archive signals for this worker
+
+        Returns:
+            bool: False if another worker holds an unexpired claim
+        """
+        def _claim():
+            session = self.Session()
+            try:
+                if session.query(Settings.id).filter_by(key=ARCHIVE_CLAIM_KEY).first() is None:
+                    session.add(Settings(key=ARCHIVE_CLAIM_KEY, value=''))
+                    try:
+                        session.commit()
+                    except IntegrityError:
+                        # Another worker created the row first
+                        session.rollback()
+                now = datetime.now()
+                expires = (now + timedelta(seconds=ARCHIVE_CLAIM_TTL)).isoformat(timespec='seconds')
+                claim = f"{expires}|{self._archive_owner}"
+                # Expired claims (and the empty released one) sort before now
+                available = Settings.value < now.isoformat(timespec='seconds')
+                if self._archive_claim:
+                    available = available | (Settings.value == self._archive_claim)
+                claimed = session.query(Settings).filter(Settings.key == ARCHIVE_CLAIM_KEY, available).update(
+                    {Settings.value: claim}, synchronize_session=False)
+                session.commit()
+                self._archive_claim = claim if claimed == 1 else None
+                return claimed == 1
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+        return self._execute_with_retry(_claim)
+
+    def _release_archive(self):
+        """Give up this worker's archive claim, if it holds one"""
+        if not self._archive_claim:
+            return
+        session = self.Session()
+        try:
+            session.query(Settings).filter(Settings.key == ARCHIVE_CLAIM_KEY,
+                                           Settings.value == self._archive_claim).update(
+                {Settings.value: ''}, synchronize_session=False)
+            session.commit()
+            self._archive_claim = None
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.warning(f"Failed to release the signal archive claim: {e}")
+        finally:
+            session.close()
+
+    def _retention_loop(self):
+        """Archive aged signals on an interval until shutdown"""
+        while True:
+            try:
+                self.archive_old_signals()
+            except Exception as e:
+                logger.error(f"Signal archival failed: {e}")
+            if self._retention_stopped.wait(config.SIGNAL_ARCHIVE_INTERVAL):
+                return
+    
     def update_signal_execution(self, signal_id, executed=True):
         """Update signal execution status"""
         def _update_signal_execution():
@@ -270,13 +1008,6 @@ class DBManager:
                 if signal:
                     signal.executed = executed
                     signal.execution_time = datetime.now() if executed else None
-                    
-                    # Update status
-                    if executed:
-                        status = session.query(BotStatus).first()
-                        if status:
-                            status.total_trades_today += 1
-                    
                     session.commit()
                     return True
                 return False
@@ -286,68 +1017,91 @@ class DBManager:
             finally:
                 session.close()
         
-        return self._execute_with_retry(_update_signal_execution)
+        updated = self._execute_with_retry(_update_signal_execution)
+        
+        # Update status
+        if updated and executed:
+            self.status.increment('total_trades_today')
+        return updated
     
-    # Status methods
-    def get_status(self):
-        """Get the current bot status"""
-        def _get_status():
+    # Dead-letter notification methods
+    def save_dead_letter(self, channel, payload, error, attempts):
+        """Persist a notification that ran out of delivery attempts"""
+        def _save_dead_letter():
             session = self.Session()
             try:
-                status = session.query(BotStatus).first()
-                if status:
-                    return status.to_dict()
-                return {}
+                dead_letter = DeadLetterNotification(channel=channel, payload=json.dumps(payload),
+                                                     error=error, attempts=attempts)
+                session.add(dead_letter)
+                session.commit()
+                return dead_letter.id
+            except Exception as e:
+                session.rollback()
+                raise e
             finally:
                 session.close()
         
-        return self._execute_with_retry(_get_status)
+        return self._execute_with_retry(_save_dead_letter)
     
-    def update_status(self, status_data):
-        """Update bot status"""
-        def _update_status():
+    def get_dead_letters(self, limit=100):
+        """Get the most recent undelivered notifications"""
+        def _get_dead_letters():
             session = self.Session()
             try:
-                status = session.query(BotStatus).first()
-                if not status:
-                    status = BotStatus()
-                    session.add(status)
-                
-                # Update status fields
-                for key, value in status_data.items():
-                    if hasattr(status, key):
-                        setattr(status, key, value)
-                
-                status.last_update = datetime.now()
-                session.commit()
-                return True
-            except Exception as e:
-                session.rollback()
-                raise e
+                dead_letters = (session.query(DeadLetterNotification)
+                                .order_by(DeadLetterNotification.id.desc()).limit(limit).all())
+                return [dead_letter.to_dict() for dead_letter in dead_letters]
             finally:
                 session.close()
         
-        return self._execute_with_retry(_update_status)
+        return self._execute_with_retry(_get_dead_letters)
     
-    def reset_daily_counts(self):
-        """Reset daily trade and signal counts"""
-        def _reset_counts():
+    def delete_dead_letters(self, ids):
+        """Delete dead letters, e.g. once they have been re-queued"""
+        def _delete_dead_letters():
             session = self.Session()
             try:
-                status = session.query(BotStatus).first()
-                if status:
-                    status.total_trades_today = 0
-                    status.total_signals_today = 0
-                    session.commit()
-                    return True
-                return False
+                count = (session.query(DeadLetterNotification)
+                         .filter(DeadLetterNotification.id.in_(list(ids))).delete(synchronize_session=False))
+                session.commit()
+                return count
             except Exception as e:
                 session.rollback()
                 raise e
             finally:
                 session.close()
         
-        return self._execute_with_retry(_reset_counts)
+        return self._execute_with_retry(_delete_dead_letters)
+    
+    # Status methods
+    def get_status(self):
+        """Get the current bot status, including changes not yet flushed"""
+        status = self._execute_with_retry(self.status.snapshot)
+        if not status:
+            return {}
+        status['last_update'] = status['last_update'].strftime("%Y-%m-%d %H:%M:%S")
+        return status
+    
+    def update_status(self, status_data):
+        """
+        Update bot status (written behind, see flush_status)
+        
+        Raises:
+            ValueError: If a value doesn't fit its column
+        """
+        values = {key: value for key, value in status_data.items() if key in StatusAggregator.FIELDS}
+        values['last_update'] = datetime.now()
+        self._execute_with_retry(self.status.update, values)
+        return True
+    
+    def reset_daily_counts(self):
+        """Reset daily trade and signal counts"""
+        self._execute_with_retry(self.status.update, {'total_trades_today': 0, 'total_signals_today': 0})
+        return True
+    
+    def flush_status(self):
+        """Durably write any pending status changes now"""
+        return self.status.flush()
     
     # Initial data loading
     def import_presets_from_files(self, presets_path):
@@ -355,29 +1109,19 @@ class DBManager:
         if not os.path.exists(presets_path):
             return False
         
-        # Get all .set files in the presets directory
-        preset_files = [f for f in os.listdir(presets_path) if f.endswith('.set')]
-        
-        for preset_file in preset_files:
-            preset_name = os.path.splitext(preset_file)[0]
-            preset_data = {}
-            
-            try:
-                with open(os.path.join(presets_path, preset_file), 'r') as file:
-                    for line in file:
-                        line = line.strip()
-                        # Skip comments and empty lines
-                        if line.startswith('#') or not line:
-                            continue
-                        if '=' in line:
-                            key, value = line.split('=', 1)
-                            preset_data[key.strip()] = value.strip()
-                
-                self.save_preset(preset_name, preset_data)
-            except Exception as e:
-                print(f"Error importing preset {preset_name}: {e}")
+        self.import_presets(PresetRegistry(presets_path).scan())
         
         return True
 
-# Create a singleton instance
-db_manager = DBManager()
\ No newline at end of file
+# Singleton instance, created on first use so importing this module does
+# not touch the database
+_db_manager = None
+_db_manager_lock = threading.Lock()
+
+def get_db_manager():
+    """Get or create the shared database manager"""
+    global _db_manager
+    with _db_manager_lock:
+        if _db_manager is None:
+            _db_manager = DBManager()
+        return _db_manager
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Schema migrations for the MT5 Signal Bot database
+Base.metadata.create_all() only creates missing tables; these steps bring
+tables created by older versions up to date. Every step checks the live
+schema first, so running them repeatedly is safe.
+
+Run with: python db_migrations.py
+"""
+
+import logging
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
+
+from db_models import engine, Preset, Signal
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def _add_column_if_missing(connection, table, column):
+    """Add a model column to an existing table"""
+    existing = {col['name'] for col in inspect(connection).get_columns(table.name)}
+    if column.name in existing:
+        return False
+    column_type = column.type.compile(dialect=connection.dialect)
+    connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+    logger.info(f"Added column {table.name}.{column.name}")
+    return True
+
+
+def _postgres_index_valid(connection, name):
+    """True/False for an existing PostgreSQL index, None if it doesn't exist"""
+    return connection.execute(text(
+        'SELECT i.indisvalid FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid '
+        'WHERE c.relname = :name'
+    ), {'name': name}).scalar()
+
+
+def _create_index_if_missing(connection, index):
+    """
+    Create a model index on an existing table
+
+    On PostgreSQL the index is built CONCURRENTLY so a large signals table
+    stays writable meanwhile; that needs an autocommit connection, and an
+    index left invalid by an interrupted build is dropped and rebuilt.
+    """
+    if connection.dialect.name == 'postgresql':
+        valid = _postgres_index_valid(connection, index.name)
+        if valid:
+            return False
+        if valid is False:
+            connection.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS {index.name}'))
+        ddl = str(CreateIndex(index).compile(dialect=connection.dialect))
+        ddl = ddl.replace('INDEX', 'INDEX CONCURRENTLY', 1)
+        connection.execute(text(ddl))
+    else:
+        existing = {idx['name'] for idx in inspect(connection).get_indexes(index.table.name)}
+        if index.name in existing:
+            return False
+        index.create(connection)
+    logger.info(f"Created index {index.name}")
+    return True
+
+
+def _index(table, name):
+    """Look up a model index by name"""
+    return next(index for index in table.indexes if index.name == name)
+
+
+def add_signal_dedup_key(connection):
+    """Natural-key column used for idempotent signal ingestion"""
+    table = Signal.__table__
+    _add_column_if_missing(connection, table, table.c.dedup_key)
+
+
+def add_signal_indexes(connection):
+    """Dedup key, latest-first, per-symbol and pending-signal indexes"""
+    for name in ('uq_signals_dedup_key', 'ix_signals_created_at',
+                 'ix_signals_symbol_created_at', 'ix_signals_pending_created_at'):
+        _create_index_if_missing(connection, _index(Signal.__table__, name))
+
+
+def use_signal_autoincrement(connection):
+    """
+    Stop SQLite from reusing the ids of archived signals
+
+    Without AUTOINCREMENT SQLite hands out max(id) + 1, so once the newest
+    rows have been archived their ids come back. The table can't be
+    altered in place; it is rebuilt and the rows copied, which also seeds
+    the sequence with the highest id kept.
+    """
+    if connection.dialect.name != 'sqlite':
+        return
+    table = Signal.__table__
+    ddl = connection.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"
+    ), {'name': table.name}).scalar()
+    if ddl is None or 'AUTOINCREMENT' in ddl.upper():
+        return
+    # The new table recreates the indexes under the same names
+    for index in inspect(connection).get_indexes(table.name):
+        connection.execute(text(f'DROP INDEX {index["name"]}'))
+    connection.execute(text(f'ALTER TABLE {table.name} RENAME TO {table.name}_old'))
+    table.create(connection)
+    columns = ', '.join(column.name for column in table.columns)
+    connection.execute(text(f'INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {table.name}_old'))
+    connection.execute(text(f'DROP TABLE {table.name}_old'))
+    logger.info(f"Rebuilt {table.name} with AUTOINCREMENT ids")
+
+
+def add_preset_content_hash(connection):
+    """Source file hash used to skip re-importing unchanged presets"""
+    table = Preset.__table__
+    _add_column_if_missing(connection, table, table.c.content_hash)
+
+
+# Applied in order: (step, runs inside a transaction)
+MIGRATIONS = [
+    (add_signal_dedup_key, True),
+    (add_signal_indexes, False),
+    (use_signal_autoincrement, True),
+    (add_preset_content_hash, True),
+]
+
+
+def run_migrations(bind=None):
+    """Apply every migration step"""
+    bind = bind or engine
+    for migration, transactional in MIGRATIONS:
+        if transactional:
+            with bind.begin() as connection:
+                migration(connection)
+        else:
+            with bind.connect() as connection:
+                migration(connection.execution_options(isolation_level="AUTOCOMMIT"))
+    return True
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    run_migrations()
+    logger.info("Database schema is up to date")
@@ -1,11 +1,13 @@
 import os
 import json
 import time
+import hashlib
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy.pool import QueuePool
+from signal_record import SignalRecord
 
 # Get database URL from environment variable
 DATABASE_URL = os.environ.get('DATABASE_URL')
@@ -75,6 +77,7 @@ class Preset(Base):
     name = Column(String(255), unique=True, nullable=False)
     description = Column(Text, nullable=True)
     parameters = Column(Text, nullable=False)  # JSON string
+    content_hash = Column(String(40), nullable=True)  # SHA-1 of the source .set file
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     
@@ -101,6 +104,22 @@ class Signal(Base):
     created_at = Column(DateTime, default=datetime.now)
     executed = Column(Boolean, default=False)
     execution_time = Column(DateTime, nullable=True)
+    # Natural key of the upstream signal, see signal_dedup_key()
+    dedup_key = Column(String(40), nullable=True)
+    
+    __table_args__ = (
+        Index('uq_signals_dedup_key', 'dedup_key', unique=True),
+        # Latest-first listings (get_signals, history paging)
+        Index('ix_signals_created_at', created_at.desc(), id.desc()),
+        # Per-symbol time range queries
+        Index('ix_signals_symbol_created_at', symbol, created_at),
+        # Signals still waiting to be executed
+        Index('ix_signals_pending_created_at', created_at,
+              postgresql_where=(executed == False),  # noqa: E712
+              sqlite_where=(executed == False)),  # noqa: E712
+        # Ids of archived signals must not be handed out again
+        {'sqlite_autoincrement': True},
+    )
     
     def to_dict(self):
         """Convert signal to dictionary"""
@@ -126,9 +145,67 @@ class Signal(Base):
                 
         return signal_dict
     
+    def to_record(self):
+        """Convert signal to a compact SignalRecord (same content as to_dict)"""
+        sentiment = None
+        if self.sentiment_data:
+            try:
+                sentiment = json.loads(self.sentiment_data)
+            except ValueError:
+                sentiment = {}
+        return SignalRecord(
+            id=self.id,
+            symbol=self.symbol,
+            direction=self.direction,
+            strength=self.strength,
+            entry_price=self.entry_price,
+            stop_loss=self.stop_loss,
+            take_profit=self.take_profit,
+            reason=self.reason,
+            time=self.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            executed=self.executed,
+            sentiment=sentiment
+        )
+    
     def __repr__(self):
         return f"<Signal(symbol='{self.symbol}', direction='{self.direction}', created_at='{self.created_at}')>"
 
+def signal_dedup_key(signal_data, batch_position=None):
+    """
+    Natural key identifying an upstream signal
+    
+    An explicit 'dedup_key' wins; otherwise the key is a hash of symbol,
+    direction, entry price and the signal time, or the EA sequence number
+    for signals without a time. Signals with neither are identified by
+    their `batch_position`, if given; otherwise they get no key and are
+    never treated as duplicates.
+    
+    Args:
+        signal_data (dict): Signal fields
+        batch_position (str): Where the signal appeared upstream, e.g. the
+            GET_SIGNALS cursor and its index in the reply
+        
+    Returns:
+        str: 40-character key, or None
+    """
+    if signal_data.get('dedup_key'):
+        return str(signal_data['dedup_key'])[:40]
+    if signal_data.get('time'):
+        marker = str(signal_data['time'])
+    elif signal_data.get('seq') is not None:
+        marker = f"seq:{signal_data['seq']}"
+    elif batch_position is not None:
+        marker = f"batch:{batch_position}"
+    else:
+        return None
+    natural_key = "|".join([
+        str(signal_data['symbol']),
+        str(signal_data['direction']),
+        f"{float(signal_data['entry_price']):.5f}",
+        marker
+    ])
+    return hashlib.sha1(natural_key.encode('utf-8')).hexdigest()
+
 class BotStatus(Base):
     """Model for storing bot status"""
     __tablename__ = 'bot_status'
@@ -157,6 +234,31 @@ class BotStatus(Base):
     def __repr__(self):
         return f"<BotStatus(running={self.running}, connected={self.connected}, last_update='{self.last_update}')>"
 
+class DeadLetterNotification(Base):
+    """Model for notifications that could not be delivered"""
+    __tablename__ = 'dead_letter_notifications'
+    
+    id = Column(Integer, primary_key=True)
+    channel = Column(String(20), nullable=False)  # email, telegram
+    payload = Column(Text, nullable=False)  # JSON signal
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.now)
+    
+    def to_dict(self):
+        """Convert dead letter to dictionary"""
+        return {
+            'id': self.id,
+            'channel': self.channel,
+            'payload': json.loads(self.payload),
+            'error': self.error,
+            'attempts': self.attempts,
+            'created_at': self.created_at.strftime("%Y-%m-%d %H:%M:%S")
+        }
+    
+    def __repr__(self):
+        return f"<DeadLetterNotification(channel='{self.channel}', attempts={self.attempts})>"
+
 # Create all tables
 def init_db():
     Base.metadata.create_all(engine)
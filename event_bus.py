@@ -0,0 +1,359 @@
+"""
+Event Bus for the MT5 Signal Bot
+Carries cache invalidations between web worker processes: each worker
+reloads the named caches and pushes the changes to its own dashboards,
+so a signal saved in one worker reaches every other. The local backend
+only delivers inside the current process (single-worker deployments);
+the PostgreSQL backend fans events out with LISTEN/NOTIFY on the
+database the workers already share, and the socket backend sends them
+as Unix datagrams to the other workers on the same host (e.g. on SQLite).
+"""
+
+import atexit
+import base64
+import hashlib
+import json
+import logging
+import os
+import select
+import socket
+import tempfile
+import threading
+import uuid
+import zlib
+from collections import defaultdict
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# NOTIFY payloads must stay under 8000 bytes
+NOTIFY_PAYLOAD_MAX = 7900
+# Largest datagram the socket backend sends
+DATAGRAM_PAYLOAD_MAX = 64 * 1024
+# Bus topic telling subscribers to reload cached data
+INVALIDATE_TOPIC = 'invalidate'
+
+
+class LocalEventBus:
+    """
+    In-process publish/subscribe
+
+    Subscribers are called synchronously on the publishing thread. Other
+    backends extend this with delivery to other processes.
+    """
+
+    def __init__(self):
+        """Initialize an empty bus"""
+        # Identifies this process in messages sent to other workers
+        self.origin = uuid.uuid4().hex
+        self._subscribers = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic, callback):
+        """
+        Register a callback for a topic
+
+        Args:
+            topic (str): Topic name
+            callback (callable): Called with the published data
+        """
+        with self._lock:
+            self._subscribers[topic].append(callback)
+
+    def publish(self, topic, data=None, local=True):
+        """
+        Publish an event
+
+        Args:
+            topic (str): Topic name
+            data: JSON-serialisable event data
+            local (bool): Also deliver to this process's subscribers; off
+                when the caller has already applied the change itself
+        """
+        if local:
+            self._deliver(topic, data)
+
+    def _deliver(self, topic, data):
+        """Call every subscriber of a topic"""
+        with self._lock:
+            callbacks = list(self._subscribers.get(topic, ()))
+        for callback in callbacks:
+            try:
+                callback(data)
+            except Exception as e:
+                logger.error(f"Event bus subscriber for {topic} failed: {e}")
+
+    def start(self):
+        """Start delivering events from other processes"""
+
+    def stop(self):
+        """Stop delivering events from other processes"""
+
+
+class CrossProcessEventBus(LocalEventBus):
+    """
+    Base for buses that also deliver to other processes
+
+    Events are sent as JSON tagged with this process's origin, compressed
+    when they would exceed `PAYLOAD_MAX`; subclasses implement _send().
+    """
+
+    PAYLOAD_MAX = NOTIFY_PAYLOAD_MAX
+
+    def publish(self, topic, data=None, local=True):
+        """Publish an event to this and every other process"""
+        super().publish(topic, data, local)
+        payload = self._encode({"origin": self.origin, "topic": topic, "data": data})
+        if payload is None:
+            logger.error(f"Event {topic} is too large to send to other workers")
+            return
+        try:
+            self._send(payload)
+        except Exception as e:
+            logger.error(f"Failed to publish {topic} to other workers: {e}")
+
+    def _send(self, payload):
+        """Deliver an encoded event to the other processes"""
+        raise NotImplementedError
+
+    @classmethod
+    def _encode(cls, message):
+        """JSON payload, compressed when it would not fit in PAYLOAD_MAX"""
+        payload = json.dumps(message, separators=(',', ':'))
+        if len(payload.encode('utf-8')) <= cls.PAYLOAD_MAX:
+            return payload
+        payload = 'z:' + base64.b64encode(zlib.compress(payload.encode('utf-8'))).decode('ascii')
+        return payload if len(payload) <= cls.PAYLOAD_MAX else None
+
+    @staticmethod
+    def _decode(payload):
+        if payload.startswith('z:'):
+            payload = zlib.decompress(base64.b64decode(payload[2:])).decode('utf-8')
+        return json.loads(payload)
+
+    def _receive(self, payload):
+        """Deliver an event from another process"""
+        try:
+            message = self._decode(payload)
+        except (ValueError, zlib.error) as e:
+            logger.warning(f"Discarding malformed event bus payload: {e}")
+            return
+        if not isinstance(message, dict) or message.get("origin") == self.origin:
+            # Already delivered locally when it was published
+            return
+        self._deliver(message.get("topic"), message.get("data"))
+
+
+class PostgresEventBus(CrossProcessEventBus):
+    """
+    Cross-process bus on PostgreSQL LISTEN/NOTIFY
+
+    One dedicated connection, detached from the pool, listens on the
+    channel; publishing is a pg_notify() on a pooled connection.
+    Notifications are delivered by PostgreSQL only after the publishing
+    transaction commits and never survive a dropped listener, so after
+    reconnecting the bus tells local subscribers to reload everything.
+    """
+
+    def __init__(self, engine, channel='mt5_signal_bot', poll_interval=5.0):
+        """
+        Args:
+            engine (Engine): SQLAlchemy engine for the shared database
+            channel (str): NOTIFY channel name
+            poll_interval (float): Seconds between checks for shutdown
+        """
+        super().__init__()
+        self.engine = engine
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the listener thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._listen_loop, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the listener thread"""
+        self._stopped.set()
+
+    def _send(self, payload):
+        """NOTIFY the channel from a pooled connection"""
+        from sqlalchemy import text
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT pg_notify(:channel, :payload)"),
+                               {"channel": self.channel, "payload": payload})
+            connection.commit()
+
+    def _listen_loop(self):
+        """Listen for notifications, reconnecting with backoff"""
+        delay = 1.0
+        first = True
+        while not self._stopped.is_set():
+            connection = None
+            try:
+                connection = self.engine.raw_connection()
+                connection.detach()
+                dbapi_connection = connection.driver_connection
+                dbapi_connection.autocommit = True
+                with dbapi_connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                logger.info(f"Listening for events on {self.channel}")
+                if not first:
+                    # Events sent while disconnected are lost
+                    self._deliver(INVALIDATE_TOPIC, None)
+                first = False
+                delay = 1.0
+
+                while not self._stopped.is_set():
+                    if select.select([dbapi_connection], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    dbapi_connection.poll()
+                    while dbapi_connection.notifies:
+                        self._receive(dbapi_connection.notifies.pop(0).payload)
+            except Exception as e:
+                logger.error(f"Event bus listener failed: {e}")
+                self._stopped.wait(delay)
+                delay = min(delay * 2, 30.0)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+
+class SocketEventBus(CrossProcessEventBus):
+    """
+    Cross-process bus on Unix datagram sockets, for workers on one host
+
+    Every process binds a socket in a shared directory; publishing sends
+    the event to each other socket found there. Sockets left behind by
+    processes that have exited are removed when a send to them is
+    refused. A datagram that doesn't fit a receiver's queue is dropped
+    with an error, like an oversized event.
+    """
+
+    PAYLOAD_MAX = DATAGRAM_PAYLOAD_MAX
+
+    def __init__(self, path, poll_interval=1.0):
+        """
+        Args:
+            path (str): Directory shared by the workers' sockets
+            poll_interval (float): Seconds between checks for shutdown
+        """
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self.address = os.path.join(path, f"{self.origin[:16]}.sock")
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+        self._socket = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Bind this process's socket and start the receiver thread"""
+        if self._thread is None:
+            os.makedirs(self.path, mode=0o700, exist_ok=True)
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._socket.bind(self.address)
+            self._socket.settimeout(self.poll_interval)
+            self._thread = threading.Thread(target=self._receive_loop, daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+            logger.info(f"Exchanging events with other workers through {self.path}")
+
+    def stop(self):
+        """Stop receiving and remove this process's socket"""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(self.poll_interval * 2)
+        for sock in (self._socket, self._sender):
+            if sock is not None:
+                sock.close()
+        try:
+            os.remove(self.address)
+        except OSError:
+            pass
+
+    def _send(self, payload):
+        """Send the event to every other worker's socket"""
+        data = payload.encode('utf-8')
+        try:
+            names = os.listdir(self.path)
+        except FileNotFoundError:
+            return
+        for name in names:
+            address = os.path.join(self.path, name)
+            if not name.endswith('.sock') or address == self.address:
+                continue
+            try:
+                self._sender.sendto(data, address)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Its process has exited
+                try:
+                    os.remove(address)
+                except OSError:
+                    pass
+            except OSError as e:
+                logger.error(f"Failed to send an event to {name}: {e}")
+
+    def _receive_loop(self):
+        """Deliver datagrams from other workers until stopped"""
+        while not self._stopped.is_set():
+            try:
+                data = self._socket.recv(self.PAYLOAD_MAX + 1)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if not self._stopped.is_set():
+                    logger.error(f"Event bus receiver failed: {e}")
+                return
+            self._receive(data.decode('utf-8', 'replace'))
+
+
+def default_socket_path(engine):
+    """Socket directory shared by every worker using the same database"""
+    database = str(engine.url)
+    if engine.dialect.name == 'sqlite' and engine.url.database:
+        database = os.path.abspath(engine.url.database)
+    digest = hashlib.sha1(database.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"mt5-signal-bot-{digest}")
+
+
+def create_event_bus(backend, engine, path=None):
+    """
+    Build the configured event bus
+
+    Args:
+        backend (str): "local", "postgres", "socket", or "auto" (postgres
+            when the database is PostgreSQL, otherwise socket where Unix
+            sockets are available)
+        engine (Engine): SQLAlchemy engine of the application database
+        path (str): Socket directory for the socket backend, defaults to
+            one derived from the database URL
+
+    Returns:
+        LocalEventBus: The bus, not yet started
+    """
+    if backend == 'auto':
+        if engine.dialect.name == 'postgresql':
+            backend = 'postgres'
+        elif hasattr(socket, 'AF_UNIX'):
+            backend = 'socket'
+        else:
+            logger.warning("No cross-process event bus available; with more than one web worker, "
+                           "caches and dashboards of the other workers will go stale")
+            backend = 'local'
+    if backend == 'postgres':
+        return PostgresEventBus(engine)
+    if backend == 'socket':
+        return SocketEventBus(path or default_socket_path(engine))
+    if backend != 'local':
+        logger.warning(f"Unknown event bus backend {backend}, using local")
+    return LocalEventBus()
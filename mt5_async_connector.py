@@ -0,0 +1,232 @@
+"""
+Asyncio MT5 Connector Module for Signal Bot
+Speaks the same null-terminated JSON protocol as mt5_connector.MT5Connector,
+but on asyncio streams so one event loop can watch many MT5 terminals
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+from datetime import datetime
+
+from mt5_protocol import MAX_FRAME_SIZE, decode_frame, encode_frame
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class AsyncMT5Connector:
+    """
+    Asyncio counterpart of MT5Connector
+
+    Requests are multiplexed by id over one connection: any number of
+    coroutines may await commands concurrently, and a single reader task
+    routes each response to the future waiting on it.
+    """
+
+    def __init__(self, host="127.0.0.1", port=5555, timeout=10):
+        """Initialize the MT5 connection settings"""
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.connected = False
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+        self._pending = {}  # request id -> Future, in send order
+        self._request_ids = itertools.count(1)
+        self._connect_lock = None
+        self._peer_echoes_ids = False
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.disconnect()
+
+    async def connect(self):
+        """Establish connection to the MT5 Expert Advisor socket server"""
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self.connected:
+                return True
+            try:
+                self._reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port, limit=MAX_FRAME_SIZE),
+                    timeout=self.timeout
+                )
+                self.connected = True
+                self._reader_task = asyncio.create_task(self._reader_loop(self._reader))
+                logger.info(f"Connected to MT5 Signal Bot at {self.host}:{self.port}")
+                return True
+            except (OSError, asyncio.TimeoutError) as e:
+                logger.error(f"Failed to connect to MT5: {str(e) or type(e).__name__}")
+                self.connected = False
+                return False
+
+    async def disconnect(self):
+        """Close the connection to MT5"""
+        writer = self._writer
+        self._writer = None
+        self.connected = False
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+        self._fail_pending(ConnectionError("Connection to MT5 closed"))
+        logger.info("Disconnected from MT5")
+
+    def _fail_pending(self, error):
+        """Resolve all outstanding requests with an error"""
+        pending = list(self._pending.values())
+        self._pending.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(error)
+
+    async def send_command(self, command, params=None):
+        """
+        Send a command to MT5 and await the response
+
+        Cancelling the awaiting task abandons the request; its response is
+        dropped when it arrives.
+
+        Args:
+            command (str): Command to send (SET_SETTINGS, GET_SIGNALS, etc.)
+            params (dict): Optional parameters for the command
+
+        Returns:
+            dict: Response from MT5 or error information
+        """
+        if not self.connected:
+            if not await self.connect():
+                return {"error": "Not connected to MT5"}
+
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+
+        # Prepare the message
+        message = {
+            "id": request_id,
+            "command": command,
+            "params": params or {},
+            "timestamp": datetime.now().isoformat()
+        }
+        self._pending[request_id] = future
+
+        try:
+            self._writer.write(encode_frame(json.dumps(message)))
+            await self._writer.drain()
+            return await asyncio.wait_for(future, timeout=self.timeout)
+
+        except asyncio.TimeoutError:
+            logger.error(f"MT5 command {command} (id {request_id}) timed out")
+            if not self._peer_echoes_ids:
+                # Without ids a late reply would be handed to the next request
+                await self.disconnect()
+            return {"error": "Connection timeout"}
+
+        except (ConnectionError, OSError) as e:
+            logger.error(f"Error communicating with MT5: {str(e)}")
+            await self.disconnect()
+            return {"error": str(e)}
+
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _reader_loop(self, reader):
+        """
+        Read null-terminated responses from MT5 and dispatch them
+
+        Args:
+            reader (asyncio.StreamReader): Stream owned by this task
+        """
+        try:
+            while True:
+                frame = await reader.readuntil(b'\0')
+                self._dispatch_response(frame[:-1])
+        except asyncio.IncompleteReadError:
+            logger.info("MT5 closed the connection")
+        except asyncio.LimitOverrunError:
+            logger.error(f"MT5 response exceeded {MAX_FRAME_SIZE} bytes")
+        except asyncio.CancelledError:
+            raise
+        except OSError as e:
+            logger.error(f"MT5 connection lost: {str(e)}")
+        if reader is self._reader:
+            self.connected = False
+            self._fail_pending(ConnectionError("Connection to MT5 closed"))
+
+    def _dispatch_response(self, frame):
+        """
+        Resolve the pending request a response frame belongs to
+
+        Args:
+            frame (bytes): Response payload without the null terminator
+        """
+        response_str = decode_frame(frame)
+        request_id = None
+
+        if response_str:
+            try:
+                response = json.loads(response_str)
+                if isinstance(response, dict) and "id" in response:
+                    request_id = response.pop("id")
+                    self._peer_echoes_ids = True
+            except json.JSONDecodeError:
+                response = {"error": "Invalid response format", "response": response_str}
+        else:
+            response = {"error": "Empty response from MT5"}
+
+        if request_id is not None:
+            future = self._pending.pop(request_id, None)
+        elif self._pending:
+            # Legacy EA without ids answers in order - oldest request wins
+            future = self._pending.pop(next(iter(self._pending)))
+        else:
+            future = None
+
+        if future is None:
+            logger.warning(f"Discarding MT5 response with no waiting request (id {request_id})")
+        elif not future.done():
+            future.set_result(response)
+
+    async def get_signals(self, since=None):
+        """
+        Get trading signals from MT5
+
+        Args:
+            since: Optional cursor from a previous response; only signals
+                after it are returned
+
+        Returns:
+            dict: {"signals": [...], "cursor": ...} or error information
+        """
+        return await self.send_command("GET_SIGNALS", {"since": since} if since is not None else None)
+
+    async def get_status(self):
+        """Get the current status of the signal bot"""
+        return await self.send_command("GET_STATUS")
+
+    async def update_settings(self, settings):
+        """Update the bot settings in MT5"""
+        return await self.send_command("SET_SETTINGS", settings)
+
+    async def load_preset(self, preset_name):
+        """Load a strategy preset in MT5"""
+        return await self.send_command("LOAD_PRESET", {"preset": preset_name})
+
+    async def test_connection(self):
+        """Test if we can connect to MT5"""
+        if await self.connect():
+            await self.disconnect()
+            return True
+        return False
@@ -0,0 +1,299 @@
+"""
+MT5 Wire Encodings
+Message codecs the Python interface and the MT5 Expert Advisor can agree
+on with a HELLO handshake: JSON (always available), MessagePack (if the
+msgpack package is installed) and a fixed-layout struct format for signal
+and status records
+"""
+
+import json
+import math
+import struct
+from datetime import datetime
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency
+    msgpack = None
+
+from signal_record import SignalRecord
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class JsonCodec:
+    """UTF-8 JSON, null-terminated - the original protocol"""
+
+    name = "json"
+    length_prefixed = False
+
+    def encode(self, message):
+        return json.dumps(message).encode('utf-8')
+
+    def decode(self, payload):
+        return json.loads(str(payload, 'utf-8'))
+
+
+class MsgpackCodec:
+    """MessagePack maps, length-prefixed"""
+
+    name = "msgpack"
+    length_prefixed = True
+
+    def encode(self, message):
+        return msgpack.packb(message, use_bin_type=True)
+
+    def decode(self, payload):
+        return msgpack.unpackb(payload, raw=False)
+
+
+class StructCodec:
+    """
+    Fixed-layout binary records, length-prefixed
+
+    Every message starts with an envelope of kind and request id. Signal
+    batches and status responses use packed records; anything else, and
+    any batch or status with a value the fixed layout can't hold exactly
+    (long or non-ASCII symbol, unknown field, ...), falls back to a JSON
+    body inside the envelope rather than being truncated.
+    """
+
+    name = "struct"
+    length_prefixed = True
+
+    KIND_JSON = 0
+    KIND_SIGNALS = 1
+    KIND_STATUS = 2
+
+    ENVELOPE = struct.Struct('<BI')  # kind, request id (0 = none)
+    COUNT = struct.Struct('<I')
+    # Length of the JSON object with the other keys of a signals message
+    # (e.g. the GET_SIGNALS cursor), which follows the records
+    EXTRA = struct.Struct('<I')
+    # symbol, direction (0 BUY / 1 SELL), strength, entry, stop loss, take
+    # profit (NaN = none), epoch seconds, seq (-1 = none), reason length,
+    # sentiment JSON length
+    SIGNAL = struct.Struct('<12sBBdddqqHH')
+    # running, connected, balance, trades today, signals today, epoch
+    # seconds of last update, version
+    STATUS = struct.Struct('<??dIIq20s')
+
+    SYMBOL_SIZE = 12
+    VERSION_SIZE = 20
+    SIGNAL_FIELDS = frozenset(('symbol', 'direction', 'strength', 'entry_price', 'stop_loss',
+                               'take_profit', 'reason', 'time', 'seq', 'sentiment'))
+    STATUS_FIELDS = frozenset(('running', 'connected', 'account_balance', 'total_trades_today',
+                               'total_signals_today', 'last_update', 'bot_version'))
+
+    def encode(self, message):
+        message = dict(message)
+        request_id = message.pop("id", None) or 0
+        signals = message.get("signals")
+        if isinstance(signals, list) and "error" not in message:
+            signals = [signal if isinstance(signal, dict) else signal.to_dict() for signal in signals]
+            if all(self._signal_fits(signal) for signal in signals):
+                extra = {key: value for key, value in message.items() if key != "signals"}
+                return (self.ENVELOPE.pack(self.KIND_SIGNALS, request_id) + self._pack_signals(signals)
+                        + self._pack_extra(extra))
+        elif set(message) >= {"running", "account_balance"} and self._status_fits(message):
+            return self.ENVELOPE.pack(self.KIND_STATUS, request_id) + self._pack_status(message)
+        return self.ENVELOPE.pack(self.KIND_JSON, request_id) + json.dumps(message).encode('utf-8')
+
+    def decode(self, payload):
+        payload = memoryview(payload)
+        kind, request_id = self.ENVELOPE.unpack_from(payload)
+        body = payload[self.ENVELOPE.size:]
+        if kind == self.KIND_SIGNALS:
+            signals, offset = self._unpack_signals(body)
+            message = self._unpack_extra(body, offset)
+            message["signals"] = signals
+        elif kind == self.KIND_STATUS:
+            message = self._unpack_status(body)
+        else:
+            message = json.loads(str(body, 'utf-8'))
+        if request_id:
+            message["id"] = request_id
+        return message
+
+    @staticmethod
+    def _ascii(value, size):
+        """Bytes for a fixed-size text field, None if it doesn't fit"""
+        if not isinstance(value, str):
+            return None
+        try:
+            encoded = value.encode('ascii')
+        except UnicodeEncodeError:
+            return None
+        return encoded if len(encoded) <= size and b'\0' not in encoded else None
+
+    @staticmethod
+    def _is_number(value, optional=False):
+        if value is None:
+            return optional
+        # NaN is how an absent stop loss / take profit is packed
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and not math.isnan(value)
+
+    def _time_fits(self, time_str):
+        """True if a time survives the round trip through epoch seconds"""
+        if time_str is None:
+            return True
+        try:
+            return datetime.fromtimestamp(self._epoch(time_str)).strftime(TIME_FORMAT) == time_str
+        except (TypeError, ValueError, OverflowError, OSError):
+            return False
+
+    def _signal_fits(self, signal):
+        """True if a signal can be packed without losing anything"""
+        if not set(signal) <= self.SIGNAL_FIELDS:
+            return False
+        strength, seq = signal.get('strength'), signal.get('seq')
+        reason, sentiment = signal.get('reason'), signal.get('sentiment')
+        return (self._ascii(signal.get('symbol'), self.SYMBOL_SIZE) is not None
+                and signal.get('direction') in ('BUY', 'SELL')
+                and isinstance(strength, int) and not isinstance(strength, bool) and 0 <= strength <= 255
+                and self._is_number(signal.get('entry_price'))
+                and self._is_number(signal.get('stop_loss'), optional=True)
+                and self._is_number(signal.get('take_profit'), optional=True)
+                and (seq is None or (isinstance(seq, int) and not isinstance(seq, bool) and seq >= 0))
+                and (reason is None or (isinstance(reason, str) and len(reason.encode('utf-8')) <= 0xFFFF))
+                # Empty reasons decode as '' and empty sentiments as absent
+                and reason != ''
+                and (sentiment is None or (isinstance(sentiment, dict) and sentiment
+                                           and len(json.dumps(sentiment).encode('utf-8')) <= 0xFFFF))
+                and self._time_fits(signal.get('time')))
+
+    def _status_fits(self, status):
+        """True if a status can be packed without losing anything"""
+        if "error" in status or not set(status) <= self.STATUS_FIELDS:
+            return False
+        counts = [status.get('total_trades_today'), status.get('total_signals_today')]
+        return (all(isinstance(value, bool) for value in (status.get('running'), status.get('connected')))
+                and self._is_number(status.get('account_balance'))
+                and all(value is None or (isinstance(value, int) and not isinstance(value, bool)
+                                          and 0 <= value <= 0xFFFFFFFF) for value in counts)
+                and self._ascii(status.get('bot_version') or '', self.VERSION_SIZE) is not None
+                and self._time_fits(status.get('last_update')))
+
+    def _pack_extra(self, extra):
+        if not extra:
+            return self.EXTRA.pack(0)
+        encoded = json.dumps(extra).encode('utf-8')
+        return self.EXTRA.pack(len(encoded)) + encoded
+
+    def _unpack_extra(self, body, offset):
+        # Older peers end the message after the records
+        if len(body) < offset + self.EXTRA.size:
+            return {}
+        (length,) = self.EXTRA.unpack_from(body, offset)
+        offset += self.EXTRA.size
+        return json.loads(str(body[offset:offset + length], 'utf-8')) if length else {}
+
+    @staticmethod
+    def _optional_float(value):
+        return float('nan') if value is None else float(value)
+
+    @staticmethod
+    def _epoch(time_str):
+        if not time_str:
+            return 0
+        return int(datetime.strptime(time_str, TIME_FORMAT).timestamp())
+
+    def _pack_signals(self, signals):
+        parts = [self.COUNT.pack(len(signals))]
+        for signal in signals:
+            reason = (signal.get('reason') or '').encode('utf-8')
+            sentiment = json.dumps(signal['sentiment']).encode('utf-8') if signal.get('sentiment') else b''
+            parts.append(self.SIGNAL.pack(
+                signal['symbol'].encode('ascii'),
+                0 if signal['direction'] == 'BUY' else 1,
+                int(signal['strength']),
+                float(signal['entry_price']),
+                self._optional_float(signal.get('stop_loss')),
+                self._optional_float(signal.get('take_profit')),
+                self._epoch(signal.get('time')),
+                signal.get('seq', -1) if signal.get('seq') is not None else -1,
+                len(reason),
+                len(sentiment)
+            ))
+            parts.append(reason)
+            parts.append(sentiment)
+        return b''.join(parts)
+
+    def _unpack_signals(self, body):
+        (count,) = self.COUNT.unpack_from(body)
+        offset = self.COUNT.size
+        signals = []
+        for _ in range(count):
+            (symbol, direction, strength, entry_price, stop_loss, take_profit,
+             epoch, seq, reason_len, sentiment_len) = self.SIGNAL.unpack_from(body, offset)
+            offset += self.SIGNAL.size
+            reason = str(body[offset:offset + reason_len], 'utf-8') if reason_len else None
+            offset += reason_len
+            sentiment = json.loads(str(body[offset:offset + sentiment_len], 'utf-8')) if sentiment_len else None
+            offset += sentiment_len
+            signals.append(SignalRecord(
+                symbol=symbol.rstrip(b'\0').decode('ascii'),
+                direction='BUY' if direction == 0 else 'SELL',
+                strength=strength,
+                entry_price=entry_price,
+                stop_loss=None if math.isnan(stop_loss) else stop_loss,
+                take_profit=None if math.isnan(take_profit) else take_profit,
+                reason=reason,
+                time=datetime.fromtimestamp(epoch).strftime(TIME_FORMAT) if epoch else None,
+                seq=None if seq < 0 else seq,
+                sentiment=sentiment
+            ))
+        return signals, offset
+
+    def _pack_status(self, status):
+        return self.STATUS.pack(
+            bool(status.get('running')),
+            bool(status.get('connected')),
+            float(status.get('account_balance') or 0.0),
+            int(status.get('total_trades_today') or 0),
+            int(status.get('total_signals_today') or 0),
+            self._epoch(status.get('last_update')),
+            str(status.get('bot_version') or '').encode('ascii')
+        )
+
+    def _unpack_status(self, body):
+        (running, connected, balance, trades, signals_today,
+         epoch, version) = self.STATUS.unpack_from(body)
+        status = {
+            'running': running,
+            'connected': connected,
+            'account_balance': balance,
+            'total_trades_today': trades,
+            'total_signals_today': signals_today,
+            'bot_version': version.rstrip(b'\0').decode('ascii')
+        }
+        if epoch:
+            status['last_update'] = datetime.fromtimestamp(epoch).strftime(TIME_FORMAT)
+        return status
+
+
+JSON_CODEC = JsonCodec()
+
+_CODECS = {codec.name: codec for codec in (JSON_CODEC, StructCodec())}
+if msgpack is not None:
+    _CODECS[MsgpackCodec.name] = MsgpackCodec()
+
+
+def get_codec(name):
+    """Look up a codec by name, or None if it is unknown or unavailable"""
+    return _CODECS.get(name)
+
+
+def available_encodings(preferred):
+    """
+    Filter a preference list down to encodings this process can speak
+
+    Args:
+        preferred (list): Encoding names in order of preference
+
+    Returns:
+        list: Usable names, always ending with "json"
+    """
+    names = [name for name in preferred if name in _CODECS and name != JSON_CODEC.name]
+    names.append(JSON_CODEC.name)
+    return names
@@ -3,15 +3,19 @@ MT5 Connector Module for Signal Bot
 This module handles communication between the Python interface and MetaTrader 5
 """
 
+import itertools
 import json
 import logging
 import os
-import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from datetime import datetime
 import socket
 import threading
 import traceback
 
+from mt5_codec import JSON_CODEC, available_encodings, get_codec
+from mt5_protocol import FrameDecoder, decode_frame, encode_frame
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,43 +26,142 @@ class MT5Connector:
     In a real environment, this would use the MetaTrader5 package
     """
     
-    def __init__(self, host="127.0.0.1", port=5555, timeout=10):
-        """Initialize the MT5 connection"""
+    def __init__(self, host="127.0.0.1", port=5555, timeout=10, encodings=None, hello_timeout=2.0):
+        """
+        Initialize the MT5 connection
+        
+        Args:
+            encodings (list): Wire encodings to offer in a HELLO handshake, in
+                order of preference; None or ["json"] skips the handshake
+            hello_timeout (float): Seconds to wait for the HELLO answer, kept
+                short so an EA that ignores HELLO doesn't stall every connect
+        """
         self.host = host
         self.port = port
         self.timeout = timeout
+        self.hello_timeout = hello_timeout
+        self.encodings = available_encodings(encodings or [])
+        self.codec = JSON_CODEC
         self.connected = False
         self.socket = None
+        # Serialises writes (and their registration in _pending) - responses
+        # are routed by the reader thread
         self.lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+        self._pending = {}  # request id -> Future, in send order
+        self._pending_lock = threading.Lock()
+        self._request_ids = itertools.count(1)
+        self._reader_thread = None
+        # Set once the EA echoes request ids; until then responses are FIFO
+        self._peer_echoes_ids = False
         
     def connect(self):
         """Establish connection to the MT5 Expert Advisor socket server"""
-        try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.settimeout(self.timeout)
-            self.socket.connect((self.host, self.port))
-            self.connected = True
-            logger.info(f"Connected to MT5 Signal Bot at {self.host}:{self.port}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to connect to MT5: {str(e)}")
-            self.connected = False
-            return False
+        with self._connect_lock:
+            if self.connected:
+                return True
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.settimeout(self.timeout)
+                sock.connect((self.host, self.port))
+                decoder = FrameDecoder()
+                self.codec = self._negotiate_encoding(sock, decoder)
+                # The reader blocks until data arrives; per-request timeouts
+                # are enforced on the response futures instead
+                sock.settimeout(None)
+                self.socket = sock
+                self.connected = True
+                self._reader_thread = threading.Thread(
+                    target=self._reader_loop, args=(sock, decoder), daemon=True
+                )
+                self._reader_thread.start()
+                logger.info(f"Connected to MT5 Signal Bot at {self.host}:{self.port}")
+                return True
+            except Exception as e:
+                logger.error(f"Failed to connect to MT5: {str(e)}")
+                self.connected = False
+                return False
+            
+    def _negotiate_encoding(self, sock, decoder):
+        """
+        Agree on a wire encoding with the EA before any other traffic
+        
+        Args:
+            sock (socket.socket): Freshly connected socket
+            decoder (FrameDecoder): Decoder the reader thread will continue with
+            
+        Returns:
+            The codec to use; JSON if the EA declines or doesn't know HELLO
+        """
+        if self.encodings == [JSON_CODEC.name]:
+            return JSON_CODEC
+            
+        hello = {"id": 0, "command": "HELLO", "params": {"encodings": self.encodings}}
+        sock.sendall(encode_frame(json.dumps(hello)))
+        sock.settimeout(min(self.hello_timeout, self.timeout))
+        
+        response = None
+        while response is None:
+            try:
+                received = decoder.recv_into(sock)
+            except socket.timeout:
+                # The EA ignored HELLO; reconnect speaking plain JSON
+                logger.warning("MT5 did not answer HELLO, falling back to JSON encoding")
+                self.encodings = [JSON_CODEC.name]
+                raise
+            if not received:
+                raise ConnectionError("Connection closed during HELLO")
+            for frame in decoder.frames():
+                response = json.loads(decode_frame(frame))
+                # Later bytes may already use the new framing - stop here
+                break
+                
+        codec = get_codec(response.get("encoding")) if isinstance(response, dict) else None
+        if codec is None or codec.name not in self.encodings:
+            return JSON_CODEC
+        if codec.length_prefixed:
+            decoder.use_length_prefix()
+        logger.info(f"Negotiated {codec.name} wire encoding with MT5")
+        return codec
             
     def disconnect(self):
         """Close the connection to MT5"""
-        if self.socket:
+        with self._connect_lock:
+            self._close_socket(self.socket)
+        logger.info("Disconnected from MT5")
+        
+    def _close_socket(self, sock):
+        """Close a socket and fail every request still waiting on it"""
+        if sock is not None:
             try:
-                self.socket.close()
-            except:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
                 pass
-        self.connected = False
-        logger.info("Disconnected from MT5")
+            try:
+                sock.close()
+            except OSError:
+                pass
+        if sock is self.socket:
+            self.connected = False
+            self._fail_pending(ConnectionError("Connection to MT5 closed"))
+            
+    def _fail_pending(self, error):
+        """Resolve all outstanding requests with an error"""
+        with self._pending_lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(error)
         
     def send_command(self, command, params=None):
         """
         Send a command to MT5 and get the response
         
+        Each message carries a request id so several commands can be in
+        flight on the connection at once; the reader thread hands every
+        response back to the caller waiting on that id.
+        
         Args:
             command (str): Command to send (SET_SETTINGS, GET_SIGNALS, etc.)
             params (dict): Optional parameters for the command
@@ -70,69 +173,120 @@ class MT5Connector:
             if not self.connect():
                 return {"error": "Not connected to MT5"}
                 
+        request_id = next(self._request_ids)
+        future = Future()
+        
         # Prepare the message
         message = {
+            "id": request_id,
             "command": command,
             "params": params or {},
             "timestamp": datetime.now().isoformat()
         }
         
-        # Convert to JSON and add null terminator
-        message_str = json.dumps(message) + "\0"
+        # Encode with the negotiated codec and frame it
+        message_bytes = encode_frame(self.codec.encode(message), self.codec.length_prefixed)
         
-        with self.lock:
-            try:
-                # Send the message
-                self.socket.sendall(message_str.encode('utf-8'))
-                
-                # Receive the response
-                response = self._receive_response()
-                
-                # Parse the response
-                if response:
-                    try:
-                        return json.loads(response)
-                    except json.JSONDecodeError:
-                        return {"error": "Invalid response format", "response": response}
-                else:
-                    return {"error": "Empty response from MT5"}
-                    
-            except socket.timeout:
-                logger.error("Connection to MT5 timed out")
-                self.disconnect()
-                return {"error": "Connection timeout"}
+        try:
+            # Register and send under one lock, so requests are pending in
+            # the order they went out - an EA that doesn't echo ids is
+            # matched by that order
+            with self.lock:
+                with self._pending_lock:
+                    self._pending[request_id] = future
+                self.socket.sendall(message_bytes)
                 
-            except Exception as e:
-                logger.error(f"Error communicating with MT5: {str(e)}")
-                logger.error(traceback.format_exc())
+            # Wait for the reader thread to deliver the response
+            return future.result(timeout=self.timeout)
+            
+        except FutureTimeoutError:
+            logger.error(f"MT5 command {command} (id {request_id}) timed out")
+            if not self._peer_echoes_ids:
+                # Without ids a late reply would be handed to the next
+                # request, so the connection is no longer usable
                 self.disconnect()
-                return {"error": str(e)}
+            return {"error": "Connection timeout"}
+            
+        except ConnectionError as e:
+            logger.error(f"Error communicating with MT5: {str(e)}")
+            return {"error": str(e)}
+            
+        except Exception as e:
+            logger.error(f"Error communicating with MT5: {str(e)}")
+            logger.error(traceback.format_exc())
+            self.disconnect()
+            return {"error": str(e)}
+            
+        finally:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
     
-    def _receive_response(self):
+    def _reader_loop(self, sock, decoder):
         """
-        Receive and assemble the complete response from MT5
+        Read framed responses from MT5 and dispatch them
         
-        Returns:
-            str: Complete response string
+        Args:
+            sock (socket.socket): Socket owned by this reader
+            decoder (FrameDecoder): Decoder holding any bytes already received
         """
-        chunks = []
-        while True:
-            chunk = self.socket.recv(4096)
-            if not chunk:
-                break
+        try:
+            for frame in iter_frames(sock, decoder):
+                self._dispatch_response(frame)
+        except OSError as e:
+            if sock is self.socket and self.connected:
+                logger.error(f"MT5 connection lost: {str(e)}")
+        finally:
+            with self._connect_lock:
+                if sock is self.socket and self.connected:
+                    self._close_socket(sock)
                 
-            # Check for null terminator
-            if chunk[-1] == 0:
-                chunks.append(chunk[:-1])  # Exclude the null terminator
-                break
+    def _dispatch_response(self, frame):
+        """
+        Resolve the pending request a response frame belongs to
+        
+        Args:
+            frame (memoryview): Response payload without framing
+        """
+        request_id = None
+        
+        # Parse the response
+        if len(frame):
+            try:
+                response = self.codec.decode(frame)
+                if isinstance(response, dict) and "id" in response:
+                    request_id = response.pop("id")
+                    self._peer_echoes_ids = True
+            except Exception:
+                response = {"error": "Invalid response format", "response": decode_frame(frame)}
+        else:
+            response = {"error": "Empty response from MT5"}
+            
+        with self._pending_lock:
+            if request_id is not None:
+                future = self._pending.pop(request_id, None)
+            elif self._pending:
+                # Legacy EA without ids answers in order - oldest request wins
+                future = self._pending.pop(next(iter(self._pending)))
             else:
-                chunks.append(chunk)
+                future = None
                 
-        return b''.join(chunks).decode('utf-8')
+        if future is None:
+            logger.warning(f"Discarding MT5 response with no waiting request (id {request_id})")
+        elif not future.done():
+            future.set_result(response)
         
-    def get_signals(self):
-        """Get the current trading signals from MT5"""
-        return self.send_command("GET_SIGNALS")
+    def get_signals(self, since=None):
+        """
+        Get trading signals from MT5
+        
+        Args:
+            since: Optional cursor from a previous response; only signals
+                after it are returned
+        
+        Returns:
+            dict: {"signals": [...], "cursor": ...} or error information
+        """
+        return self.send_command("GET_SIGNALS", {"since": since} if since is not None else None)
         
     def get_status(self):
         """Get the current status of the signal bot"""
@@ -153,35 +307,226 @@ class MT5Connector:
             return True
         return False
         
-    def subscribe_to_signals(self, callback):
+    def subscribe_to_signals(self, callback, on_gap=None, since_seq=None):
         """
-        Start a background thread to listen for new signals
+        Open a dedicated push channel for new signals
+        
+        The EA pushes each signal as it happens on its own connection, so
+        delivery does not wait on a poll interval or on other commands.
         
         Args:
             callback (function): Function to call when a new signal is received
+            on_gap (function): Optional, called as on_gap(expected_seq, received_seq)
+                when sequence numbers show missed signals
+            since_seq (int): Optional sequence number to resume after
+            
+        Returns:
+            SignalSubscription: The running subscription
         """
-        def listener_thread():
-            while self.connected:
-                try:
-                    response = self.send_command("SUBSCRIBE_SIGNALS")
-                    if "error" not in response and "signal" in response:
-                        callback(response["signal"])
-                    time.sleep(1)  # Sleep to avoid high CPU usage
-                except Exception as e:
-                    logger.error(f"Error in signal listener: {str(e)}")
-                    time.sleep(5)  # Longer sleep on error
-                    
-        thread = threading.Thread(target=listener_thread, daemon=True)
-        thread.start()
-        return thread
+        subscription = SignalSubscription(self.host, self.port, self.timeout,
+                                          on_gap=on_gap, since_seq=since_seq)
+        subscription.add_callback(callback)
+        subscription.start()
+        return subscription
+
+
+class SignalSubscription:
+    """
+    Long-lived SUBSCRIBE_SIGNALS channel
+    
+    After the subscribe request is acknowledged the EA pushes one
+    null-terminated frame per signal: {"seq": <int>, "signal": {...}}.
+    A reader thread hands each signal straight to the callbacks and tracks
+    sequence numbers to detect gaps. On disconnect it reconnects with
+    backoff and resumes after the last sequence number it saw.
+    """
+    
+    def __init__(self, host="127.0.0.1", port=5555, timeout=10, on_gap=None,
+                 since_seq=None, reconnect_delay=1.0, max_reconnect_delay=30.0):
+        """Initialize the subscription; nothing connects until start()"""
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.on_gap = on_gap
+        self.last_seq = since_seq
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.connected = False
+        self.gaps_detected = 0
+        self._callbacks = []
+        self._socket = None
+        self._stopped = threading.Event()
+        self._thread = None
+        
+    def add_callback(self, callback):
+        """Register a function to call with each pushed signal"""
+        self._callbacks.append(callback)
+        
+    def start(self):
+        """Start the reader thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+        
+    def stop(self):
+        """Close the channel and stop reconnecting"""
+        self._stopped.set()
+        sock = self._socket
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.timeout)
+        
+    def _run(self):
+        """Keep the channel open until stopped"""
+        delay = self.reconnect_delay
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+                delay = self.reconnect_delay
+            except Exception as e:
+                if not self._stopped.is_set():
+                    logger.error(f"Error in signal subscription: {str(e)}")
+            finally:
+                self.connected = False
+                
+            # Back off before reconnecting
+            if self._stopped.wait(delay):
+                break
+            delay = min(delay * 2, self.max_reconnect_delay)
+        
+    def _listen(self):
+        """Subscribe on a fresh connection and dispatch pushed frames"""
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._socket = sock
+        try:
+            params = {"stream": True}
+            if self.last_seq is not None:
+                params["since_seq"] = self.last_seq
+            message = {
+                "id": 1,
+                "command": "SUBSCRIBE_SIGNALS",
+                "params": params,
+                "timestamp": datetime.now().isoformat()
+            }
+            sock.sendall(encode_frame(json.dumps(message)))
+            
+            # Pushes can be minutes apart - only the connect is time-limited
+            sock.settimeout(None)
+            self.connected = True
+            logger.info(f"Subscribed to MT5 signals at {self.host}:{self.port}")
+            
+            for frame in iter_frames(sock):
+                if self._stopped.is_set():
+                    break
+                self._dispatch_frame(frame)
+        finally:
+            self._socket = None
+            try:
+                sock.close()
+            except OSError:
+                pass
+                
+    def _dispatch_frame(self, frame):
+        """
+        Hand a pushed frame to the callbacks
+        
+        Args:
+            frame (memoryview): Frame payload without the null terminator
+        """
+        try:
+            message = json.loads(decode_frame(frame))
+        except json.JSONDecodeError:
+            logger.warning("Ignoring malformed frame on signal subscription")
+            return
+        if not isinstance(message, dict):
+            return
+        if "error" in message:
+            logger.error(f"MT5 rejected signal subscription: {message['error']}")
+            return
+        if "signal" not in message:
+            # Subscribe acknowledgement or heartbeat
+            return
+            
+        seq = message.get("seq")
+        if seq is not None:
+            if self.last_seq is not None and seq <= self.last_seq:
+                return  # Replayed after a reconnect, already delivered
+            if self.last_seq is not None and seq != self.last_seq + 1:
+                self.gaps_detected += 1
+                logger.warning(f"Signal stream gap: expected seq {self.last_seq + 1}, got {seq}")
+                if self.on_gap:
+                    try:
+                        self.on_gap(self.last_seq + 1, seq)
+                    except Exception as e:
+                        logger.error(f"Error in signal gap handler: {str(e)}")
+            self.last_seq = seq
+            
+        for callback in list(self._callbacks):
+            try:
+                callback(message["signal"])
+            except Exception as e:
+                logger.error(f"Error in signal callback: {str(e)}")
+                logger.error(traceback.format_exc())
+
+
+def iter_frames(sock, decoder=None):
+    """
+    Yield frames read from a socket until it closes
+    
+    Args:
+        sock (socket.socket): Connected socket
+        decoder (FrameDecoder): Optional decoder that may already hold data;
+            defaults to a fresh null-terminated decoder
+        
+    Yields:
+        memoryview: Frame payload without framing, valid until the next
+            frame is requested
+    """
+    decoder = decoder or FrameDecoder()
+    yield from decoder.frames()
+    while decoder.recv_into(sock):
+        yield from decoder.frames()
+
+
+def next_signal_cursor(signals_result, since=None):
+    """
+    Work out the cursor to send with the next GET_SIGNALS
+    
+    Prefers the EA's own "cursor" field, then the highest signal sequence
+    number, then the latest signal time.
+    
+    Args:
+        signals_result (dict): GET_SIGNALS response
+        since: Cursor the request was made with
+        
+    Returns:
+        The new cursor, or `since` if the response doesn't advance it
+    """
+    if signals_result.get("cursor") is not None:
+        return signals_result["cursor"]
+    signals = signals_result.get("signals") or []
+    seqs = [signal.get('seq') for signal in signals if signal.get('seq') is not None]
+    if seqs:
+        return max(seqs)
+    times = [signal.get('time') for signal in signals if signal.get('time')]
+    if times:
+        return max(times)
+    return since
 
 
 # Singleton instance
 _mt5_connector = None
 
 def get_connector():
-    """Get or create the MT5Connector singleton instance"""
+    """Get or create the shared connector, backed by a pool of warm connections"""
     global _mt5_connector
     if _mt5_connector is None:
-        _mt5_connector = MT5Connector()
+        from mt5_pool import get_pooled_connector
+        _mt5_connector = get_pooled_connector()
     return _mt5_connector
\ No newline at end of file
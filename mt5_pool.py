@@ -0,0 +1,352 @@
+"""
+MT5 Connection Pool Module for Signal Bot
+Keeps warm connections to each MT5 terminal, checks their liveness in the
+background and reconnects dead ones with jittered exponential backoff, so
+callers never pay for a reconnect inline
+"""
+
+import itertools
+import logging
+import random
+import threading
+import time
+
+import config
+from mt5_connector import MT5Connector, SignalSubscription
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class _PoolSlot:
+    """One pooled connection and its health bookkeeping"""
+
+    __slots__ = ('connector', 'healthy', 'failures', 'next_attempt', 'last_used')
+
+    def __init__(self, connector):
+        self.connector = connector
+        self.healthy = False
+        self.failures = 0
+        self.next_attempt = 0.0
+        self.last_used = 0.0
+
+
+class MT5ConnectionPool:
+    """
+    Pool of MT5Connector instances for a single host:port
+
+    Connectors are multiplexed, so a healthy connection is shared by any
+    number of callers; the pool spreads them round-robin. A maintenance
+    thread pings idle connections and brings dead ones back.
+    """
+
+    def __init__(self, host, port, size=2, timeout=10, ping_interval=5.0,
+                 backoff_base=0.5, backoff_max=30.0, encodings=None, hello_timeout=2.0):
+        """Initialize the pool; no sockets are opened until start()"""
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._slots = [_PoolSlot(MT5Connector(host, port, timeout, encodings=encodings,
+                                               hello_timeout=hello_timeout))
+                       for _ in range(max(1, size))]
+        self._lock = threading.Lock()
+        self._round_robin = itertools.count()
+        self._wakeup = threading.Event()
+        self._warmed_up = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._stats = {
+            'acquired': 0,
+            'exhausted': 0,
+            'failures': 0,
+            'reconnects': 0,
+            'pings': 0,
+            'ping_failures': 0
+        }
+
+    def start(self):
+        """Start the maintenance thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._maintenance_loop, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the maintenance thread and close all connections"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout)
+            self._thread = None
+        for slot in self._slots:
+            slot.healthy = False
+            if slot.connector.connected:
+                slot.connector.disconnect()
+
+    def wait_until_warm(self, timeout=None):
+        """Block until the first round of connection attempts has finished"""
+        return self._warmed_up.wait(timeout)
+
+    def acquire(self):
+        """
+        Hand out a healthy connection without blocking
+
+        Returns:
+            MT5Connector: A connected connector, or None if none is healthy
+        """
+        with self._lock:
+            start = next(self._round_robin)
+            count = len(self._slots)
+            for offset in range(count):
+                slot = self._slots[(start + offset) % count]
+                if not slot.healthy:
+                    continue
+                if not slot.connector.connected:
+                    # The reader thread saw the socket die since the last check
+                    self._mark_failed(slot)
+                    continue
+                slot.last_used = time.monotonic()
+                self._stats['acquired'] += 1
+                return slot.connector
+            self._stats['exhausted'] += 1
+        return None
+
+    def report_failure(self, connector):
+        """Take a connection out of rotation after a caller saw it fail"""
+        with self._lock:
+            for slot in self._slots:
+                if slot.connector is connector and slot.healthy:
+                    self._mark_failed(slot)
+
+    def healthy_count(self):
+        """Number of connections currently in rotation"""
+        return sum(1 for slot in self._slots if slot.healthy and slot.connector.connected)
+
+    def stats(self):
+        """
+        Get pool statistics
+
+        Returns:
+            dict: Connection counts and lifetime counters
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            'host': self.host,
+            'port': self.port,
+            'size': len(self._slots),
+            'healthy': self.healthy_count(),
+            'max_consecutive_failures': max(slot.failures for slot in self._slots)
+        })
+        return stats
+
+    def _mark_failed(self, slot):
+        """Flag a slot as dead and wake the maintenance thread (lock held)"""
+        slot.healthy = False
+        slot.next_attempt = 0.0
+        self._stats['failures'] += 1
+        self._wakeup.set()
+
+    def _backoff_delay(self, failures):
+        """Exponential backoff with jitter so pooled sockets don't reconnect in lockstep"""
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** min(failures, 16)))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    def _reconnect(self, slot):
+        """Try to bring a dead slot back; schedules the next attempt on failure"""
+        connector = slot.connector
+        if connector.connected:
+            connector.disconnect()
+        if connector.connect():
+            with self._lock:
+                if slot.failures:
+                    self._stats['reconnects'] += 1
+                slot.healthy = True
+                slot.failures = 0
+                slot.last_used = time.monotonic()
+        else:
+            slot.failures += 1
+            delay = self._backoff_delay(slot.failures)
+            slot.next_attempt = time.monotonic() + delay
+            logger.warning(f"MT5 pool reconnect to {self.host}:{self.port} failed "
+                           f"({slot.failures} in a row), retrying in {delay:.1f}s")
+
+    def _ping(self, slot):
+        """Check an idle connection is still answering"""
+        if not slot.connector.connected:
+            # Already closed - reconnect with backoff rather than inline
+            # through send_command()
+            with self._lock:
+                if slot.healthy:
+                    self._mark_failed(slot)
+            return
+        self._stats['pings'] += 1
+        response = slot.connector.send_command("PING")
+        # Any reply proves liveness, even an unknown-command error
+        if not slot.connector.connected or response.get("error") == "Connection timeout":
+            with self._lock:
+                self._stats['ping_failures'] += 1
+                if slot.healthy:
+                    self._mark_failed(slot)
+        else:
+            slot.last_used = time.monotonic()
+
+    def _maintenance_loop(self):
+        """Reconnect dead slots and ping idle ones until stopped"""
+        while not self._stopped.is_set():
+            self._wakeup.clear()
+            now = time.monotonic()
+            for slot in self._slots:
+                if self._stopped.is_set():
+                    break
+                if not slot.healthy:
+                    if now >= slot.next_attempt:
+                        self._reconnect(slot)
+                elif now - slot.last_used >= self.ping_interval:
+                    self._ping(slot)
+            self._warmed_up.set()
+
+            # Sleep until the next ping or reconnect attempt is due
+            now = time.monotonic()
+            due = [slot.next_attempt for slot in self._slots if not slot.healthy]
+            due += [slot.last_used + self.ping_interval for slot in self._slots if slot.healthy]
+            self._wakeup.wait(max(0.05, min(due) - now) if due else self.ping_interval)
+
+
+class PooledMT5Connector:
+    """
+    Drop-in replacement for MT5Connector backed by an MT5ConnectionPool
+
+    Commands go out on whichever pooled connection is healthy; if none is,
+    the call fails fast instead of reconnecting inline.
+    """
+
+    def __init__(self, host="127.0.0.1", port=5555, timeout=10, pool_size=2,
+                 ping_interval=5.0, backoff_max=30.0, encodings=None, hello_timeout=2.0):
+        """Initialize the connector and its pool"""
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.pool = MT5ConnectionPool(host, port, size=pool_size, timeout=timeout,
+                                      ping_interval=ping_interval, backoff_max=backoff_max,
+                                      encodings=encodings, hello_timeout=hello_timeout)
+
+    @property
+    def connected(self):
+        """True while at least one pooled connection is healthy"""
+        return self.pool.healthy_count() > 0
+
+    def connect(self):
+        """Start the pool; only waits for the very first connection attempts"""
+        self.pool.start()
+        self.pool.wait_until_warm(self.timeout)
+        return self.connected
+
+    def disconnect(self):
+        """Close every pooled connection"""
+        self.pool.stop()
+        logger.info("Disconnected from MT5")
+
+    def send_command(self, command, params=None):
+        """
+        Send a command to MT5 over a pooled connection
+
+        Args:
+            command (str): Command to send (SET_SETTINGS, GET_SIGNALS, etc.)
+            params (dict): Optional parameters for the command
+
+        Returns:
+            dict: Response from MT5 or error information
+        """
+        self.pool.start()
+        connector = self.pool.acquire()
+        if connector is None:
+            return {"error": "Not connected to MT5"}
+
+        response = connector.send_command(command, params)
+        if not connector.connected or response.get("error") == "Connection timeout":
+            self.pool.report_failure(connector)
+        return response
+
+    def pool_stats(self):
+        """Get statistics for the underlying pool"""
+        return self.pool.stats()
+
+    def get_signals(self, since=None):
+        """
+        Get trading signals from MT5
+
+        Args:
+            since: Optional cursor from a previous response; only signals
+                after it are returned
+
+        Returns:
+            dict: {"signals": [...], "cursor": ...} or error information
+        """
+        return self.send_command("GET_SIGNALS", {"since": since} if since is not None else None)
+
+    def get_status(self):
+        """Get the current status of the signal bot"""
+        return self.send_command("GET_STATUS")
+
+    def update_settings(self, settings):
+        """Update the bot settings in MT5"""
+        return self.send_command("SET_SETTINGS", settings)
+
+    def load_preset(self, preset_name):
+        """Load a strategy preset in MT5"""
+        return self.send_command("LOAD_PRESET", {"preset": preset_name})
+
+    def test_connection(self):
+        """Test if MT5 is reachable through the pool"""
+        return self.connect()
+
+    def subscribe_to_signals(self, callback, on_gap=None, since_seq=None):
+        """
+        Open a dedicated push channel for new signals
+
+        The subscription holds its own connection outside the pool so
+        pushed frames never interleave with command responses.
+
+        Args:
+            callback (function): Function to call when a new signal is received
+            on_gap (function): Optional, called as on_gap(expected_seq, received_seq)
+            since_seq (int): Optional sequence number to resume after
+
+        Returns:
+            SignalSubscription: The running subscription
+        """
+        subscription = SignalSubscription(self.host, self.port, self.timeout,
+                                          on_gap=on_gap, since_seq=since_seq)
+        subscription.add_callback(callback)
+        return subscription.start()
+
+
+# One pool per host:port
+_pooled_connectors = {}
+_pooled_connectors_lock = threading.Lock()
+
+def get_pooled_connector(host=None, port=None):
+    """Get or create the pooled connector for an MT5 terminal"""
+    host = host or config.MT5_HOST
+    port = port or config.MT5_PORT
+    with _pooled_connectors_lock:
+        connector = _pooled_connectors.get((host, port))
+        if connector is None:
+            connector = PooledMT5Connector(
+                host=host,
+                port=port,
+                timeout=config.MT5_TIMEOUT,
+                pool_size=config.MT5_POOL_SIZE,
+                ping_interval=config.MT5_PING_INTERVAL,
+                backoff_max=config.MT5_RECONNECT_BACKOFF_MAX,
+                encodings=config.MT5_WIRE_ENCODINGS,
+                hello_timeout=config.MT5_HELLO_TIMEOUT
+            )
+            _pooled_connectors[(host, port)] = connector
+        return connector
@@ -0,0 +1,179 @@
+"""
+MT5 Socket Protocol Framing
+Splits the byte stream used between the Python interface and the MT5
+Expert Advisor into frames, reusing one receive buffer. Frames are
+null-terminated JSON by default; binary encodings negotiated with HELLO
+use a 4-byte little-endian length prefix instead.
+"""
+
+import struct
+
+# Upper bound for a single frame (large GET_SIGNALS payloads)
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+FRAME_TERMINATOR = 0
+LENGTH_PREFIX = struct.Struct('<I')
+
+
+class FrameTooLargeError(ValueError):
+    """Raised when a frame grows past the decoder's size limit"""
+
+
+class FrameDecoder:
+    """
+    Incremental decoder for null-terminated frames
+
+    Data is received straight into a reusable bytearray with recv_into(),
+    and complete frames are handed out as memoryview slices of it, so
+    there is no per-chunk allocation and no join. Bytes after a terminator
+    stay in the buffer as the start of the next frame. Consumed space is
+    reclaimed by sliding the unread tail to the front, and the buffer only
+    grows when a single frame does not fit.
+
+    A memoryview returned by frames() is only valid until the next call to
+    recv_into() or feed(); decode or copy it before reading more.
+    """
+
+    def __init__(self, buffer_size=64 * 1024, max_frame_size=MAX_FRAME_SIZE,
+                 length_prefixed=False):
+        """Initialize an empty decoder"""
+        self.max_frame_size = max_frame_size
+        self.length_prefixed = length_prefixed
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._start = 0  # first unconsumed byte
+        self._end = 0    # end of received data
+        self._scan = 0   # no terminator before this offset
+
+    @property
+    def pending(self):
+        """Number of buffered bytes that are not yet part of a complete frame"""
+        return self._end - self._start
+
+    def _reserve(self, size):
+        """Make room for at least `size` more bytes after the received data"""
+        if len(self._buffer) - self._end >= size:
+            return
+        pending = self._end - self._start
+        if self._start and len(self._buffer) - pending >= size:
+            # Slide the unread tail to the front; the tail is copied out
+            # first since source and destination may overlap
+            self._buffer[:pending] = bytes(self._view[self._start:self._end])
+        else:
+            if pending > self.max_frame_size:
+                raise FrameTooLargeError(f"Frame exceeds {self.max_frame_size} bytes")
+            needed = pending + size
+            capacity = len(self._buffer)
+            while capacity < needed:
+                capacity *= 2
+            buffer = bytearray(capacity)
+            buffer[:pending] = self._view[self._start:self._end]
+            self._view.release()
+            self._buffer = buffer
+            self._view = memoryview(buffer)
+        self._scan -= self._start
+        self._end = pending
+        self._start = 0
+
+    def recv_into(self, sock, size=4096):
+        """
+        Receive from a socket directly into the buffer
+
+        Args:
+            sock (socket.socket): Connected socket
+            size (int): Minimum free space to offer the socket
+
+        Returns:
+            int: Bytes received, 0 once the peer has closed the connection
+        """
+        self._reserve(size)
+        received = sock.recv_into(self._view[self._end:])
+        self._end += received
+        return received
+
+    def feed(self, data):
+        """
+        Append bytes that were received elsewhere
+
+        Args:
+            data (bytes): Raw stream data
+        """
+        self._reserve(len(data))
+        self._view[self._end:self._end + len(data)] = data
+        self._end += len(data)
+
+    def use_length_prefix(self):
+        """Switch to length-prefixed frames, keeping any bytes already buffered"""
+        self.length_prefixed = True
+        self._scan = self._start
+
+    def frames(self):
+        """
+        Yield every complete frame currently buffered
+
+        Yields:
+            memoryview: Frame payload without the terminator or length prefix
+        """
+        if self.length_prefixed:
+            yield from self._length_prefixed_frames()
+            return
+        while True:
+            index = self._buffer.find(FRAME_TERMINATOR, self._scan, self._end)
+            if index < 0:
+                self._scan = self._end
+                if self._end - self._start > self.max_frame_size:
+                    raise FrameTooLargeError(f"Frame exceeds {self.max_frame_size} bytes")
+                return
+            frame = self._view[self._start:index]
+            self._start = self._scan = index + 1
+            if self._start == self._end:
+                # Fully drained - restart at the front without copying
+                self._start = self._end = self._scan = 0
+            yield frame
+
+    def _length_prefixed_frames(self):
+        """Yield complete length-prefixed frames"""
+        header = LENGTH_PREFIX.size
+        while self._end - self._start >= header:
+            (length,) = LENGTH_PREFIX.unpack_from(self._buffer, self._start)
+            if length > self.max_frame_size:
+                raise FrameTooLargeError(f"Frame exceeds {self.max_frame_size} bytes")
+            frame_end = self._start + header + length
+            if frame_end > self._end:
+                return
+            frame = self._view[self._start + header:frame_end]
+            self._start = self._scan = frame_end
+            if self._start == self._end:
+                self._start = self._end = self._scan = 0
+            yield frame
+
+
+def encode_frame(payload, length_prefixed=False):
+    """
+    Frame a payload for sending
+
+    Args:
+        payload (str | bytes): JSON text or encoded message
+        length_prefixed (bool): Prefix the length instead of null-terminating
+
+    Returns:
+        bytes: Framed bytes
+    """
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    if length_prefixed:
+        return LENGTH_PREFIX.pack(len(payload)) + payload
+    return payload + b'\0'
+
+
+def decode_frame(frame):
+    """
+    Decode a frame's UTF-8 payload without copying it to bytes first
+
+    Args:
+        frame (memoryview | bytes): Frame payload
+
+    Returns:
+        str: Decoded text
+    """
+    return str(frame, 'utf-8', 'replace')
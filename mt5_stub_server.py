@@ -0,0 +1,244 @@
+"""
+Stand-in MT5 Expert Advisor socket server
+Implements the EA side of the null-terminated JSON protocol on asyncio so
+the connectors can be exercised without a MetaTrader terminal
+
+Run with: python mt5_stub_server.py [port]
+"""
+
+import asyncio
+import json
+import logging
+import sys
+from datetime import datetime
+
+import config
+from mt5_codec import JSON_CODEC, get_codec
+from mt5_protocol import LENGTH_PREFIX, encode_frame
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class StubEAServer:
+    """
+    Minimal asyncio EA server
+
+    Answers GET_SIGNALS (optionally only those after a "since" cursor),
+    GET_STATUS, SET_SETTINGS, LOAD_PRESET and PING, echoing request ids.
+    Requests on one connection are handled concurrently, so replies may
+    come back out of order just like a pipelined EA. `delays` maps a
+    command to an artificial latency. A SUBSCRIBE_SIGNALS request with
+    "stream" turns its connection into a push channel that receives every
+    new signal with its sequence number. HELLO negotiates any of
+    `encodings` for the rest of the connection.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, delays=None,
+                 encodings=("struct", "msgpack", "json"), echo_ids=True):
+        """
+        Initialize the server state
+
+        Args:
+            echo_ids (bool): Echo request ids; False behaves like a legacy
+                EA that answers one request at a time, in order, without ids
+        """
+        self.host = host
+        self.port = port
+        self.delays = delays or {}
+        self.encodings = encodings
+        self.echo_ids = echo_ids
+        self.signals = []
+        self.settings = {}
+        self.preset = None
+        self.status = {
+            'running': True,
+            'connected': True,
+            'bot_version': "1.0",
+            'account_balance': 10000.0,
+            'total_trades_today': 0,
+            'total_signals_today': 0
+        }
+        self.commands_received = 0
+        self._next_seq = 1
+        self._subscribers = set()
+        self._clients = set()
+        self._server = None
+
+    async def start(self):
+        """Start listening; returns the bound port"""
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Stub EA server listening on {self.host}:{self.port}")
+        return self.port
+
+    async def stop(self):
+        """Stop accepting connections and close the listener"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def drop_clients(self):
+        """
+        Close every open connection, as if the EA had restarted
+
+        Must be called from the server's event loop thread.
+        """
+        for writer in list(self._clients):
+            writer.transport.abort()
+
+    async def serve_forever(self):
+        """Start the server and block until cancelled"""
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def add_signal(self, signal):
+        """
+        Record a signal as if the EA had generated it and push it to subscribers
+
+        Must be called from the server's event loop thread.
+        """
+        signal = dict(signal)
+        signal.setdefault('time', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        signal['seq'] = self._next_seq
+        self._next_seq += 1
+        self.signals.append(signal)
+        self.status['total_signals_today'] += 1
+
+        frame = self._push_frame(signal)
+        for writer in list(self._subscribers):
+            if writer.is_closing():
+                self._subscribers.discard(writer)
+            else:
+                writer.write(frame)
+        return signal
+
+    @staticmethod
+    def _push_frame(signal):
+        """Encode a pushed signal frame"""
+        return json.dumps({"seq": signal['seq'], "signal": signal}).encode('utf-8') + b'\0'
+
+    async def _handle_client(self, reader, writer):
+        """Serve one connection until the peer closes it"""
+        write_lock = asyncio.Lock()
+        tasks = set()
+        codec = JSON_CODEC
+        self._clients.add(writer)
+        try:
+            while True:
+                try:
+                    if codec.length_prefixed:
+                        header = await reader.readexactly(LENGTH_PREFIX.size)
+                        frame = await reader.readexactly(LENGTH_PREFIX.unpack(header)[0])
+                    else:
+                        frame = (await reader.readuntil(b'\0'))[:-1]
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                try:
+                    message = codec.decode(frame)
+                except Exception:
+                    message = None
+
+                if isinstance(message, dict) and message.get("command") == "HELLO":
+                    # Answer in the current framing, then switch before reading on
+                    chosen = self._choose_encoding(message.get("params") or {})
+                    async with write_lock:
+                        writer.write(encode_frame(json.dumps({"id": message.get("id"), "encoding": chosen.name})))
+                        await writer.drain()
+                    codec = chosen
+                    continue
+
+                if not self.echo_ids:
+                    await self._reply(message, writer, write_lock, codec)
+                    continue
+                task = asyncio.create_task(self._reply(message, writer, write_lock, codec))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._subscribers.discard(writer)
+            self._clients.discard(writer)
+            writer.close()
+
+    def _choose_encoding(self, params):
+        """Pick the client's most preferred encoding that this server speaks"""
+        for name in params.get("encodings") or []:
+            if name in self.encodings and get_codec(name) is not None:
+                return get_codec(name)
+        return JSON_CODEC
+
+    async def _reply(self, message, writer, write_lock, codec):
+        """Handle a single decoded request and write its response"""
+        if not isinstance(message, dict):
+            response = {"error": "Invalid request format"}
+            message = {}
+        else:
+            self.commands_received += 1
+            delay = self.delays.get(message.get("command"))
+            if delay:
+                await asyncio.sleep(delay)
+            response = self.handle_command(message.get("command"), message.get("params") or {})
+
+        if "id" in message and self.echo_ids:
+            response["id"] = message["id"]
+        async with write_lock:
+            writer.write(encode_frame(codec.encode(response), codec.length_prefixed))
+            if message.get("command") == "SUBSCRIBE_SIGNALS" and "error" not in response:
+                # Replay anything the subscriber missed, then push live
+                since_seq = (message.get("params") or {}).get("since_seq") or 0
+                for signal in self.signals:
+                    if signal['seq'] > since_seq:
+                        writer.write(self._push_frame(signal))
+                self._subscribers.add(writer)
+            await writer.drain()
+
+    def handle_command(self, command, params):
+        """
+        Produce the response for a command
+
+        Args:
+            command (str): Command name
+            params (dict): Command parameters
+
+        Returns:
+            dict: Response payload
+        """
+        if command == "PING":
+            return {"pong": True}
+        if command == "GET_SIGNALS":
+            since = params.get("since")
+            if isinstance(since, int):
+                signals = [signal for signal in self.signals if signal['seq'] > since]
+            elif isinstance(since, str):
+                signals = [signal for signal in self.signals if signal['time'] > since]
+            else:
+                signals = list(self.signals)
+            return {"signals": signals, "cursor": self._next_seq - 1}
+        if command == "GET_STATUS":
+            status = dict(self.status)
+            status['last_update'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            return status
+        if command == "SET_SETTINGS":
+            self.settings.update(params)
+            return {"status": "success"}
+        if command == "SUBSCRIBE_SIGNALS":
+            if not params.get("stream"):
+                return {"error": "Only streaming subscriptions are supported"}
+            return {"status": "subscribed", "seq": self._next_seq - 1}
+        if command == "LOAD_PRESET":
+            self.preset = params.get("preset")
+            return {"status": "success", "preset": self.preset}
+        return {"error": f"Unknown command: {command}"}
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else config.MT5_PORT
+    try:
+        asyncio.run(StubEAServer(host=config.MT5_HOST, port=port).serve_forever())
+    except KeyboardInterrupt:
+        pass
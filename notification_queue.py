@@ -0,0 +1,234 @@
+"""
+Notification Dispatch Pipeline for the MT5 Signal Bot
+Takes signal notifications off the request path: signals are queued per
+channel and delivered by background workers, with retries and a
+dead-letter store for messages that keep failing.
+"""
+
+import atexit
+import logging
+import queue
+import random
+import threading
+import time
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class NotificationChannel:
+    """
+    One delivery channel (email, Telegram) with its own queue and workers
+
+    `send` is called with the signal and must raise on failure. A failed
+    delivery is retried after an exponential, jittered backoff; after
+    `max_attempts` the signal goes to the dead-letter sink. A full queue
+    sends new signals straight to the dead-letter sink rather than
+    blocking the caller.
+
+    With a `batch_window`, a worker that picks up a signal keeps collecting
+    whatever else arrives within the window (up to `max_batch`) and `send`
+    is called with the list, so a burst becomes one message. A batch
+    `send` that delivers part of the list before failing removes the
+    delivered signals from it; only the rest is retried or dead-lettered.
+    """
+
+    def __init__(self, name, send, dead_letter, workers=1, queue_size=1000,
+                 max_attempts=5, backoff_base=1.0, backoff_max=60.0,
+                 batch_window=0.0, max_batch=50):
+        """
+        Args:
+            name (str): Channel name stored with dead letters
+            send (callable): Delivers one signal, raising on failure
+            dead_letter (callable): Called with (channel, signal, error, attempts)
+            workers (int): Worker threads delivering from the queue
+            queue_size (int): Signals waiting before new ones are dead-lettered
+            max_attempts (int): Delivery attempts per signal
+            backoff_base (float): Delay in seconds before the first retry
+            backoff_max (float): Upper bound of the retry delay
+            batch_window (float): Seconds to gather a batch, 0 to send
+                signals one at a time
+            max_batch (int): Largest batch
+        """
+        self.name = name
+        self.send = send
+        self.dead_letter = dead_letter
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.sent = 0
+        self.failed = 0
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start the worker threads"""
+        self._stopped.clear()
+        for index in range(self.workers - len(self._threads)):
+            thread = threading.Thread(target=self._worker, name=f"notify-{self.name}-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5.0):
+        """
+        Stop the workers, dead-lettering whatever is still queued
+
+        Deliveries in progress are allowed to finish; queued signals are
+        kept in the dead-letter store so they can be replayed later.
+
+        Args:
+            timeout (float): Seconds to wait for deliveries in progress
+        """
+        self._stopped.set()
+        for thread in self._threads:
+            thread.join(timeout / max(len(self._threads), 1))
+        self._threads = []
+        while True:
+            try:
+                signal, attempts = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            self._dead_letter(signal, "Not delivered before shutdown", attempts)
+
+    def enqueue(self, signal):
+        """
+        Queue a signal for delivery without blocking
+
+        Returns:
+            bool: False if the queue was full and the signal dead-lettered
+        """
+        try:
+            self.queue.put_nowait((signal, 0))
+            return True
+        except queue.Full:
+            logger.warning(f"{self.name} notification queue is full")
+            self._dead_letter(signal, "Notification queue full", 0)
+            return False
+
+    def _backoff(self, attempts):
+        """Delay before retry number `attempts`"""
+        delay = min(self.backoff_base * (2 ** (attempts - 1)), self.backoff_max)
+        return delay * random.uniform(0.5, 1.0)
+
+    def _collect_batch(self, first):
+        """Gather queued signals arriving within the batch window"""
+        batch = [first]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        """Deliver queued signals until stopped"""
+        while not self._stopped.is_set():
+            try:
+                item = self.queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            batch = self._collect_batch(item) if self.batch_window > 0 else [item]
+            if self._stopped.is_set():
+                for signal, attempts in batch:
+                    self._dead_letter(signal, "Not delivered before shutdown", attempts)
+                return
+            signals = [signal for signal, _ in batch]
+            attempts = max(attempts for _, attempts in batch)
+            while True:
+                attempts += 1
+                try:
+                    self.send(signals if self.batch_window > 0 else signals[0])
+                    self.sent += len(batch)
+                    break
+                except Exception as e:
+                    if attempts >= self.max_attempts or self._stopped.is_set():
+                        self.sent += len(batch) - len(signals)
+                        for signal in signals:
+                            self._dead_letter(signal, str(e), attempts)
+                        break
+                    # Honour a delay the service asked for (e.g. HTTP 429 retry_after)
+                    delay = max(self._backoff(attempts), getattr(e, 'retry_after', 0) or 0)
+                    logger.warning(f"{self.name} notification failed (attempt {attempts}/"
+                                   f"{self.max_attempts}), retrying in {delay:.1f}s: {e}")
+                    if self._stopped.wait(delay):
+                        self.sent += len(batch) - len(signals)
+                        for signal in signals:
+                            self._dead_letter(signal, str(e), attempts)
+                        break
+
+    def _dead_letter(self, signal, error, attempts):
+        """Hand a signal that could not be delivered to the dead-letter sink"""
+        self.failed += 1
+        logger.error(f"Giving up on {self.name} notification for {signal.get('symbol')}: {error}")
+        try:
+            self.dead_letter(self.name, signal, error, attempts)
+        except Exception as e:
+            logger.error(f"Failed to store dead-letter {self.name} notification: {e}")
+
+    def stats(self):
+        """Queue depth and delivery counters"""
+        return {"queued": self.queue.qsize(), "sent": self.sent, "failed": self.failed,
+                "workers": len(self._threads)}
+
+
+class NotificationDispatcher:
+    """Fans each signal out to the queues of all registered channels"""
+
+    def __init__(self, dead_letter):
+        """
+        Args:
+            dead_letter (callable): Called with (channel, signal, error,
+                attempts) for undeliverable notifications
+        """
+        self.dead_letter = dead_letter
+        self.channels = {}
+        self._started = False
+
+    def add_channel(self, name, send, **options):
+        """Register a delivery channel, see NotificationChannel for options"""
+        channel = NotificationChannel(name, send, self.dead_letter, **options)
+        self.channels[name] = channel
+        if self._started:
+            channel.start()
+        return channel
+
+    def start(self):
+        """Start every channel's workers"""
+        if not self._started:
+            self._started = True
+            for channel in self.channels.values():
+                channel.start()
+            atexit.register(self.stop)
+
+    def stop(self):
+        """Stop all channels"""
+        for channel in self.channels.values():
+            channel.stop()
+        self._started = False
+
+    def enqueue(self, signal, channels=None):
+        """
+        Queue a signal on every channel (or the given ones) and return at once
+
+        Args:
+            signal (dict): The trading signal data
+            channels (list): Channel names, default all
+
+        Returns:
+            dict: channel name -> True if queued
+        """
+        return {name: channel.enqueue(dict(signal))
+                for name, channel in self.channels.items()
+                if channels is None or name in channels}
+
+    def stats(self):
+        """Per-channel queue statistics"""
+        return {name: channel.stats() for name, channel in self.channels.items()}
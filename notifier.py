@@ -3,18 +3,311 @@ Notification module for the MT5 Signal Bot
 Handles email and Telegram notifications for trading signals
 """
 
+import atexit
 import logging
 import smtplib
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import requests
 import traceback
 import config
+from notification_queue import NotificationDispatcher
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class SMTPSession:
+    """
+    Long-lived, authenticated SMTP connection shared by all email sends
+    
+    The TLS handshake and login happen once; later messages reuse the
+    connection. A connection that has been idle is checked with NOOP
+    before use, and one the server has dropped is reopened and the send
+    retried once.
+    """
+    
+    def __init__(self, host, port, use_tls=True, username='', password='', timeout=30, idle_check=30):
+        """
+        Args:
+            host (str): SMTP server
+            port (int): SMTP port
+            use_tls (bool): Upgrade the connection with STARTTLS
+            username (str): Login name, empty to skip authentication
+            password (str): Login password
+            timeout (float): Socket timeout in seconds
+            idle_check (float): Idle seconds after which the connection is
+                verified with NOOP before sending
+        """
+        self.host = host
+        self.port = port
+        self.use_tls = use_tls
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.idle_check = idle_check
+        self.connects = 0
+        self._server = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+    
+    def _connect(self):
+        """Open, secure and authenticate a new connection"""
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.connects += 1
+        logger.info(f"Opened SMTP session to {self.host}:{self.port}")
+        return server
+    
+    def _usable_server(self):
+        """The current connection, reopened if it is missing or dead"""
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_check:
+            try:
+                if self._server.noop()[0] != 250:
+                    raise smtplib.SMTPServerDisconnected("NOOP failed")
+            except (smtplib.SMTPException, OSError):
+                self.close_connection()
+        if self._server is None:
+            self._server = self._connect()
+        return self._server
+    
+    def send(self, sender, recipients, message):
+        """
+        Send a message, reconnecting once if the server dropped the session
+        
+        Args:
+            sender (str): Envelope sender
+            recipients (str | list): Envelope recipients
+            message (str): Full message text
+        """
+        with self._lock:
+            try:
+                self._usable_server().sendmail(sender, recipients, message)
+            except Exception as e:
+                if not self._session_lost(e):
+                    raise
+                self.close_connection()
+                self._usable_server().sendmail(sender, recipients, message)
+            self._last_used = time.monotonic()
+    
+    @staticmethod
+    def _session_lost(error):
+        """
+        True if a send failed because the connection is gone, not the message
+        
+        SMTPException subclasses OSError, so SMTP replies are told apart
+        from socket errors first; of those only a dropped connection or a
+        421 (server closing the session) is worth a reconnect. Permanent
+        errors such as a refused recipient are raised to the caller.
+        """
+        if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+            return True
+        if isinstance(error, smtplib.SMTPResponseException):
+            return error.smtp_code == 421
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            # smtplib closes the connection itself on a 421 to RCPT
+            return any(code == 421 for code, _ in error.recipients.values())
+        if isinstance(error, smtplib.SMTPException):
+            return False
+        return isinstance(error, OSError)
+    
+    def close_connection(self):
+        """Drop the current connection (a new one opens on the next send)"""
+        server, self._server = self._server, None
+        if server is not None:
+            try:
+                server.quit()
+            except (smtplib.SMTPException, OSError):
+                server.close()
+    
+    def close(self):
+        """Close the connection"""
+        with self._lock:
+            self.close_connection()
+
+_smtp_session = None
+# Guards lazy creation of the shared SMTP and Telegram clients
+_client_lock = threading.Lock()
+
+def get_smtp_session():
+    """Get the process-wide SMTP session, created from config on first use"""
+    global _smtp_session
+    with _client_lock:
+        if _smtp_session is None:
+            _smtp_session = SMTPSession(config.EMAIL_SERVER, config.EMAIL_PORT, config.EMAIL_USE_TLS,
+                                        config.EMAIL_USERNAME, config.EMAIL_PASSWORD)
+            atexit.register(_smtp_session.close)
+        return _smtp_session
+
+class TelegramRateLimited(Exception):
+    """Raised when Telegram keeps answering 429; `retry_after` is its requested delay"""
+    
+    def __init__(self, retry_after):
+        super().__init__(f"Telegram rate limit, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """Token bucket allowing `rate` events per second with bursts of `capacity`"""
+    
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Wait for a token; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+    
+    def block(self, seconds):
+        """Hold every caller back for `seconds` (server-side rate limit)"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+class TelegramSender:
+    """
+    Telegram Bot API client with connection reuse and per-chat rate limiting
+    
+    Messages go through one requests.Session, so the TLS connection to the
+    API stays open between sends. Each chat has a token bucket matching
+    Telegram's per-chat limits; a 429 response blocks that chat's bucket
+    for the retry_after the API asks for before the message is retried.
+    """
+    
+    # Telegram rejects longer message texts
+    MAX_MESSAGE_LENGTH = 4096
+    
+    def __init__(self, token, api_url='https://api.telegram.org', rate=1.0, burst=3,
+                 timeout=(5, 15), max_rate_limit_retries=3):
+        """
+        Args:
+            token (str): Bot token
+            api_url (str): Bot API base URL
+            rate (float): Messages per second per chat
+            burst (int): Messages a chat may receive back to back
+            timeout (tuple): Connect and read timeouts in seconds
+            max_rate_limit_retries (int): 429 responses tolerated per message
+                before TelegramRateLimited is raised
+        """
+        self.token = token
+        self.api_url = api_url.rstrip('/')
+        self.rate = rate
+        self.burst = burst
+        self.timeout = timeout
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.session = requests.Session()
+        self.rate_limited = 0
+        self._buckets = {}
+        self._lock = threading.Lock()
+    
+    def _bucket(self, chat_id):
+        with self._lock:
+            bucket = self._buckets.get(chat_id)
+            if bucket is None:
+                bucket = self._buckets[chat_id] = TokenBucket(self.rate, self.burst)
+            return bucket
+    
+    def pack(self, texts):
+        """
+        Combine message texts into as few messages as fit Telegram's limit
+        
+        Args:
+            texts (list): Individual message texts
+        
+        Returns:
+            list: (message text, number of texts it holds) pairs, in order
+        """
+        messages = []
+        current = ""
+        count = 0
+        for text in texts:
+            candidate = f"{current}\n{text}" if current else text
+            if len(candidate) <= self.MAX_MESSAGE_LENGTH:
+                current = candidate
+                count += 1
+                continue
+            if current:
+                messages.append((current, count))
+            current = text[:self.MAX_MESSAGE_LENGTH]
+            count = 1
+        if current:
+            messages.append((current, count))
+        return messages
+    
+    def send_message(self, chat_id, text, parse_mode="HTML"):
+        """
+        Send one message, waiting for the chat's rate limit
+        
+        Raises:
+            TelegramRateLimited: If Telegram keeps answering 429
+            requests.RequestException: On other failures
+        """
+        url = f"{self.api_url}/bot{self.token}/sendMessage"
+        payload = {"chat_id": chat_id, "text": text, "parse_mode": parse_mode}
+        bucket = self._bucket(chat_id)
+        for _ in range(self.max_rate_limit_retries + 1):
+            bucket.acquire()
+            response = self.session.post(url, data=payload, timeout=self.timeout)
+            if response.status_code != 429:
+                response.raise_for_status()
+                return response.json()
+            self.rate_limited += 1
+            retry_after = self._retry_after(response)
+            logger.warning(f"Telegram rate limit for chat {chat_id}, retrying in {retry_after}s")
+            bucket.block(retry_after)
+        raise TelegramRateLimited(retry_after)
+    
+    @staticmethod
+    def _retry_after(response):
+        """Delay requested by a 429 response"""
+        try:
+            return float(response.json()["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            try:
+                return float(response.headers.get("Retry-After", 1))
+            except ValueError:
+                return 1.0
+    
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+_telegram_sender = None
+
+def get_telegram_sender():
+    """Get the process-wide Telegram sender, created from config on first use"""
+    global _telegram_sender
+    with _client_lock:
+        if _telegram_sender is None:
+            _telegram_sender = TelegramSender(config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_API_URL,
+                                              rate=config.TELEGRAM_RATE_PER_CHAT,
+                                              burst=config.TELEGRAM_BURST)
+            atexit.register(_telegram_sender.close)
+        return _telegram_sender
+
 class SignalNotifier:
     """
     Class to handle notifications for the MT5 Signal Bot
@@ -35,81 +328,110 @@ class SignalNotifier:
             return False
             
         try:
-            # Create a multipart message and set headers
-            message = MIMEMultipart()
-            message["From"] = config.EMAIL_USERNAME
-            message["To"] = config.EMAIL_RECIPIENT
-            message["Subject"] = f"MT5 Signal Bot: New {signal['direction']} Signal for {signal['symbol']}"
-            
-            # Signal strength assessment
-            strength_assessment = "Low"
-            if signal['strength'] >= 8:
-                strength_assessment = "Very Strong"
-            elif signal['strength'] >= 6:
-                strength_assessment = "Strong"
-            elif signal['strength'] >= 4:
-                strength_assessment = "Moderate"
-                
-            # Create the email body
-            email_body = f"""
-            <html>
-            <body>
-                <h2>MT5 Signal Bot: New Trading Signal</h2>
-                <table border="1" cellpadding="5">
-                    <tr>
-                        <th colspan="2" style="background-color: {'#4CAF50' if signal['direction'] == 'BUY' else '#F44336'}; color: white;">
-                            {signal['direction']} SIGNAL ({strength_assessment} - {signal['strength']}/10)
-                        </th>
-                    </tr>
-                    <tr>
-                        <td><strong>Symbol</strong></td>
-                        <td>{signal['symbol']}</td>
-                    </tr>
-                    <tr>
-                        <td><strong>Entry Price</strong></td>
-                        <td>{signal['entry_price']}</td>
-                    </tr>
-                    <tr>
-                        <td><strong>Stop Loss</strong></td>
-                        <td>{signal['stop_loss']}</td>
-                    </tr>
-                    <tr>
-                        <td><strong>Take Profit</strong></td>
-                        <td>{signal['take_profit']}</td>
-                    </tr>
-                    <tr>
-                        <td><strong>Reason</strong></td>
-                        <td>{signal['reason']}</td>
-                    </tr>
-                    <tr>
-                        <td><strong>Time</strong></td>
-                        <td>{signal['time']}</td>
-                    </tr>
-                </table>
-                <p>This is an automated message from your MT5 Signal Bot.</p>
-            </body>
-            </html>
-            """
-            
-            # Add HTML/plain-text parts to MIMEMultipart message
-            message.attach(MIMEText(email_body, "html"))
-            
-            # Create secure connection with server and send email
-            with smtplib.SMTP(config.EMAIL_SERVER, config.EMAIL_PORT) as server:
-                if config.EMAIL_USE_TLS:
-                    server.starttls()
-                server.login(config.EMAIL_USERNAME, config.EMAIL_PASSWORD)
-                server.sendmail(
-                    config.EMAIL_USERNAME, config.EMAIL_RECIPIENT, message.as_string()
-                )
-                
-            logger.info(f"Email notification sent for {signal['symbol']} {signal['direction']} signal")
+            SignalNotifier.deliver_email(signal)
             return True
-            
         except Exception as e:
             logger.error(f"Failed to send email notification: {str(e)}")
             logger.error(traceback.format_exc())
             return False
+    
+    @staticmethod
+    def _email_signal_table(signal):
+        """HTML table describing one signal"""
+        # Signal strength assessment
+        strength_assessment = "Low"
+        if signal['strength'] >= 8:
+            strength_assessment = "Very Strong"
+        elif signal['strength'] >= 6:
+            strength_assessment = "Strong"
+        elif signal['strength'] >= 4:
+            strength_assessment = "Moderate"
+            
+        return f"""
+            <table border="1" cellpadding="5">
+                <tr>
+                    <th colspan="2" style="background-color: {'#4CAF50' if signal['direction'] == 'BUY' else '#F44336'}; color: white;">
+                        {signal['direction']} SIGNAL ({strength_assessment} - {signal['strength']}/10)
+                    </th>
+                </tr>
+                <tr>
+                    <td><strong>Symbol</strong></td>
+                    <td>{signal['symbol']}</td>
+                </tr>
+                <tr>
+                    <td><strong>Entry Price</strong></td>
+                    <td>{signal['entry_price']}</td>
+                </tr>
+                <tr>
+                    <td><strong>Stop Loss</strong></td>
+                    <td>{signal.get('stop_loss')}</td>
+                </tr>
+                <tr>
+                    <td><strong>Take Profit</strong></td>
+                    <td>{signal.get('take_profit')}</td>
+                </tr>
+                <tr>
+                    <td><strong>Reason</strong></td>
+                    <td>{signal.get('reason')}</td>
+                </tr>
+                <tr>
+                    <td><strong>Time</strong></td>
+                    <td>{signal.get('time')}</td>
+                </tr>
+            </table>
+            """
+    
+    @staticmethod
+    def deliver_email(signal):
+        """
+        Send an email notification, raising on failure
+        
+        Args:
+            signal (dict): The trading signal data
+        """
+        SignalNotifier.deliver_email_digest([signal])
+    
+    @staticmethod
+    def deliver_email_digest(signals):
+        """
+        Send one email covering several signals, raising on failure
+        
+        Args:
+            signals (list): Trading signals, oldest first
+        """
+        # Create a multipart message and set headers
+        message = MIMEMultipart()
+        message["From"] = config.EMAIL_USERNAME
+        message["To"] = config.EMAIL_RECIPIENT
+        if len(signals) == 1:
+            signal = signals[0]
+            message["Subject"] = f"MT5 Signal Bot: New {signal['direction']} Signal for {signal['symbol']}"
+            heading = "MT5 Signal Bot: New Trading Signal"
+        else:
+            symbols = ", ".join(f"{signal['symbol']} {signal['direction']}" for signal in signals[:5])
+            more = f" and {len(signals) - 5} more" if len(signals) > 5 else ""
+            message["Subject"] = f"MT5 Signal Bot: {len(signals)} New Signals ({symbols}{more})"
+            heading = f"MT5 Signal Bot: {len(signals)} New Trading Signals"
+        
+        # Create the email body
+        tables = "<br>".join(SignalNotifier._email_signal_table(signal) for signal in signals)
+        email_body = f"""
+        <html>
+        <body>
+            <h2>{heading}</h2>
+            {tables}
+            <p>This is an automated message from your MT5 Signal Bot.</p>
+        </body>
+        </html>
+        """
+        
+        # Add HTML/plain-text parts to MIMEMultipart message
+        message.attach(MIMEText(email_body, "html"))
+        
+        # Send over the shared, already authenticated connection
+        get_smtp_session().send(config.EMAIL_USERNAME, config.EMAIL_RECIPIENT, message.as_string())
+        
+        logger.info(f"Email notification sent for {len(signals)} signal(s)")
             
     @staticmethod
     def send_telegram_notification(signal):
@@ -126,38 +448,59 @@ class SignalNotifier:
             return False
             
         try:
-            # Create the message text
-            emoji = "🟢" if signal['direction'] == 'BUY' else "🔴"
-            
-            message_text = (
-                f"{emoji} <b>NEW {signal['direction']} SIGNAL</b> {emoji}\n\n"
-                f"<b>Symbol:</b> {signal['symbol']}\n"
-                f"<b>Entry Price:</b> {signal['entry_price']}\n"
-                f"<b>Stop Loss:</b> {signal['stop_loss']}\n"
-                f"<b>Take Profit:</b> {signal['take_profit']}\n"
-                f"<b>Signal Strength:</b> {signal['strength']}/10\n"
-                f"<b>Reason:</b> {signal['reason']}\n"
-                f"<b>Time:</b> {signal['time']}\n"
-            )
-            
-            # Send the message using the Telegram Bot API
-            url = f"https://api.telegram.org/bot{config.TELEGRAM_BOT_TOKEN}/sendMessage"
-            payload = {
-                "chat_id": config.TELEGRAM_CHAT_ID,
-                "text": message_text,
-                "parse_mode": "HTML"
-            }
-            
-            response = requests.post(url, data=payload)
-            response.raise_for_status()
-            
-            logger.info(f"Telegram notification sent for {signal['symbol']} {signal['direction']} signal")
+            SignalNotifier.deliver_telegram(signal)
             return True
-            
         except Exception as e:
             logger.error(f"Failed to send Telegram notification: {str(e)}")
             logger.error(traceback.format_exc())
             return False
+    
+    @staticmethod
+    def _telegram_text(signal):
+        """Telegram HTML text for one signal"""
+        emoji = "🟢" if signal['direction'] == 'BUY' else "🔴"
+        
+        return (
+            f"{emoji} <b>NEW {signal['direction']} SIGNAL</b> {emoji}\n\n"
+            f"<b>Symbol:</b> {signal['symbol']}\n"
+            f"<b>Entry Price:</b> {signal['entry_price']}\n"
+            f"<b>Stop Loss:</b> {signal.get('stop_loss')}\n"
+            f"<b>Take Profit:</b> {signal.get('take_profit')}\n"
+            f"<b>Signal Strength:</b> {signal['strength']}/10\n"
+            f"<b>Reason:</b> {signal.get('reason')}\n"
+            f"<b>Time:</b> {signal.get('time')}\n"
+        )
+    
+    @staticmethod
+    def deliver_telegram(signal):
+        """
+        Send a Telegram notification, raising on failure
+        
+        Args:
+            signal (dict): The trading signal data
+        """
+        SignalNotifier.deliver_telegram_batch([signal])
+    
+    @staticmethod
+    def deliver_telegram_batch(signals):
+        """
+        Send several signals as few Telegram messages as possible, raising on failure
+        
+        Signals are removed from `signals` as the messages holding them are
+        sent, so when a later message fails, a retry of the batch (or its
+        dead letters) only covers what was not delivered.
+        
+        Args:
+            signals (list): Trading signals, oldest first
+        """
+        total = len(signals)
+        texts = [SignalNotifier._telegram_text(signal) for signal in signals]
+        sender = get_telegram_sender()
+        for message_text, count in sender.pack(texts):
+            sender.send_message(config.TELEGRAM_CHAT_ID, message_text)
+            del signals[:count]
+        
+        logger.info(f"Telegram notification sent for {total} signal(s)")
             
     @staticmethod
     def notify(signal):
@@ -177,4 +520,39 @@ class SignalNotifier:
         if config.ENABLE_TELEGRAM:
             results['telegram'] = SignalNotifier.send_telegram_notification(signal)
             
-        return results
\ No newline at end of file
+        return results
+
+def create_dispatcher(dead_letter):
+    """
+    Build the background notification pipeline for the enabled channels
+    
+    Args:
+        dead_letter (callable): Stores undeliverable notifications, called
+            with (channel, signal, error, attempts)
+    
+    Returns:
+        NotificationDispatcher: Dispatcher, not yet started
+    """
+    dispatcher = NotificationDispatcher(dead_letter)
+    options = {
+        'queue_size': config.NOTIFY_QUEUE_SIZE,
+        'max_attempts': config.NOTIFY_MAX_ATTEMPTS,
+        'backoff_max': config.NOTIFY_BACKOFF_MAX
+    }
+    if config.ENABLE_EMAIL and config.EMAIL_DIGEST_WINDOW > 0:
+        # One email per window, sent over the shared SMTP session
+        dispatcher.add_channel('email', SignalNotifier.deliver_email_digest,
+                               workers=config.NOTIFY_EMAIL_WORKERS,
+                               batch_window=config.EMAIL_DIGEST_WINDOW, **options)
+    elif config.ENABLE_EMAIL:
+        dispatcher.add_channel('email', SignalNotifier.deliver_email,
+                               workers=config.NOTIFY_EMAIL_WORKERS, **options)
+    if config.ENABLE_TELEGRAM and config.TELEGRAM_BATCH_WINDOW > 0:
+        # Bursts are combined into one message per window
+        dispatcher.add_channel('telegram', SignalNotifier.deliver_telegram_batch,
+                               workers=config.NOTIFY_TELEGRAM_WORKERS,
+                               batch_window=config.TELEGRAM_BATCH_WINDOW, **options)
+    elif config.ENABLE_TELEGRAM:
+        dispatcher.add_channel('telegram', SignalNotifier.deliver_telegram,
+                               workers=config.NOTIFY_TELEGRAM_WORKERS, **options)
+    return dispatcher
@@ -0,0 +1,275 @@
+"""
+Strategy Presets for the MT5 Signal Bot
+Parses MT5 .set preset files once into typed settings and keeps them in a
+registry keyed by file modification time and content hash. A polling
+watcher reloads only the files that changed, so applying a preset is a
+plain dictionary merge.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# .set keys that map onto bot settings
+PRESET_SETTING_MAP = {
+    'TimeFrame': 'time_frame',
+    'TradingSymbols': 'trading_symbols',
+    'MaxDailyTrades': 'max_daily_trades',
+    'RiskPercent': 'risk_percent',
+    'StopLossPips': 'stop_loss_pips',
+    'TakeProfitPips': 'take_profit_pips',
+    'MinimumSignalStrength': 'minimum_signal_strength',
+    'EnableNewsFilter': 'enable_news_filter',
+    'EnableAIAnalysis': 'enable_ai_analysis',
+    'EnableSentimentAnalysis': 'enable_sentiment_analysis'
+}
+
+# Timeframe mapping from MT5 numeric codes to human-readable values
+TIMEFRAME_CODES = {
+    '1': 'M1', '2': 'M2', '3': 'M3', '4': 'M4', '5': 'M5', '6': 'M6',
+    '10': 'M10', '12': 'M12', '15': 'M15', '20': 'M20', '30': 'M30',
+    '16385': 'H1', '16386': 'H2', '16387': 'H3', '16388': 'H4',
+    '16390': 'H6', '16392': 'H8', '16396': 'H12',
+    '16408': 'D1', '32769': 'W1', '49153': 'MN1'
+}
+
+BOOLEAN_KEYS = ('EnableNewsFilter', 'EnableAIAnalysis', 'EnableSentimentAnalysis')
+INTEGER_KEYS = ('MaxDailyTrades', 'StopLossPips', 'TakeProfitPips', 'MinimumSignalStrength')
+FLOAT_KEYS = ('RiskPercent',)
+
+# Strategy names the EA and the settings page use for the bundled files
+PRESET_ALIASES = {
+    'TrendFollowing': 'STRATEGY_TREND_FOLLOWING',
+    'SwingTrading': 'STRATEGY_SWING_TRADING',
+    'Scalping': 'STRATEGY_SCALPING',
+    'Reversal': 'STRATEGY_REVERSAL'
+}
+
+
+def clean_value(value):
+    """Strip an inline comment and surrounding whitespace"""
+    if isinstance(value, str):
+        return value.split('#')[0].strip()
+    return value
+
+
+def parse_preset_text(text):
+    """
+    Parse the key=value lines of a .set file
+
+    Args:
+        text (str): File contents
+
+    Returns:
+        dict: Parameter name -> value, comments removed
+    """
+    parameters = {}
+    for line in text.splitlines():
+        line = line.strip()
+        # Skip comments and empty lines
+        if line.startswith('#') or not line or '=' not in line:
+            continue
+        key, value = line.split('=', 1)
+        parameters[key.strip()] = clean_value(value)
+    return parameters
+
+
+def compile_settings(parameters):
+    """
+    Convert preset parameters to typed bot settings
+
+    Args:
+        parameters (dict): Parameter name -> value as found in a .set file
+
+    Returns:
+        dict: Bot setting key -> typed value
+    """
+    settings = {}
+    for preset_key, setting_key in PRESET_SETTING_MAP.items():
+        if preset_key not in parameters:
+            continue
+        value = clean_value(parameters[preset_key])
+        if preset_key == 'TimeFrame':
+            value = TIMEFRAME_CODES.get(value, value)
+        elif preset_key in BOOLEAN_KEYS:
+            value = str(value).lower() in ['true', '1', 'yes', 'on']
+        elif preset_key in INTEGER_KEYS:
+            try:
+                value = int(value)
+            except (ValueError, TypeError):
+                pass  # Keep as is if not convertible
+        elif preset_key in FLOAT_KEYS:
+            try:
+                value = float(value)
+            except (ValueError, TypeError):
+                pass  # Keep as is if not convertible
+        settings[setting_key] = value
+    return settings
+
+
+@dataclass(frozen=True)
+class CompiledPreset:
+    """A preset parsed and converted once"""
+    name: str
+    parameters: dict
+    settings: dict
+    digest: str
+    path: str = None
+    aliases: tuple = field(default=())
+
+    @property
+    def strategy_name(self):
+        """Name stored as the active strategy_preset"""
+        return self.aliases[0] if self.aliases else self.name
+
+
+def compile_preset(name, parameters, path=None, digest=None):
+    """Build a CompiledPreset from parsed parameters"""
+    if digest is None:
+        digest = hashlib.sha1(repr(sorted(parameters.items())).encode('utf-8')).hexdigest()
+    aliases = (PRESET_ALIASES[name],) if name in PRESET_ALIASES else ()
+    return CompiledPreset(name, dict(parameters), compile_settings(parameters), digest, path, aliases)
+
+
+class PresetRegistry:
+    """
+    Compiled presets from a directory of .set files plus any added directly
+
+    scan() stats every file and only reads those whose mtime or size
+    changed; a file is only recompiled if its content hash changed too.
+    Lookups accept the file name, its STRATEGY_ alias, either with or
+    without the STRATEGY_ prefix, in any letter case.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Directory holding the .set files
+        """
+        self.path = path
+        self._files = {}  # file path -> (mtime_ns, size, CompiledPreset)
+        self._extra = {}  # name -> CompiledPreset not backed by a file
+        self._index = {}  # lookup key -> CompiledPreset
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def scan(self):
+        """
+        Pick up new, changed and deleted preset files
+
+        Returns:
+            list: CompiledPreset objects that are new or changed
+        """
+        changed = []
+        seen = set()
+        entries = os.listdir(self.path) if os.path.isdir(self.path) else []
+        with self._lock:
+            for file_name in entries:
+                if not file_name.endswith('.set'):
+                    continue
+                file_path = os.path.join(self.path, file_name)
+                try:
+                    stat = os.stat(file_path)
+                    seen.add(file_path)
+                    cached = self._files.get(file_path)
+                    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                        continue
+                    with open(file_path, 'rb') as file:
+                        content = file.read()
+                except OSError as e:
+                    logger.error(f"Error reading preset {file_name}: {e}")
+                    continue
+                digest = hashlib.sha1(content).hexdigest()
+                if cached and cached[2].digest == digest:
+                    # Touched but not modified
+                    self._files[file_path] = (stat.st_mtime_ns, stat.st_size, cached[2])
+                    continue
+                name = os.path.splitext(file_name)[0]
+                preset = compile_preset(name, parse_preset_text(content.decode('utf-8', 'replace')),
+                                        file_path, digest)
+                self._files[file_path] = (stat.st_mtime_ns, stat.st_size, preset)
+                changed.append(preset)
+            removed = [file_path for file_path in self._files if file_path not in seen]
+            for file_path in removed:
+                logger.info(f"Preset file {file_path} was removed")
+                del self._files[file_path]
+            if changed or removed:
+                self._reindex()
+        return changed
+
+    def add(self, name, parameters):
+        """Register a preset that has no file (e.g. one only stored in the database)"""
+        with self._lock:
+            self._extra[name] = compile_preset(name, parameters)
+            self._reindex()
+            return self._extra[name]
+
+    def _reindex(self):
+        """Rebuild the lookup table; files win over directly added presets"""
+        index = {}
+        presets = list(self._extra.values()) + [entry[2] for entry in self._files.values()]
+        for preset in presets:
+            for key in (preset.name,) + preset.aliases:
+                index[key.lower()] = preset
+        self._index = index
+
+    def get(self, name):
+        """
+        Look up a preset by any of its names
+
+        Returns:
+            CompiledPreset: The preset, or None
+        """
+        index = self._index
+        key = name.lower()
+        for candidate in (key, key[len('strategy_'):] if key.startswith('strategy_') else f"strategy_{key}"):
+            if candidate in index:
+                return index[candidate]
+        return None
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def keys(self):
+        """Every name a preset can be loaded by"""
+        with self._lock:
+            presets = list(self._extra.values()) + [entry[2] for entry in self._files.values()]
+        names = []
+        for preset in presets:
+            for name in (preset.name,) + preset.aliases:
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def start_watcher(self, interval, on_change=None):
+        """
+        Poll the directory and hot-reload changed files
+
+        Args:
+            interval (float): Seconds between scans
+            on_change (callable): Called with the list of changed presets
+        """
+        def _watch():
+            while not self._stopped.wait(interval):
+                try:
+                    changed = self.scan()
+                    if changed:
+                        logger.info(f"Reloaded presets: {', '.join(preset.name for preset in changed)}")
+                        if on_change is not None:
+                            on_change(changed)
+                except Exception as e:
+                    logger.error(f"Error reloading presets: {e}")
+
+        if self._thread is None and interval > 0:
+            self._thread = threading.Thread(target=_watch, name="preset-watcher", daemon=True)
+            self._thread.start()
+
+    def stop_watcher(self):
+        """Stop the watcher thread"""
+        self._stopped.set()
@@ -0,0 +1,157 @@
+"""
+Signal Archive for the MT5 Signal Bot
+Signals older than the hot retention window are moved out of the signals
+table into one gzip'd JSON Lines file per day, so the table and its
+indexes only hold recent rows. Archived days stay readable for the
+history API.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import tempfile
+from datetime import date, datetime, timedelta
+
+from db_models import Signal
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Archive files are named after the day they hold
+PARTITION_PATTERN = re.compile(r'^signals-(\d{4}-\d{2}-\d{2})\.jsonl\.gz$')
+DATETIME_COLUMNS = ('created_at', 'execution_time')
+
+
+def row_to_record(signal):
+    """Serialise every column of a Signal row"""
+    record = {column.name: getattr(signal, column.name) for column in Signal.__table__.columns}
+    for key in DATETIME_COLUMNS:
+        if record[key] is not None:
+            record[key] = record[key].isoformat()
+    return record
+
+
+def record_to_signal(record):
+    """Rebuild a detached Signal from an archived record"""
+    record = dict(record)
+    for key in DATETIME_COLUMNS:
+        if record.get(key):
+            record[key] = datetime.fromisoformat(record[key])
+    return Signal(**record)
+
+
+class SignalArchive:
+    """
+    Day partitions of archived signals
+
+    Each file holds one calendar day (by created_at), sorted newest first
+    by (created_at, id) so history reads can stream it in order. Files are
+    written to a unique temporary file, synced and renamed, so a partition
+    is either complete or absent.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Directory holding the partition files
+        """
+        self.path = path
+
+    def partition_path(self, day):
+        """File holding the signals of one day"""
+        return os.path.join(self.path, f"signals-{day.isoformat()}.jsonl.gz")
+
+    def partitions(self):
+        """
+        Archived days, newest first
+
+        Returns:
+            list: date objects
+        """
+        if not os.path.isdir(self.path):
+            return []
+        days = []
+        for name in os.listdir(self.path):
+            match = PARTITION_PATTERN.match(name)
+            if match:
+                days.append(date.fromisoformat(match.group(1)))
+        return sorted(days, reverse=True)
+
+    def _read_records(self, day):
+        """Stream the records of one partition"""
+        path = self.partition_path(day)
+        if not os.path.exists(path):
+            return
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+    def write_partition(self, day, records):
+        """
+        Store records for a day, merging with anything already archived
+
+        Args:
+            day (date): Partition day
+            records (list): Records from row_to_record()
+
+        Returns:
+            int: Number of records in the partition afterwards
+        """
+        os.makedirs(self.path, exist_ok=True)
+        merged = {record['id']: record for record in self._read_records(day)}
+        merged.update((record['id'], record) for record in records)
+        ordered = sorted(merged.values(), key=lambda record: (record['created_at'], record['id']), reverse=True)
+
+        path = self.partition_path(day)
+        fd, temp_path = tempfile.mkstemp(prefix=f".signals-{day.isoformat()}-", suffix='.tmp', dir=self.path)
+        try:
+            with os.fdopen(fd, 'wb') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='wb') as file:
+                    for record in ordered:
+                        file.write(json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n')
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return len(ordered)
+
+    def iter_signals(self, before=None, symbol=None, direction=None, executed=None, min_strength=None):
+        """
+        Stream archived signals newest first
+
+        Args:
+            before (tuple): Only signals before this (created_at, id) position
+            symbol, direction, executed, min_strength: Same filters as
+                DBManager.iter_signal_history
+
+        Yields:
+            Signal: Detached Signal objects
+        """
+        for day in self.partitions():
+            if before and day > before[0].date():
+                continue
+            for record in self._read_records(day):
+                if symbol and record['symbol'] != symbol:
+                    continue
+                if direction and record['direction'] != direction:
+                    continue
+                if executed is not None and bool(record['executed']) != executed:
+                    continue
+                if min_strength is not None and record['strength'] < min_strength:
+                    continue
+                signal = record_to_signal(record)
+                if before and (signal.created_at, signal.id) >= before:
+                    continue
+                yield signal
+
+
+def retention_cutoff(retention_days, now=None):
+    """Start of the oldest day that stays in the signals table"""
+    today = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=retention_days)
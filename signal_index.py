@@ -0,0 +1,135 @@
+"""
+Signal Index for the MT5 Signal Bot
+Bounded in-memory index of recent signals by id, with a per-symbol index
+ordered by time. Lookups that miss fall back to the database, so older
+signals stay reachable without reloading the signal cache.
+"""
+
+import bisect
+import threading
+from collections import OrderedDict
+
+# Signals kept in memory
+SIGNAL_INDEX_SIZE = 1000
+
+
+class SignalIndex:
+    """
+    LRU map of signal id -> SignalRecord plus a per-symbol time index
+
+    The least recently used signal is evicted once `capacity` is reached.
+    Records are immutable: updates replace them.
+    """
+
+    def __init__(self, capacity=SIGNAL_INDEX_SIZE, loader=None):
+        """
+        Args:
+            capacity (int): Signals kept in memory
+            loader (callable): Called with an id on a miss, returns the
+                SignalRecord or None
+        """
+        self.capacity = capacity
+        self.loader = loader
+        self.hits = 0
+        self.misses = 0
+        self._signals = OrderedDict()
+        self._by_symbol = {}  # symbol -> sorted [(time, id)]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._signals)
+
+    def get(self, signal_id):
+        """
+        Look up a signal by id, loading it on a miss
+
+        Returns:
+            SignalRecord: The signal, or None if it doesn't exist
+        """
+        with self._lock:
+            signal = self._signals.get(signal_id)
+            if signal is not None:
+                self._signals.move_to_end(signal_id)
+                self.hits += 1
+                return signal
+            self.misses += 1
+        if self.loader is None:
+            return None
+        signal = self.loader(signal_id)
+        if signal is not None:
+            self.put(signal)
+        return signal
+
+    def put(self, signal):
+        """Add or replace one signal"""
+        self.update([signal])
+
+    def update(self, signals):
+        """Add or replace signals, e.g. after reloading the latest ones"""
+        with self._lock:
+            for signal in signals:
+                signal_id = signal.get('id')
+                if signal_id is None:
+                    continue
+                self._remove(signal_id)
+                self._signals[signal_id] = signal
+                bisect.insort(self._by_symbol.setdefault(signal['symbol'], []),
+                              (signal.get('time') or '', signal_id))
+            while len(self._signals) > self.capacity:
+                self._remove(next(iter(self._signals)))
+
+    def mark_executed(self, signal_id, executed=True):
+        """Update the cached execution flag of a signal"""
+        with self._lock:
+            signal = self._signals.get(signal_id)
+            if signal is not None:
+                self._signals[signal_id] = signal.replace(executed=executed)
+
+    def discard(self, signal_id):
+        """Forget a signal"""
+        with self._lock:
+            self._remove(signal_id)
+
+    def clear(self):
+        """Forget every signal"""
+        with self._lock:
+            self._signals.clear()
+            self._by_symbol.clear()
+
+    def by_symbol(self, symbol, start=None, end=None):
+        """
+        Cached signals of one symbol within a time range, oldest first
+
+        Only signals currently held in memory are returned.
+
+        Args:
+            symbol (str): Trading symbol
+            start (str): Earliest time, "YYYY-MM-DD HH:MM:SS", inclusive
+            end (str): Latest time, inclusive
+
+        Returns:
+            list: SignalRecords
+        """
+        with self._lock:
+            keys = self._by_symbol.get(symbol, [])
+            low = bisect.bisect_left(keys, (start, -1)) if start else 0
+            high = bisect.bisect_right(keys, (end, float('inf'))) if end else len(keys)
+            return [self._signals[signal_id] for _, signal_id in keys[low:high]]
+
+    def stats(self):
+        """Size and hit counters for diagnostics"""
+        return {"size": len(self._signals), "capacity": self.capacity,
+                "hits": self.hits, "misses": self.misses}
+
+    def _remove(self, signal_id):
+        """Drop a signal from both indexes (lock held)"""
+        signal = self._signals.pop(signal_id, None)
+        if signal is None:
+            return
+        keys = self._by_symbol.get(signal['symbol'])
+        key = (signal.get('time') or '', signal_id)
+        position = bisect.bisect_left(keys, key)
+        if position < len(keys) and keys[position] == key:
+            del keys[position]
+        if not keys:
+            del self._by_symbol[signal['symbol']]
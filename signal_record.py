@@ -0,0 +1,113 @@
+"""
+Signal Records for the MT5 Signal Bot
+Compact, slotted record used for signals held in memory: decoded off the
+MT5 wire, loaded from the database, cached and sent to dashboards. A
+record is encoded to JSON once and the text is reused by every API
+response and Socket.IO emit that includes it.
+"""
+
+import json
+import re
+from dataclasses import dataclass, fields, replace
+
+# Keys hidden from the mapping view and the JSON form while unset
+OPTIONAL_KEYS = ('id', 'executed', 'seq', 'sentiment')
+# Stand-in for a record in json.dumps() output, see dumps()
+_PLACEHOLDER = re.compile(r'"\\u0000([0-9a-f]+):(\d+)"')
+
+
+@dataclass(slots=True)
+class _SignalFields:
+    symbol: str
+    direction: str
+    strength: int
+    entry_price: float
+    stop_loss: float = None
+    take_profit: float = None
+    reason: str = None
+    time: str = None
+    seq: int = None
+    sentiment: dict = None
+    id: int = None
+    executed: bool = None
+
+
+class SignalRecord(_SignalFields):
+    """
+    Lightweight signal record
+
+    Supports the read-only mapping access (`record['symbol']`,
+    `record.get('stop_loss')`, `'sentiment' in record`) that code written
+    against signal dicts relies on. Records are treated as immutable: use
+    replace() to change a field, which also drops the cached JSON.
+    """
+
+    __slots__ = ('_json',)
+
+    def __getitem__(self, key):
+        try:
+            value = getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+        if value is None and key in OPTIONAL_KEYS:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return getattr(self, key, None) is not None
+
+    def get(self, key, default=None):
+        """Mapping-style access with a default"""
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def replace(self, **changes):
+        """Copy of the record with some fields changed"""
+        return replace(self, **changes)
+
+    def to_dict(self):
+        """Convert the record to a plain dictionary"""
+        signal_dict = {field.name: getattr(self, field.name) for field in fields(self)}
+        for key in OPTIONAL_KEYS:
+            if signal_dict[key] is None:
+                del signal_dict[key]
+        return signal_dict
+
+    def to_json(self):
+        """Compact JSON text of the record, encoded on first use"""
+        try:
+            return self._json
+        except AttributeError:
+            self._json = json.dumps(self.to_dict(), separators=(',', ':'))
+            return self._json
+
+
+def dumps(obj, **kwargs):
+    """
+    json.dumps() that splices in the cached JSON of signal records
+
+    Together with loads() this module can stand in for the json module,
+    e.g. as Socket.IO's packet encoder.
+    """
+    records = []
+    # Tells our placeholders apart from strings that merely look like them
+    token = f"{id(records):x}"
+
+    def default(value):
+        if isinstance(value, SignalRecord):
+            records.append(value)
+            return f"\0{token}:{len(records) - 1}"
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    def splice(match):
+        if match.group(1) != token:
+            return match.group(0)
+        return records[int(match.group(2))].to_json()
+
+    text = json.dumps(obj, default=default, **kwargs)
+    if not records:
+        return text
+    return _PLACEHOLDER.sub(splice, text)
+
+
+loads = json.loads
@@ -0,0 +1,110 @@
+"""
+Start-up Warm-up for the MT5 Signal Bot
+Runs the slow start-up work (database, presets, caches, background
+services) on a background thread so the web server can bind its port at
+once. Steps that fail, e.g. because the database is still starting, are
+retried with backoff; progress is reported for readiness probes.
+"""
+
+import logging
+import threading
+import time
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class WarmUp:
+    """
+    Ordered start-up steps run once on a background thread
+
+    `ready` is set after the last step has completed. Each step is retried
+    until it succeeds, so a step must be safe to run again after failing.
+    """
+
+    def __init__(self, backoff_max=30.0):
+        """
+        Args:
+            backoff_max (float): Longest delay in seconds between retries
+                of a failed step
+        """
+        self.backoff_max = backoff_max
+        self.steps = []
+        self.ready = threading.Event()
+        self.current = None
+        self.completed = []  # (step name, seconds taken)
+        self.attempts = 0
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add_step(self, name, func):
+        """
+        Append a step
+
+        Args:
+            name (str): Name reported while the step runs
+            func (callable): Performs the step, raising on failure
+        """
+        self.steps.append((name, func))
+
+    def start(self):
+        """Start the warm-up thread (idempotent)"""
+        with self._lock:
+            if self._thread is None:
+                self.started_at = time.monotonic()
+                self._thread = threading.Thread(target=self._run, name="warm-up", daemon=True)
+                self._thread.start()
+
+    def wait(self, timeout=None):
+        """
+        Wait for the warm-up to finish
+
+        Returns:
+            bool: False if it is still running after `timeout` seconds
+        """
+        return self.ready.wait(timeout)
+
+    def status(self):
+        """Progress for readiness probes"""
+        if self.started_at is None:
+            elapsed = None
+        else:
+            elapsed = round((self.finished_at or time.monotonic()) - self.started_at, 3)
+        return {
+            "ready": self.ready.is_set(),
+            "step": self.current,
+            "completed": [{"step": name, "seconds": round(seconds, 3)} for name, seconds in self.completed],
+            "pending": [name for name, _ in self.steps[len(self.completed):]],
+            "attempts": self.attempts,
+            "error": self.error,
+            "elapsed": elapsed
+        }
+
+    def _run(self):
+        """Run every step in order, retrying failures"""
+        for name, func in self.steps:
+            self.current = name
+            self.attempts = 0
+            delay = 1.0
+            while True:
+                self.attempts += 1
+                started = time.monotonic()
+                try:
+                    func()
+                    break
+                except Exception as e:
+                    self.error = f"{name}: {e}"
+                    logger.error(f"Start-up step {name} failed (attempt {self.attempts}), "
+                                 f"retrying in {delay:.0f}s: {e}")
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.backoff_max)
+            self.completed.append((name, time.monotonic() - started))
+            self.error = None
+            logger.info(f"Start-up step {name} done in {self.completed[-1][1]:.2f}s")
+        self.current = None
+        self.finished_at = time.monotonic()
+        self.ready.set()
+        logger.info(f"Start-up finished in {self.finished_at - self.started_at:.2f}s")
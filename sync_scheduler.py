@@ -0,0 +1,162 @@
+"""
+MT5 Sync Scheduler for the MT5 Signal Bot
+Runs every MT5 sync on one background thread so request handlers serve
+cached data instead of talking to MT5 themselves. Refresh requests that
+arrive while a sync is due or running are coalesced into that one sync.
+"""
+
+import logging
+import threading
+import time
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class SyncScheduler:
+    """
+    Single-flight periodic sync
+
+    The worker thread calls `sync_func` every `interval` seconds, or sooner
+    when a refresh is requested. Readers call ensure_fresh(): when the last
+    successful sync is within `max_staleness` it returns at once, otherwise
+    it asks for a refresh and waits, sharing the result with every other
+    caller waiting at the same time.
+    """
+
+    def __init__(self, sync_func, interval=5.0, max_staleness=15.0, wait_timeout=10.0, on_sync=None):
+        """
+        Args:
+            sync_func (callable): Performs one sync, returns True on success
+            interval (float): Seconds between scheduled syncs
+            max_staleness (float): Age in seconds beyond which readers wait
+                for a fresh sync
+            wait_timeout (float): Longest a reader waits for that sync
+            on_sync (callable): Called after every successful sync
+        """
+        self.sync_func = sync_func
+        self.interval = interval
+        self.max_staleness = max_staleness
+        self.wait_timeout = wait_timeout
+        self.on_sync = on_sync
+        self.last_success = None  # monotonic time of the last successful sync
+        self.sync_count = 0
+        self.coalesced_requests = 0
+        self._generation = 0  # completed sync attempts
+        self._requested = False
+        self._running = False
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    def start(self):
+        """Start the worker thread (idempotent)"""
+        with self._condition:
+            if self._thread is None:
+                # Sync straight away rather than after the first interval
+                self._requested = True
+                self._thread = threading.Thread(target=self._run, name="mt5-sync", daemon=True)
+                self._thread.start()
+                logger.info("Starting MT5 sync scheduler")
+
+    def stop(self):
+        """Stop the worker thread after the current sync"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    @property
+    def age(self):
+        """Seconds since the last successful sync, None if there was none"""
+        if self.last_success is None:
+            return None
+        return time.monotonic() - self.last_success
+
+    def request_refresh(self, accept_running=False):
+        """
+        Ask for a sync as soon as possible without waiting for it
+
+        Args:
+            accept_running (bool): A sync already in progress is good
+                enough; otherwise it may have read MT5 before this request
+                and the next one is awaited
+
+        Returns:
+            int: Sync generation to pass to wait_for()
+        """
+        self.start()
+        with self._condition:
+            if self._running and accept_running:
+                self.coalesced_requests += 1
+                return self._generation + 1
+            if self._requested:
+                self.coalesced_requests += 1
+            self._requested = True
+            self._condition.notify_all()
+            return self._generation + 2 if self._running else self._generation + 1
+
+    def wait_for(self, generation, timeout=None):
+        """
+        Wait until sync `generation` has completed
+
+        Returns:
+            bool: False if the wait timed out
+        """
+        timeout = self.wait_timeout if timeout is None else timeout
+        with self._condition:
+            return self._condition.wait_for(lambda: self._generation >= generation or self._stopped, timeout)
+
+    def refresh(self, timeout=None):
+        """Force a sync and wait for it, e.g. after placing a trade"""
+        return self.wait_for(self.request_refresh(), timeout)
+
+    def ensure_fresh(self, timeout=None):
+        """
+        Make sure cached data is no older than the staleness bound
+
+        Returns:
+            bool: True if the data is fresh enough to serve
+        """
+        age = self.age
+        if age is not None and age <= self.max_staleness:
+            self.start()
+            return True
+        self.wait_for(self.request_refresh(accept_running=True), timeout)
+        age = self.age
+        return age is not None and age <= self.max_staleness
+
+    def stats(self):
+        """Scheduler counters for diagnostics"""
+        age = self.age
+        return {
+            "syncs": self.sync_count,
+            "coalesced_requests": self.coalesced_requests,
+            "age": round(age, 3) if age is not None else None
+        }
+
+    def _run(self):
+        """Worker loop"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._requested or self._stopped, self.interval)
+                if self._stopped:
+                    return
+                self._requested = False
+                self._running = True
+            try:
+                success = self.sync_func()
+            except Exception as e:
+                logger.error(f"Error in MT5 sync: {str(e)}")
+                success = False
+            with self._condition:
+                self._running = False
+                self._generation += 1
+                self.sync_count += 1
+                if success:
+                    self.last_success = time.monotonic()
+                self._condition.notify_all()
+            if success and self.on_sync is not None:
+                try:
+                    self.on_sync()
+                except Exception as e:
+                    logger.error(f"Error after MT5 sync: {str(e)}")
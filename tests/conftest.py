@@ -0,0 +1,72 @@
+"""Shared test setup: a throwaway SQLite database unless DATABASE_URL is set, and stub EA servers"""
+
+import asyncio
+import os
+import tempfile
+import threading
+
+import pytest
+
+_scratch = tempfile.mkdtemp(prefix='signal-bot-tests-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_scratch, 'test.db')}")
+os.environ.setdefault('SIGNAL_ARCHIVE_PATH', os.path.join(_scratch, 'archive'))
+
+from mt5_stub_server import StubEAServer  # noqa: E402  (needs the environment above)
+
+
+class StubEA:
+    """StubEAServer running on a background event loop"""
+
+    def __init__(self, loop, **options):
+        self.loop = loop
+        self.server = StubEAServer(**options)
+        self.port = self.run(self.server.start())
+
+    def run(self, coro):
+        """Run a coroutine on the server's loop and return its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(10)
+
+    def add_signal(self, **signal):
+        """Have the EA generate a signal"""
+        async def add():
+            return self.server.add_signal(dict(SIGNAL, **signal))
+        return self.run(add())
+
+    def drop_clients(self):
+        """Close every open connection to the server"""
+        async def drop():
+            self.server.drop_clients()
+        self.run(drop())
+
+    def stop(self):
+        self.run(self.server.stop())
+
+
+# Fields of a typical signal produced by the stub EA
+SIGNAL = dict(symbol='EURUSD', direction='BUY', strength=6, entry_price=1.1,
+              stop_loss=1.09, take_profit=1.12, reason='MA cross')
+
+
+@pytest.fixture
+def event_loop_thread():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+
+@pytest.fixture
+def stub_ea(event_loop_thread):
+    """Factory starting stub EA servers, see StubEAServer for the options"""
+    servers = []
+
+    def start(**options):
+        servers.append(StubEA(event_loop_thread, **options))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.stop()
@@ -0,0 +1,146 @@
+"""Tests for the cross-process event buses"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from event_bus import (CrossProcessEventBus, LocalEventBus, PostgresEventBus, SocketEventBus,
+                       NOTIFY_PAYLOAD_MAX, create_event_bus)
+
+class RecordingBus(CrossProcessEventBus):
+    """Bus that keeps what it would send to other processes"""
+
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    def _send(self, payload):
+        self.sent.append(payload)
+
+
+def received(bus, topic):
+    events = []
+    bus.subscribe(topic, events.append)
+    return events
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_small_payload_is_plain_json():
+    payload = PostgresEventBus._encode({"origin": "a", "topic": "invalidate", "data": ["signals"]})
+    assert json.loads(payload)["data"] == ["signals"]
+    assert PostgresEventBus._decode(payload)["topic"] == "invalidate"
+
+
+def test_large_payload_is_compressed():
+    message = {"origin": "a", "topic": "t", "data": ["signals"] * 2000}
+    payload = PostgresEventBus._encode(message)
+    assert payload.startswith('z:')
+    assert len(payload) <= NOTIFY_PAYLOAD_MAX
+    assert PostgresEventBus._decode(payload) == message
+
+
+def test_oversize_event_is_dropped():
+    bus = RecordingBus()
+    events = received(bus, "t")
+    # Random text doesn't compress below the limit
+    bus.publish("t", os.urandom(NOTIFY_PAYLOAD_MAX).hex())
+    assert bus.sent == []
+    assert len(events) == 1
+
+
+def test_receive_skips_own_events():
+    bus, other = RecordingBus(), RecordingBus()
+    events = received(bus, "t")
+    other.publish("t", 1, local=False)
+    bus.publish("t", 2, local=False)
+    for payload in other.sent + bus.sent:
+        bus._receive(payload)
+    assert events == [1]
+
+
+def test_receive_discards_malformed_payloads():
+    bus = RecordingBus()
+    events = received(bus, "t")
+    for payload in ('not json', 'z:!!!', 'z:' + 'aGVsbG8=', '[1, 2]'):
+        bus._receive(payload)
+    assert events == []
+
+
+def test_compressed_events_are_delivered():
+    bus, other = RecordingBus(), RecordingBus()
+    events = received(bus, "t")
+    other.publish("t", ["x"] * 5000, local=False)
+    assert other.sent[0].startswith('z:')
+    bus._receive(other.sent[0])
+    assert events == [["x"] * 5000]
+
+
+@pytest.fixture
+def socket_buses(tmp_path):
+    buses = []
+
+    def make():
+        bus = SocketEventBus(str(tmp_path / 'bus'), poll_interval=0.1)
+        bus.start()
+        buses.append(bus)
+        return bus
+
+    yield make
+    for bus in buses:
+        bus.stop()
+
+
+def test_socket_bus_delivers_to_other_buses(socket_buses):
+    first, second, third = socket_buses(), socket_buses(), socket_buses()
+    events = {bus: received(bus, "invalidate") for bus in (first, second, third)}
+    first.publish("invalidate", ["signals"], local=False)
+    assert wait_for(lambda: events[second] and events[third])
+    assert events[second] == events[third] == [["signals"]]
+    time.sleep(0.2)
+    assert events[first] == []
+
+
+def test_socket_bus_removes_stale_sockets(socket_buses):
+    bus = socket_buses()
+    # Socket left behind by a worker that exited
+    stale = os.path.join(bus.path, 'exited.sock')
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        sock.bind(stale)
+    bus.publish("invalidate", None, local=False)
+    assert not os.path.exists(stale)
+
+
+def test_socket_bus_across_processes(socket_buses, tmp_path):
+    bus = socket_buses()
+    events = received(bus, "invalidate")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = ("import sys; from event_bus import SocketEventBus; "
+              "SocketEventBus(sys.argv[1]).publish('invalidate', ['settings'], local=False)")
+    subprocess.run([sys.executable, '-c', script, bus.path], cwd=root, check=True, timeout=30)
+    assert wait_for(lambda: events)
+    assert events == [["settings"]]
+
+
+def test_auto_backend(monkeypatch):
+    class Engine:
+        class dialect:
+            name = 'sqlite'
+
+        class url:
+            database = 'bot.db'
+
+    assert isinstance(create_event_bus('auto', Engine), SocketEventBus)
+    assert type(create_event_bus('local', Engine)) is LocalEventBus
+    Engine.dialect.name = 'postgresql'
+    assert isinstance(create_event_bus('auto', Engine), PostgresEventBus)
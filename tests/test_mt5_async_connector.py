@@ -0,0 +1,90 @@
+"""Tests for the asyncio MT5 connector against the stub EA server"""
+
+import asyncio
+import time
+
+from mt5_async_connector import AsyncMT5Connector
+from mt5_stub_server import StubEAServer
+
+
+async def serve(**options):
+    server = StubEAServer(**options)
+    await server.start()
+    return server
+
+
+def test_concurrent_commands_while_one_is_slow():
+    async def scenario():
+        server = await serve(delays={"GET_STATUS": 0.5})
+        try:
+            async with AsyncMT5Connector(port=server.port, timeout=5) as connector:
+                slow = asyncio.create_task(connector.get_status())
+                started = time.monotonic()
+                pings = await asyncio.gather(*(connector.send_command("PING") for _ in range(20)))
+                fast_elapsed = time.monotonic() - started
+                assert not slow.done()
+                status = await slow
+                return pings, fast_elapsed, status
+        finally:
+            await server.stop()
+
+    pings, fast_elapsed, status = asyncio.run(scenario())
+    assert pings == [{"pong": True}] * 20
+    assert fast_elapsed < 0.3
+    assert status['running'] is True
+
+
+def test_cancelled_request_is_abandoned():
+    async def scenario():
+        server = await serve(delays={"GET_STATUS": 0.3})
+        try:
+            async with AsyncMT5Connector(port=server.port, timeout=5) as connector:
+                task = asyncio.create_task(connector.get_status())
+                await asyncio.sleep(0.05)
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                assert task.cancelled()
+                assert connector._pending == {}
+                # The late reply arrives meanwhile and is dropped
+                await asyncio.sleep(0.4)
+                preset = await connector.load_preset("after-cancel")
+                return preset, connector.connected, connector._pending
+        finally:
+            await server.stop()
+
+    preset, connected, pending = asyncio.run(scenario())
+    assert preset == {"status": "success", "preset": "after-cancel"}
+    assert connected
+    assert pending == {}
+
+
+def test_responses_without_ids_are_matched_in_order():
+    async def scenario():
+        server = await serve(echo_ids=False)
+        try:
+            async with AsyncMT5Connector(port=server.port, timeout=5) as connector:
+                names = [f"preset-{index}" for index in range(50)]
+                results = await asyncio.gather(*(connector.load_preset(name) for name in names))
+                return names, [result['preset'] for result in results]
+        finally:
+            await server.stop()
+
+    names, presets = asyncio.run(scenario())
+    assert presets == names
+
+
+def test_connection_loss_fails_pending_requests():
+    async def scenario():
+        server = await serve(delays={"GET_STATUS": 5})
+        try:
+            async with AsyncMT5Connector(port=server.port, timeout=5) as connector:
+                task = asyncio.create_task(connector.get_status())
+                await asyncio.sleep(0.05)
+                server.drop_clients()
+                return await task, connector.connected
+        finally:
+            await server.stop()
+
+    result, connected = asyncio.run(scenario())
+    assert "error" in result
+    assert not connected
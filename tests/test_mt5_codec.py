@@ -0,0 +1,84 @@
+"""Tests for the MT5 wire encodings"""
+
+import json
+
+import pytest
+
+from mt5_codec import JSON_CODEC, StructCodec, available_encodings, get_codec
+
+SIGNAL = dict(symbol='EURUSD', direction='BUY', strength=7, entry_price=1.1012,
+              stop_loss=1.0950, take_profit=None, reason='MA cross', time='2026-03-02 10:15:00', seq=4)
+
+
+def kind(payload):
+    return StructCodec.ENVELOPE.unpack_from(payload)[0]
+
+
+def plain(message):
+    """Decoded message with signal records as dicts"""
+    return dict(message, signals=[signal.to_dict() for signal in message["signals"]])
+
+
+def test_signals_and_cursor_are_packed():
+    codec = StructCodec()
+    message = {"id": 9, "signals": [SIGNAL, dict(SIGNAL, direction='SELL', seq=5)], "cursor": 5}
+    payload = codec.encode(message)
+    assert kind(payload) == StructCodec.KIND_SIGNALS
+    assert plain(codec.decode(payload)) == message
+
+
+def test_status_is_packed():
+    codec = StructCodec()
+    status = {"running": True, "connected": False, "account_balance": 10250.5, "total_trades_today": 3,
+              "total_signals_today": 12, "last_update": '2026-03-02 10:15:00', "bot_version": "1.0"}
+    payload = codec.encode(status)
+    assert kind(payload) == StructCodec.KIND_STATUS
+    assert codec.decode(payload) == status
+
+
+@pytest.mark.parametrize('change', [
+    {'symbol': 'XAUUSD.ecn_pro'},
+    {'symbol': 'ÜBERUSD'},
+    {'strength': 300},
+    {'entry_price': float('nan')},
+    {'time': '2026-03-02T10:15:00.5'},
+    {'reason': ''},
+    {'broker': 'extra field'},
+])
+def test_signals_that_do_not_fit_use_the_json_envelope(change):
+    codec = StructCodec()
+    message = {"id": 3, "signals": [SIGNAL, dict(SIGNAL, **change)], "cursor": 5}
+    payload = codec.encode(message)
+    assert kind(payload) == StructCodec.KIND_JSON
+    decoded = codec.decode(payload)
+    assert json.dumps(decoded, sort_keys=True) == json.dumps(message, sort_keys=True)
+
+
+def test_status_with_extra_fields_uses_the_json_envelope():
+    codec = StructCodec()
+    status = {"running": True, "connected": True, "account_balance": 10.0, "margin_level": 250.0}
+    payload = codec.encode(status)
+    assert kind(payload) == StructCodec.KIND_JSON
+    assert codec.decode(payload) == status
+
+
+def test_other_messages_use_the_json_envelope():
+    codec = StructCodec()
+    for message in ({"id": 1, "pong": True}, {"error": "Unknown command", "signals": []}):
+        payload = codec.encode(message)
+        assert kind(payload) == StructCodec.KIND_JSON
+        assert codec.decode(payload) == message
+
+
+def test_old_peers_without_extra_block_still_decode():
+    codec = StructCodec()
+    payload = codec.encode({"signals": [SIGNAL]})
+    trimmed = payload[:-StructCodec.EXTRA.size]
+    assert plain(codec.decode(trimmed)) == {"signals": [SIGNAL]}
+
+
+def test_available_encodings_always_end_with_json():
+    assert available_encodings(["struct"])[-1] == "json"
+    assert available_encodings([]) == ["json"]
+    assert get_codec("json") is JSON_CODEC
+    assert get_codec("nope") is None
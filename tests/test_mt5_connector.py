@@ -0,0 +1,148 @@
+"""Tests for the threaded MT5 connector against the stub EA server"""
+
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mt5_connector import MT5Connector, SignalSubscription, next_signal_cursor
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def connect():
+    connectors = []
+
+    def make(ea, **options):
+        connectors.append(MT5Connector(port=ea.port, timeout=5, **options))
+        return connectors[-1]
+
+    yield make
+    for connector in connectors:
+        connector.disconnect()
+
+
+def test_responses_without_ids_reach_their_callers(stub_ea, connect):
+    ea = stub_ea(echo_ids=False)
+    connector = connect(ea)
+    names = [f"preset-{index}" for index in range(1000)]
+    with ThreadPoolExecutor(32) as pool:
+        presets = list(pool.map(lambda name: connector.load_preset(name).get('preset'), names))
+    assert presets == names
+    assert not connector._peer_echoes_ids
+
+
+def test_slow_request_does_not_hold_up_others(stub_ea, connect):
+    ea = stub_ea(delays={"GET_STATUS": 1.0})
+    connector = connect(ea)
+    with ThreadPoolExecutor(8) as pool:
+        slow = pool.submit(connector.get_status)
+        started = time.monotonic()
+        pings = list(pool.map(lambda _: connector.send_command("PING"), range(20)))
+        fast_elapsed = time.monotonic() - started
+        assert not slow.done()
+        assert slow.result()['running'] is True
+    assert pings == [{"pong": True}] * 20
+    assert fast_elapsed < 0.5
+    assert connector._peer_echoes_ids
+
+
+def test_timed_out_request_leaves_connection_usable(stub_ea, connect):
+    ea = stub_ea(delays={"GET_STATUS": 1.0})
+    connector = connect(ea)
+    connector.timeout = 0.2
+    assert connector.get_status() == {"error": "Connection timeout"}
+    connector.timeout = 5
+    assert connector.send_command("PING") == {"pong": True}
+    # The late reply is discarded, not handed to another request
+    time.sleep(1.0)
+    assert connector.load_preset("late") == {"status": "success", "preset": "late"}
+    assert connector._pending == {}
+
+
+def test_cursor_sync_only_returns_new_signals(stub_ea, connect):
+    ea = stub_ea()
+    connector = connect(ea)
+    for price in (1.1, 1.2):
+        ea.add_signal(entry_price=price)
+    first = connector.get_signals()
+    assert [signal['seq'] for signal in first['signals']] == [1, 2]
+    cursor = next_signal_cursor(first)
+    assert cursor == 2
+    assert connector.get_signals(since=cursor)['signals'] == []
+    ea.add_signal(entry_price=1.3)
+    second = connector.get_signals(since=cursor)
+    assert [signal['entry_price'] for signal in second['signals']] == [1.3]
+    assert next_signal_cursor(second, cursor) == 3
+    assert next_signal_cursor({"signals": []}, 3) == 3
+
+
+@pytest.mark.parametrize('symbol', ['EURUSD', 'XAUUSD.ecn_pro', 'ÜBER'])
+def test_struct_encoding_keeps_signals_intact(stub_ea, connect, symbol):
+    ea = stub_ea()
+    connector = connect(ea, encodings=["struct", "json"])
+    ea.add_signal(symbol=symbol)
+    result = connector.get_signals(since=0)
+    assert connector.codec.name == "struct"
+    assert result['cursor'] == 1
+    assert result['signals'][0]['symbol'] == symbol
+    assert connector.get_status()['account_balance'] == 10000.0
+
+
+def test_silent_hello_falls_back_to_json():
+    # An EA that doesn't know HELLO accepts the connection and never answers
+    with socket.create_server(('127.0.0.1', 0)) as server:
+        connector = MT5Connector(port=server.getsockname()[1], timeout=5,
+                                 encodings=["struct", "json"], hello_timeout=0.2)
+        started = time.monotonic()
+        assert not connector.connect()
+        assert time.monotonic() - started < 1.0
+    assert connector.encodings == ["json"]
+
+
+@pytest.fixture
+def subscriptions():
+    running = []
+    yield running
+    for subscription in running:
+        subscription.stop()
+
+
+def test_subscription_replays_after_since_seq(stub_ea, subscriptions):
+    ea = stub_ea()
+    for price in (1.1, 1.2, 1.3):
+        ea.add_signal(entry_price=price)
+    received = []
+    subscription = SignalSubscription(port=ea.port, timeout=5, since_seq=1, reconnect_delay=0.05)
+    subscription.add_callback(received.append)
+    subscriptions.append(subscription.start())
+    assert wait_for(lambda: len(received) == 2)
+    ea.add_signal(entry_price=1.4)
+    assert wait_for(lambda: len(received) == 3)
+    assert [signal['seq'] for signal in received] == [2, 3, 4]
+    assert subscription.gaps_detected == 0
+
+
+def test_subscription_resumes_after_reconnect(stub_ea, subscriptions):
+    ea = stub_ea()
+    ea.add_signal(entry_price=1.1)
+    received = []
+    subscription = SignalSubscription(port=ea.port, timeout=5, reconnect_delay=0.05)
+    subscription.add_callback(received.append)
+    subscriptions.append(subscription.start())
+    assert wait_for(lambda: len(received) == 1)
+    ea.drop_clients()
+    assert wait_for(lambda: not subscription.connected)
+    # Generated while the channel was down
+    ea.add_signal(entry_price=1.2)
+    assert wait_for(lambda: len(received) == 2)
+    ea.add_signal(entry_price=1.3)
+    assert wait_for(lambda: len(received) == 3)
+    assert [signal['seq'] for signal in received] == [1, 2, 3]
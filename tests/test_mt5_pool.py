@@ -0,0 +1,75 @@
+"""Tests for the MT5 connection pool against the stub EA server"""
+
+import time
+
+import pytest
+
+from mt5_pool import MT5ConnectionPool, PooledMT5Connector
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def pools():
+    running = []
+    yield running
+    for pool in running:
+        pool.stop()
+
+
+def test_pool_warms_up_and_spreads_requests(stub_ea, pools):
+    ea = stub_ea()
+    pool = MT5ConnectionPool('127.0.0.1', ea.port, size=3, timeout=5, ping_interval=10)
+    pools.append(pool)
+    pool.start()
+    assert pool.wait_until_warm(5)
+    assert pool.healthy_count() == 3
+    connectors = {id(pool.acquire()) for _ in range(6)}
+    assert len(connectors) == 3
+    assert pool.stats()['acquired'] == 6
+
+
+def test_pool_reconnects_dropped_connections(stub_ea, pools):
+    ea = stub_ea()
+    pool = MT5ConnectionPool('127.0.0.1', ea.port, size=2, timeout=5, ping_interval=0.1,
+                             backoff_base=0.05, backoff_max=0.2)
+    pools.append(pool)
+    pool.start()
+    assert pool.wait_until_warm(5)
+    ea.drop_clients()
+    assert wait_for(lambda: pool.stats()['failures'] >= 2)
+    assert wait_for(lambda: pool.healthy_count() == 2)
+    assert pool.acquire().send_command("PING") == {"pong": True}
+
+
+def test_pool_backs_off_while_ea_is_down(stub_ea, pools):
+    ea = stub_ea()
+    port = ea.port
+    ea.stop()
+    pool = MT5ConnectionPool('127.0.0.1', port, size=2, timeout=1, ping_interval=0.1,
+                             backoff_base=0.05, backoff_max=0.2)
+    pools.append(pool)
+    pool.start()
+    assert pool.wait_until_warm(5)
+    assert pool.healthy_count() == 0
+    assert pool.acquire() is None
+    assert wait_for(lambda: pool.stats()['max_consecutive_failures'] >= 2)
+
+
+def test_pooled_connector_fails_fast_without_healthy_connections(stub_ea, pools):
+    ea = stub_ea()
+    connector = PooledMT5Connector(port=ea.port, timeout=5, pool_size=2, ping_interval=10)
+    pools.append(connector.pool)
+    assert connector.connect()
+    assert connector.get_status()['running'] is True
+    ea.drop_clients()
+    ea.stop()
+    assert wait_for(lambda: not connector.connected)
+    started = time.monotonic()
+    assert connector.get_status() == {"error": "Not connected to MT5"}
+    assert time.monotonic() - started < 0.1
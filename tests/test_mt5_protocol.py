@@ -0,0 +1,90 @@
+"""Tests for MT5 stream framing"""
+
+import json
+import random
+
+import pytest
+
+from mt5_protocol import (FrameDecoder, FrameTooLargeError, LENGTH_PREFIX, decode_frame,
+                          encode_frame)
+
+
+def payloads(count, seed=7):
+    rng = random.Random(seed)
+    messages = []
+    for index in range(count):
+        size = rng.choice([0, 1, 10, 300, 5000])
+        messages.append(json.dumps({"id": index, "reason": "ü" * size}) if size else "")
+    return messages
+
+
+def chunked(data, rng, largest):
+    offset = 0
+    while offset < len(data):
+        size = rng.randint(1, largest)
+        yield data[offset:offset + size]
+        offset += size
+
+
+def decode_all(decoder, chunks):
+    frames = []
+    for chunk in chunks:
+        decoder.feed(chunk)
+        frames.extend(decode_frame(frame) for frame in decoder.frames())
+    return frames
+
+
+@pytest.mark.parametrize('largest', [3, 7, 4096, 200_000])
+def test_split_and_coalesced_frames(largest):
+    messages = payloads(60)
+    stream = b''.join(encode_frame(message) for message in messages)
+    decoder = FrameDecoder(buffer_size=1024)
+    frames = decode_all(decoder, chunked(stream, random.Random(largest), largest))
+    assert frames == messages
+    assert decoder.pending == 0
+
+
+@pytest.mark.parametrize('largest', [3, 9, 100_000])
+def test_length_prefixed_frames(largest):
+    messages = [message.encode('utf-8') for message in payloads(40, seed=3)]
+    stream = b''.join(encode_frame(message, length_prefixed=True) for message in messages)
+    decoder = FrameDecoder(buffer_size=512, length_prefixed=True)
+    frames = []
+    for chunk in chunked(stream, random.Random(largest), largest):
+        decoder.feed(chunk)
+        frames.extend(bytes(frame) for frame in decoder.frames())
+    assert frames == messages
+
+
+def test_switch_to_length_prefix_keeps_buffered_bytes():
+    decoder = FrameDecoder()
+    decoder.feed(encode_frame('{"encoding": "struct"}') + encode_frame(b'abc', length_prefixed=True))
+    frames = decoder.frames()
+    assert decode_frame(next(frames)) == '{"encoding": "struct"}'
+    decoder.use_length_prefix()
+    assert [bytes(frame) for frame in decoder.frames()] == [b'abc']
+
+
+def test_oversized_frame_is_rejected():
+    decoder = FrameDecoder(buffer_size=64, max_frame_size=100)
+    decoder.feed(b'x' * 101)
+    with pytest.raises(FrameTooLargeError):
+        list(decoder.frames())
+    prefixed = FrameDecoder(length_prefixed=True, max_frame_size=100)
+    prefixed.feed(LENGTH_PREFIX.pack(101))
+    with pytest.raises(FrameTooLargeError):
+        list(prefixed.frames())
+
+
+def test_compaction_keeps_partial_frame():
+    decoder = FrameDecoder(buffer_size=64)
+    first, second = b'a' * 40, bytes(range(1, 61))
+    decoder.feed(first + b'\0' + second[:10])
+    assert [bytes(frame) for frame in decoder.frames()] == [first]
+    # Doesn't fit after the data, but does once the tail slides to the front
+    decoder.feed(second[10:40])
+    assert len(decoder._buffer) == 64
+    assert decoder._start == 0
+    assert decoder.pending == 40
+    decoder.feed(second[40:] + b'\0')
+    assert [bytes(frame) for frame in decoder.frames()] == [second]
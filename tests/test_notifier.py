@@ -0,0 +1,111 @@
+"""Tests for the notification senders against local servers"""
+
+import smtplib
+import socket
+
+import pytest
+
+import config
+import notifier
+from notifier import SignalNotifier, SMTPSession
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class RecordingHandler:
+    """aiosmtpd handler counting sessions and keeping delivered messages"""
+
+    def __init__(self):
+        self.sessions = 0
+        self.messages = []
+        self.data_replies = []  # replies to DATA used before accepting
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith('refused@'):
+            return '550 5.1.1 Mailbox unavailable'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.data_replies:
+            return self.data_replies.pop(0)
+        self.messages.append(envelope.content.decode())
+        return '250 OK'
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = aiosmtpd_controller.Controller(handler, hostname='127.0.0.1', port=free_port())
+    controller.start()
+    yield handler, controller.port
+    controller.stop()
+
+
+@pytest.fixture
+def session(smtp_server):
+    _, port = smtp_server
+    smtp_session = SMTPSession('127.0.0.1', port, use_tls=False)
+    yield smtp_session
+    smtp_session.close()
+
+
+def test_connection_is_reused(smtp_server, session):
+    handler, _ = smtp_server
+    for index in range(3):
+        session.send('bot@example.com', 'me@example.com', f"Subject: {index}\n\nbody")
+    assert len(handler.messages) == 3
+    assert session.connects == 1
+    assert handler.sessions == 1
+
+
+def test_reconnects_after_server_drops_connection(smtp_server, session):
+    handler, _ = smtp_server
+    session.send('bot@example.com', 'me@example.com', "Subject: 1\n\nbody")
+    session._server.close()
+    session.send('bot@example.com', 'me@example.com', "Subject: 2\n\nbody")
+    assert len(handler.messages) == 2
+    assert session.connects == 2
+
+
+def test_reconnects_on_421(smtp_server, session):
+    handler, _ = smtp_server
+    handler.data_replies.append('421 4.3.0 Closing session')
+    session.send('bot@example.com', 'me@example.com', "Subject: 1\n\nbody")
+    assert len(handler.messages) == 1
+    assert session.connects == 2
+
+
+def test_permanent_error_is_not_retried(smtp_server, session):
+    handler, _ = smtp_server
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        session.send('bot@example.com', 'refused@example.com', "Subject: 1\n\nbody")
+    assert session.connects == 1
+    assert handler.sessions == 1
+    # The session stays usable
+    session.send('bot@example.com', 'me@example.com', "Subject: 2\n\nbody")
+    assert session.connects == 1
+    assert len(handler.messages) == 1
+
+
+def test_digest_sends_one_email(smtp_server, session, monkeypatch):
+    handler, _ = smtp_server
+    monkeypatch.setattr(notifier, '_smtp_session', session)
+    monkeypatch.setattr(config, 'EMAIL_USERNAME', 'bot@example.com')
+    monkeypatch.setattr(config, 'EMAIL_RECIPIENT', 'me@example.com')
+    signals = [dict(symbol='EURUSD', direction='BUY', strength=7, entry_price=1.1 + index / 100)
+               for index in range(3)]
+    SignalNotifier.deliver_email_digest(signals)
+    assert len(handler.messages) == 1
+    assert 'Subject: MT5 Signal Bot: 3 New Signals' in handler.messages[0]
@@ -0,0 +1,69 @@
+"""Tests for idempotent signal ingestion"""
+
+import pytest
+
+from db_manager import RecentKeyCache, get_db_manager
+from db_models import Signal, get_session, signal_dedup_key
+
+
+@pytest.fixture
+def db_manager():
+    manager = get_db_manager()
+    yield manager
+    manager._recent_signal_keys = RecentKeyCache()
+
+
+def stored(symbol):
+    session = get_session()
+    try:
+        return session.query(Signal).filter(Signal.symbol == symbol).count()
+    finally:
+        session.close()
+
+
+def make_batch(symbol, **fields):
+    return [dict(symbol=symbol, direction='BUY', strength=7, entry_price=1.1 + index / 100, **fields)
+            for index in range(3)]
+
+
+def with_seq(batch):
+    return [dict(signal, seq=seq) for seq, signal in enumerate(batch, start=1)]
+
+
+@pytest.mark.parametrize('forget_recent', [False, True])
+@pytest.mark.parametrize('symbol, batch', [
+    ('TIMED', make_batch('TIMED', time='2026-10-17 12:00:00')),
+    ('SEQ', with_seq(make_batch('SEQ'))),
+])
+def test_repeated_batch_is_stored_once(db_manager, forget_recent, symbol, batch):
+    symbol = f"{symbol}{int(forget_recent)}"
+    batch = [dict(signal, symbol=symbol) for signal in batch]
+    ids = db_manager.save_signals(batch)
+    assert len(ids) == 3
+    if forget_recent:
+        # Another worker: only the database unique index knows the keys
+        db_manager._recent_signal_keys = RecentKeyCache()
+    assert db_manager.save_signals(batch) == []
+    assert stored(symbol) == 3
+
+
+def test_timeless_signals_keyed_by_batch_position(db_manager):
+    batch = make_batch('POSITION')
+    assert len(db_manager.save_signals(batch, batch_id='since=4')) == 3
+    db_manager._recent_signal_keys = RecentKeyCache()
+    assert db_manager.save_signals(batch, batch_id='since=4') == []
+    assert stored('POSITION') == 3
+    # A later reply holds new signals, even if they look alike
+    assert len(db_manager.save_signals(batch, batch_id='since=7')) == 3
+    assert stored('POSITION') == 6
+
+
+def test_keys():
+    signal = make_batch('EURUSD')[0]
+    assert signal_dedup_key(signal) is None
+    assert signal_dedup_key(dict(signal, seq=5)) != signal_dedup_key(dict(signal, seq=6))
+    assert signal_dedup_key(signal, 'since=1:0') != signal_dedup_key(signal, 'since=1:1')
+    # The time wins over the sequence number, so keys of stored signals are unchanged
+    timed = dict(signal, time='2026-10-17 12:00:00')
+    assert signal_dedup_key(dict(timed, seq=5)) == signal_dedup_key(timed)
+    assert signal_dedup_key(dict(signal, dedup_key='abc')) == 'abc'
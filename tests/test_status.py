@@ -0,0 +1,84 @@
+"""Tests for the write-behind bot status"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from db_manager import StatusAggregator
+from db_models import BotStatus, get_session, init_db
+
+
+@pytest.fixture
+def status():
+    init_db()
+    session = get_session()
+    session.query(BotStatus).delete()
+    session.add(BotStatus(total_signals_today=0, total_trades_today=0, account_balance=1000.0))
+    session.commit()
+    session.close()
+    aggregator = StatusAggregator(get_session)
+    aggregator.reload()
+    return aggregator
+
+
+def stored():
+    session = get_session()
+    try:
+        return session.query(BotStatus).first().to_dict()
+    finally:
+        session.close()
+
+
+@pytest.mark.parametrize('values', [
+    {'running': 'yes'},
+    {'account_balance': 'lots'},
+    {'account_balance': float('nan')},
+    {'total_trades_today': 1.5},
+    {'total_signals_today': None},
+    {'bot_version': 'x' * 21},
+    {'last_update': 'yesterday'},
+])
+def test_invalid_values_are_rejected(status, values):
+    with pytest.raises(ValueError):
+        status.update(dict(values, connected=True))
+    assert not status.has_pending()
+    assert status.snapshot()['connected'] is False
+
+
+def test_values_are_converted(status):
+    status.update({'account_balance': 5, 'last_update': '2026-01-02 03:04:05'})
+    assert status.flush()
+    assert stored()['account_balance'] == 5.0
+    assert status.snapshot()['last_update'] == datetime(2026, 1, 2, 3, 4, 5)
+
+
+def test_rejected_field_does_not_block_flush(status):
+    for _ in range(8):
+        status.increment('total_signals_today')
+    status.update({'account_balance': 1234.5})
+    # A value the database refuses, as if it got past validation
+    status._assignments['running'] = 'yes'
+    assert status.flush()
+    assert not status.has_pending()
+    row = stored()
+    assert row['total_signals_today'] == 8
+    assert row['account_balance'] == 1234.5
+    # Later changes keep flowing
+    status.increment('total_signals_today')
+    assert status.flush()
+    assert stored()['total_signals_today'] == 9
+
+
+def test_transient_failure_is_retried(status, monkeypatch):
+    status.increment('total_trades_today', 2)
+
+    def lost_connection(*args):
+        raise OperationalError('UPDATE bot_status', {}, Exception('server closed the connection'))
+
+    monkeypatch.setattr(status, '_write', lost_connection)
+    assert not status.flush()
+    assert status.has_pending()
+    monkeypatch.undo()
+    assert status.flush()
+    assert stored()['total_trades_today'] == 2
@@ -0,0 +1,133 @@
+"""Tests for the Telegram sender against a local Bot API stand-in"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+import config
+import notifier
+from notification_queue import NotificationChannel
+from notifier import SignalNotifier, TelegramRateLimited, TelegramSender
+
+
+class BotAPI(ThreadingHTTPServer):
+    """Records sendMessage calls and answers with queued (status, body) replies"""
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), BotAPIHandler)
+        self.messages = []
+        self.replies = []
+        self.connections = set()
+        self.lock = threading.Lock()
+
+
+class BotAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        form = {key: values[0] for key, values in parse_qs(body.decode()).items()}
+        with self.server.lock:
+            self.server.connections.add(self.client_address)
+            status, reply = self.server.replies.pop(0) if self.server.replies else (200, None)
+            if status == 200:
+                self.server.messages.append(form)
+        payload = json.dumps(reply or {"ok": status == 200}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def bot_api():
+    server = BotAPI()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sender(bot_api):
+    telegram_sender = TelegramSender('TOKEN', f"http://127.0.0.1:{bot_api.server_port}",
+                                     rate=100, burst=10)
+    yield telegram_sender
+    telegram_sender.close()
+
+
+def make_signals(count):
+    return [dict(symbol='EURUSD', direction='BUY', strength=7, entry_price=1.1 + index / 100)
+            for index in range(count)]
+
+
+def test_session_is_reused(bot_api, sender):
+    for index in range(3):
+        sender.send_message('42', f"message {index}")
+    assert [message['text'] for message in bot_api.messages] == ['message 0', 'message 1', 'message 2']
+    assert bot_api.messages[0]['chat_id'] == '42'
+    assert len(bot_api.connections) == 1
+
+
+def test_retry_after_is_honoured(bot_api, sender):
+    bot_api.replies.append((429, {"ok": False, "parameters": {"retry_after": 0.3}}))
+    started = time.monotonic()
+    sender.send_message('42', 'hello')
+    assert time.monotonic() - started >= 0.3
+    assert sender.rate_limited == 1
+    assert len(bot_api.messages) == 1
+
+
+def test_gives_up_after_repeated_429(bot_api, sender):
+    sender.max_rate_limit_retries = 1
+    bot_api.replies.extend([(429, {"ok": False, "parameters": {"retry_after": 0.01}})] * 2)
+    with pytest.raises(TelegramRateLimited):
+        sender.send_message('42', 'hello')
+    assert bot_api.messages == []
+
+
+def test_pack_keeps_messages_under_limit(sender):
+    sender.MAX_MESSAGE_LENGTH = 10
+    assert sender.pack(['aaaa', 'bbbb', 'cccc', 'x' * 15]) == [('aaaa\nbbbb', 2), ('cccc', 1), ('x' * 10, 1)]
+
+
+def test_batch_is_sent_as_one_message(bot_api, sender, monkeypatch):
+    monkeypatch.setattr(notifier, '_telegram_sender', sender)
+    monkeypatch.setattr(config, 'TELEGRAM_CHAT_ID', '42')
+    SignalNotifier.deliver_telegram_batch(make_signals(3))
+    assert len(bot_api.messages) == 1
+    assert bot_api.messages[0]['text'].count('EURUSD') == 3
+
+
+def test_failed_batch_retry_skips_delivered_messages(bot_api, sender, monkeypatch):
+    monkeypatch.setattr(notifier, '_telegram_sender', sender)
+    monkeypatch.setattr(config, 'TELEGRAM_CHAT_ID', '42')
+    # One signal per message; the second message fails once
+    sender.MAX_MESSAGE_LENGTH = len(SignalNotifier._telegram_text(make_signals(1)[0])) + 1
+    bot_api.replies.extend([(200, None), (500, None)])
+    dead_letters = []
+    channel = NotificationChannel('telegram', SignalNotifier.deliver_telegram_batch,
+                                  lambda *args: dead_letters.append(args),
+                                  backoff_base=0.01, batch_window=0.2)
+    channel.start()
+    try:
+        for signal in make_signals(3):
+            channel.enqueue(signal)
+        deadline = time.monotonic() + 5
+        while channel.sent < 3 and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        channel.stop()
+    assert len(bot_api.messages) == 3
+    assert len({message['text'] for message in bot_api.messages}) == 3
+    assert channel.sent == 3
+    assert dead_letters == []
@@ -0,0 +1,143 @@
+"""
+Fuzz and benchmark harness for mt5_protocol.FrameDecoder
+
+Feeds the decoder streams of null-terminated frames that are split and
+coalesced at random chunk boundaries and checks that every frame comes
+out intact, then times the decoder against the old chunk-join reader.
+
+Run with: python tools/frame_decoder_fuzz.py [iterations]
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mt5_protocol import FrameDecoder, decode_frame
+
+
+class ChunkedSocket:
+    """Socket stand-in that returns a byte stream in predetermined chunks"""
+
+    def __init__(self, data, chunk_sizes):
+        self._data = memoryview(data)
+        self._chunk_sizes = iter(chunk_sizes)
+        self._offset = 0
+
+    def recv_into(self, buffer):
+        size = min(next(self._chunk_sizes, 4096), len(buffer), len(self._data) - self._offset)
+        buffer[:size] = self._data[self._offset:self._offset + size]
+        self._offset += size
+        return size
+
+    def recv(self, size):
+        size = min(next(self._chunk_sizes, 4096), size, len(self._data) - self._offset)
+        chunk = bytes(self._data[self._offset:self._offset + size])
+        self._offset += size
+        return chunk
+
+
+def random_payload(rng):
+    """Build a frame payload of varying size, including empty and multi-byte text"""
+    kind = rng.random()
+    if kind < 0.05:
+        return ""
+    if kind < 0.1:
+        return json.dumps({"signals": [{"symbol": "EURUSD", "reason": "x" * rng.randint(50_000, 200_000)}]})
+    signals = [{
+        "symbol": rng.choice(["EURUSD", "GBPUSD", "USDJPY"]),
+        "direction": rng.choice(["BUY", "SELL"]),
+        "strength": rng.randint(1, 10),
+        "entry_price": round(rng.uniform(0.5, 150), 5),
+        "reason": "MA Cross + RSI → über-signal"
+    } for _ in range(rng.randint(0, 30))]
+    return json.dumps({"id": rng.randint(1, 10_000), "signals": signals})
+
+
+def random_chunks(rng, total):
+    """Chunk sizes from single bytes up to large coalesced reads"""
+    sizes = []
+    while total > 0:
+        size = rng.choice([1, 2, 3, rng.randint(1, 64), rng.randint(64, 4096), rng.randint(4096, 65536)])
+        sizes.append(size)
+        total -= size
+    return sizes
+
+
+def decode_stream(data, chunk_sizes, buffer_size):
+    """Run the decoder over a chunked stream"""
+    sock = ChunkedSocket(data, chunk_sizes)
+    decoder = FrameDecoder(buffer_size=buffer_size)
+    frames = []
+    while decoder.recv_into(sock):
+        frames.extend(decode_frame(frame) for frame in decoder.frames())
+    return frames, decoder.pending
+
+
+def fuzz(iterations, seed=0):
+    """Check split and coalesced frames round-trip exactly"""
+    rng = random.Random(seed)
+    for iteration in range(iterations):
+        payloads = [random_payload(rng) for _ in range(rng.randint(1, 40))]
+        trailing = rng.random() < 0.3
+        data = b''.join(payload.encode('utf-8') + b'\0' for payload in payloads)
+        if trailing:
+            # A partial frame left in flight must stay buffered
+            data += b'{"partial": tr'
+        chunk_sizes = random_chunks(rng, len(data))
+        frames, pending = decode_stream(data, chunk_sizes, buffer_size=rng.choice([16, 1024, 64 * 1024]))
+        assert frames == payloads, f"iteration {iteration}: frames differ"
+        assert pending == (14 if trailing else 0), f"iteration {iteration}: {pending} bytes pending"
+    print(f"fuzz: {iterations} streams decoded correctly")
+
+
+def legacy_receive(sock):
+    """The pre-decoder reader: join 4 KB chunks until one ends with NUL"""
+    chunks = []
+    while True:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        if chunk[-1] == 0:
+            chunks.append(chunk[:-1])
+            break
+        chunks.append(chunk)
+    return b''.join(chunks).decode('utf-8')
+
+
+def benchmark(repeat=20):
+    """Time one large GET_SIGNALS frame through both readers"""
+    signals = [{
+        "symbol": "EURUSD",
+        "direction": "BUY",
+        "strength": 7,
+        "entry_price": 1.08762,
+        "reason": "MA Cross + RSI Oversold + ADX Trend (28.5)"
+    } for _ in range(20_000)]
+    data = json.dumps({"signals": signals}).encode('utf-8') + b'\0'
+    chunk_sizes = [4096] * (len(data) // 4096 + 1)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        legacy_receive(ChunkedSocket(data, chunk_sizes))
+    legacy = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        sock = ChunkedSocket(data, chunk_sizes)
+        decoder = FrameDecoder()
+        while decoder.recv_into(sock):
+            for frame in decoder.frames():
+                decode_frame(frame)
+    current = (time.perf_counter() - start) / repeat
+
+    print(f"benchmark: {len(data) / 1e6:.1f} MB frame - "
+          f"chunk join {legacy * 1e3:.2f} ms, FrameDecoder {current * 1e3:.2f} ms")
+
+
+if __name__ == '__main__':
+    fuzz(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
+    benchmark()